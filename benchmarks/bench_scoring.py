@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the run.py scoring pipeline
+Generates synthetic URL files, scores them against a fake HfApi with configurable
+latency and reports throughput, per-model latency percentiles and peak RSS
+
+Usage:
+  python benchmarks/bench_scoring.py [--sizes 1000,100000,1000000] [--workers N]
+                                     [--latency SPEC] [--output results.json]
+                                     [--compare baseline.json]
+                                     [--schedule-models N] [--memory-models N]
+                                     [--writer-rows N]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import run
+from hub_replay import model_info_from_dict, parse_latency
+from instrumentation import Instrumentation, STAGE_MODEL
+from model_record import ModelRecord
+from pipeline import iter_url_lines, NDJSONWriter, TemplateEncoder, json_line_encoder
+from scheduling import LatencyHistory
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+# Same mix as sample_urls.txt: 2 models, 2 datasets, 1 code repo per 5 lines
+URL_PATTERNS = [
+    "https://huggingface.co/bench-org/model-{i}/tree/main",
+    "https://huggingface.co/datasets/bench-org/dataset-{i}",
+    "https://github.com/bench-org/code-{i}",
+    "https://huggingface.co/bench-org/model-{i}-b",
+    "https://huggingface.co/datasets/bench-org/dataset-{i}-b",
+]
+
+
+def generate_url_file(path: str, lines: int) -> int:
+    """Write a synthetic URL file; returns the number of model URLs in it"""
+    models = 0
+    with open(path, 'w', encoding='ascii') as f:
+        for n in range(lines):
+            pattern = URL_PATTERNS[n % len(URL_PATTERNS)]
+            f.write(pattern.format(i=n) + '\n')
+            if '/datasets/' not in pattern and 'github.com' not in pattern:
+                models += 1
+    return models
+
+
+class FakeHfApi:
+    """Stand-in for HfApi returning a realistic ModelInfo after an injected delay"""
+
+    def __init__(self, latency: str = 'none', seed: Optional[int] = 0):
+        self._latency = parse_latency(latency, seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def model_info(self, repo_id: str, **kwargs):
+        with self._lock:
+            self.calls += 1
+            delay = self._latency({})
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return model_info_from_dict({
+            'id': repo_id,
+            'sha': 'a' * 40,
+            'last_modified': '2024-05-01T10:00:00.000Z',
+            'tags': ['text-generation', 'pytorch', 'safetensors'],
+            'card_data': {'license': 'apache-2.0'},
+            'siblings': [{'rfilename': 'config.json', 'size': 700},
+                         {'rfilename': 'model.safetensors', 'size': 2 ** 30}],
+        })
+
+
+class SkewedHfApi(FakeHfApi):
+    """FakeHfApi whose delay is fixed per repo and lognormally spread across repos"""
+
+    def __init__(self, median_ms: float = 10.0, sigma: float = 1.5, seed: int = 0):
+        super().__init__('none')
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.seed = seed
+
+    def delay_ms(self, repo_id: str) -> float:
+        return self.median_ms * random.Random(f"{self.seed}:{repo_id}").lognormvariate(0, self.sigma)
+
+    def model_info(self, repo_id: str, **kwargs):
+        time.sleep(self.delay_ms(repo_id) / 1000)
+        return super().model_info(repo_id, **kwargs)
+
+
+def sample_model_info(i: int) -> Dict:
+    """model_info(files_metadata=True) of a typical transformers repo, in cassette form"""
+    files = ['config.json', 'generation_config.json', 'tokenizer.json', 'tokenizer_config.json',
+             'special_tokens_map.json', 'README.md', '.gitattributes']
+    siblings = [{'rfilename': name, 'size': 1000 + n, 'blobId': f"{i:08x}{n:032x}"}
+                for n, name in enumerate(files)]
+    siblings += [{'rfilename': f"model-{n:05d}-of-00004.safetensors", 'size': 4 * 2 ** 30,
+                  'blobId': f"{i:08x}{n:032x}",
+                  'lfs': {'size': 4 * 2 ** 30, 'sha256': f"{i:016x}{n:048x}", 'pointerSize': 135}}
+                 for n in range(1, 5)]
+    return {
+        'id': f"bench-org/model-{i}", 'author': 'bench-org', 'sha': f"{i:040x}",
+        'last_modified': '2024-05-01T10:00:00.000Z', 'created_at': '2024-01-01T10:00:00.000Z',
+        'private': False, 'gated': False, 'disabled': False, 'downloads': 1000 + i, 'likes': i % 97,
+        'library_name': 'transformers', 'pipeline_tag': 'text-generation',
+        'tags': ['transformers', 'safetensors', 'llama', 'text-generation', 'conversational',
+                 'en', 'license:apache-2.0', 'autotrain_compatible', 'endpoints_compatible',
+                 'region:us'],
+        'card_data': {'license': 'apache-2.0', 'language': ['en'], 'library_name': 'transformers',
+                      'pipeline_tag': 'text-generation', 'tags': ['llama', 'chat'],
+                      'datasets': ['bench-org/corpus-a', 'bench-org/corpus-b']},
+        'config': {'architectures': ['LlamaForCausalLM'], 'model_type': 'llama',
+                   'tokenizer_config': {'bos_token': '<s>', 'eos_token': '</s>', 'pad_token': None}},
+        'transformers_info': {'auto_model': 'AutoModelForCausalLM', 'pipeline_tag': 'text-generation',
+                              'processor': 'AutoTokenizer'},
+        'safetensors': {'parameters': {'BF16': 8030261248}, 'total': 8030261248},
+        'spaces': [f"space-org/demo-{n}" for n in range(5)],
+        'widget_data': [{'text': 'My name is Julien and I like to'}],
+        'siblings': siblings,
+    }
+
+
+def bench_metadata_memory(models: int = 2000) -> Dict:
+    """Memory held per cached model as a full ModelInfo vs a ModelRecord, and cache payload sizes"""
+    from hub_replay import model_info_from_dict
+
+    def retained(build) -> float:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        held = build()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del held
+        return (after - before) / models
+
+    full_bytes = retained(lambda: [model_info_from_dict(sample_model_info(i)) for i in range(models)])
+    slim_bytes = retained(lambda: [ModelRecord.from_model_info(model_info_from_dict(sample_model_info(i)))
+                                   for i in range(models)])
+    info = model_info_from_dict(sample_model_info(0))
+    pickled = len(pickle.dumps(info, protocol=pickle.HIGHEST_PROTOCOL))
+    record = len(ModelRecord.from_model_info(info).to_bytes())
+    return {'models': models, 'full_bytes_per_model': round(full_bytes),
+            'record_bytes_per_model': round(slim_bytes),
+            'memory_reduction': round(full_bytes / max(slim_bytes, 1), 1),
+            'pickle_payload_bytes': pickled, 'record_payload_bytes': record}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_pipeline(lines: int, workers: int, latency: str, seed: Optional[int],
+                   ordered: bool = True) -> Dict:
+    """Score a synthetic file end to end (read, evaluate, serialize) and time it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'urls.txt')
+        expected_models = generate_url_file(path, lines)
+        fake = FakeHfApi(latency, seed)
+        stats = Instrumentation()
+
+        with open(os.devnull, 'w') as devnull:
+            writer = NDJSONWriter(devnull, streaming=False)
+            start = time.perf_counter()
+            for result in run.iter_evaluations(iter_url_lines(path), workers=workers,
+                                               ordered=ordered, api_factory=lambda: fake,
+                                               stats=stats):
+                writer.write(result)
+            writer.flush()
+            elapsed = time.perf_counter() - start
+
+    models = writer.count
+    stages = stats.summary()
+    per_model = stages.get(STAGE_MODEL, {})
+    return {
+        'lines': lines,
+        'models': models,
+        'expected_models': expected_models,
+        'hub_calls': fake.calls,
+        'workers': workers,
+        'latency_spec': latency,
+        'elapsed_s': round(elapsed, 4),
+        'models_per_s': round(models / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(per_model.get('p50_ms', 0.0), 3),
+        'p95_ms': round(per_model.get('p95_ms', 0.0), 3),
+        'p99_ms': round(per_model.get('p99_ms', 0.0), 3),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'stages': {name: {key: round(value, 4) for key, value in row.items()}
+                   for name, row in stages.items()},
+    }
+
+
+def _bench_in_child(queue, *args):
+    queue.put(bench_pipeline(*args))
+
+
+def bench_pipeline_isolated(*args) -> Dict:
+    """Run bench_pipeline in a fresh process so peak RSS belongs to this case alone"""
+    ctx = multiprocessing.get_context('fork') if hasattr(os, 'fork') else multiprocessing.get_context()
+    queue = ctx.Queue()
+    process = ctx.Process(target=_bench_in_child, args=(queue,) + args)
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def bench_micro(number: int = 100000) -> Dict:
+    """Per-call cost of the pure helper functions, in microseconds"""
+    url = "https://huggingface.co/google/gemma-3-270m/tree/main"
+    scores = {'Correctness': 0.9, 'Fairness': 0.6, 'Maintainability': 0.8, 'License': 0.9}
+    cases = {
+        'categorize_url': lambda: run.categorize_url(url),
+        'extract_model_info': lambda: run.extract_model_info(url),
+        'calculate_net_score': lambda: run.calculate_net_score(scores),
+    }
+    return {name: round(min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6, 3)
+            for name, func in cases.items()}
+
+
+def bench_rescore(rows: int = 1000000, seed: int = 0) -> Dict:
+    """NetScore recomputation for stored results: vectorized matrix vs per-row"""
+    import numpy as np
+    from rescore import MetricMatrix
+    from weights import DEFAULT_WEIGHTS
+
+    metrics = list(DEFAULT_WEIGHTS)
+    matrix = MetricMatrix(metrics, np.random.default_rng(seed).random((rows, len(metrics))))
+    start = time.perf_counter()
+    matrix.net_scores(DEFAULT_WEIGHTS)
+    vectorized_s = time.perf_counter() - start
+
+    dicts = [dict(zip(metrics, row)) for row in matrix.scores[:min(rows, 100000)].tolist()]
+    start = time.perf_counter()
+    for scores in dicts:
+        run.calculate_net_score(scores)
+    per_row_s = (time.perf_counter() - start) * rows / len(dicts)
+    return {'rows': rows, 'vectorized_s': round(vectorized_s, 4),
+            'per_row_s': round(per_row_s, 4), 'speedup': round(per_row_s / max(vectorized_s, 1e-9), 1)}
+
+
+def bench_schedule(models: int = 400, workers: int = 8, median_ms: float = 10.0,
+                   seed: int = 0) -> Dict:
+    """Total run time in input order vs longest expected first from the first run's latencies"""
+    repos = [f"bench-org/model-{i}" for i in range(models)]
+    urls = [f"https://huggingface.co/{repo}" for repo in repos]
+    fake = SkewedHfApi(median_ms, seed=seed)
+
+    def timed(**options):
+        start = time.perf_counter()
+        results = list(run.iter_evaluations(urls, workers=workers, api_factory=lambda: fake,
+                                            **options))
+        return results, time.perf_counter() - start
+
+    results, input_order_s = timed()
+    history = LatencyHistory.from_results(results)
+    _, longest_first_s = timed(history=history)
+    # No schedule beats perfectly balanced workers or the single slowest repo
+    delays = [fake.delay_ms(repo) for repo in repos]
+    lower_bound_s = max(sum(delays) / workers, max(delays)) / 1000
+    return {'models': models, 'workers': workers, 'input_order_s': round(input_order_s, 4),
+            'longest_first_s': round(longest_first_s, 4), 'lower_bound_s': round(lower_bound_s, 4),
+            'speedup': round(input_order_s / max(longest_first_s, 1e-9), 2)}
+
+
+def bench_writer(rows: int = 200000) -> Dict:
+    """Result lines/s written to a file: json.dumps with a flush per line vs NDJSONWriter"""
+    row = {'URL': 'https://huggingface.co/bench-org/model-1/tree/main', 'Fetch_Latency': 12,
+           'Correctness': 0.9, 'Correctness_Latency': 0, 'Fairness': 0.6, 'Fairness_Latency': 0,
+           'Maintainability': 0.8, 'Maintainability_Latency': 0, 'License': 0.9,
+           'License_Latency': 1, 'Size': 0.75, 'Size_Latency': 3, 'NetScore': 0.843,
+           'NetScore_Latency': 0}
+    results = [dict(row, URL=f"https://huggingface.co/bench-org/model-{i}") for i in range(rows)]
+
+    def per_line(out):
+        for result in results:
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+
+    def buffered(encoder):
+        def write(out):
+            writer = NDJSONWriter(out, streaming=False, encoder=encoder)
+            for result in results:
+                writer.write(result)
+            writer.flush()
+        return write
+
+    cases = {'json_per_line': per_line, 'template_buffered': buffered(TemplateEncoder().encode),
+             'fast_buffered': buffered(json_line_encoder())}
+    report = {'rows': rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, write in cases.items():
+            with open(os.path.join(tmp, name), 'w', encoding='utf-8') as out:
+                start = time.perf_counter()
+                write(out)
+                report[f"{name}_lines_per_s"] = round(rows / max(time.perf_counter() - start, 1e-9))
+    return report
+
+
+def compare(current: Dict, baseline: Dict) -> List[str]:
+    """Human-readable throughput/latency deltas against a saved baseline run"""
+    lines = []
+    old_cases = {case['lines']: case for case in baseline.get('pipeline', [])}
+    for case in current.get('pipeline', []):
+        old = old_cases.get(case['lines'])
+        if old is None:
+            continue
+        for key in ('models_per_s', 'p50_ms', 'p95_ms', 'p99_ms', 'peak_rss_mb'):
+            if old.get(key):
+                change = (case[key] - old[key]) / old[key] * 100
+                lines.append(f"{case['lines']:>9} lines  {key:<13} {old[key]:>12} -> {case[key]:>12} ({change:+.1f}%)")
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_SIZES),
+                        help='Comma-separated URL file sizes in lines')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--latency', default='none',
+                        help='Fake Hub latency spec (see hub_replay.parse_latency)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--unordered', action='store_true')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline JSON from an earlier run')
+    parser.add_argument('--skip-micro', action='store_true')
+    parser.add_argument('--rescore-rows', type=int, default=1000000,
+                        help='Stored results for the rescore benchmark (0 to skip)')
+    parser.add_argument('--schedule-models', type=int, default=400,
+                        help='Models for the scheduling benchmark (0 to skip)')
+    parser.add_argument('--memory-models', type=int, default=2000,
+                        help='Cached models for the metadata memory benchmark (0 to skip)')
+    parser.add_argument('--writer-rows', type=int, default=200000,
+                        help='Result lines for the NDJSON writer benchmark (0 to skip)')
+    args = parser.parse_args(argv)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pipeline': [],
+    }
+    if not args.skip_micro:
+        results['micro_us_per_call'] = bench_micro()
+        for name, cost in results['micro_us_per_call'].items():
+            print(f"{name:<22} {cost:>8.3f} us/call", file=sys.stderr)
+
+    if args.rescore_rows:
+        results['rescore'] = bench_rescore(args.rescore_rows, args.seed)
+        print(f"rescore {args.rescore_rows} rows: {results['rescore']['vectorized_s']} s vectorized, "
+              f"{results['rescore']['per_row_s']} s per row ({results['rescore']['speedup']}x)",
+              file=sys.stderr)
+
+    if args.schedule_models:
+        results['schedule'] = bench_schedule(args.schedule_models, max(args.workers, 8), seed=args.seed)
+        print(f"schedule {args.schedule_models} models: {results['schedule']['input_order_s']} s in input order, "
+              f"{results['schedule']['longest_first_s']} s longest first "
+              f"(lower bound {results['schedule']['lower_bound_s']} s)", file=sys.stderr)
+
+    if args.memory_models:
+        memory = results['metadata_memory'] = bench_metadata_memory(args.memory_models)
+        print(f"metadata per cached model: {memory['full_bytes_per_model']} B as ModelInfo, "
+              f"{memory['record_bytes_per_model']} B as ModelRecord ({memory['memory_reduction']}x); "
+              f"cache payload {memory['pickle_payload_bytes']} B pickled, "
+              f"{memory['record_payload_bytes']} B binary", file=sys.stderr)
+
+    if args.writer_rows:
+        writer = results['writer'] = bench_writer(args.writer_rows)
+        print(f"write {args.writer_rows} lines: {writer['json_per_line_lines_per_s']} lines/s per line, "
+              f"{writer['template_buffered_lines_per_s']} buffered (template), "
+              f"{writer['fast_buffered_lines_per_s']} buffered (fastest encoder)", file=sys.stderr)
+
+    print(f"{'lines':>9} {'models':>8} {'models/s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'RSS MB':>8}", file=sys.stderr)
+    for size in (int(s) for s in args.sizes.split(',') if s):
+        case = bench_pipeline_isolated(size, args.workers, args.latency, args.seed, not args.unordered)
+        results['pipeline'].append(case)
+        print(f"{case['lines']:>9} {case['models']:>8} {case['models_per_s']:>10} "
+              f"{case['p50_ms']:>8} {case['p95_ms']:>8} {case['p99_ms']:>8} "
+              f"{case['peak_rss_mb']:>8}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            for line in compare(results, json.load(f)):
+                print(line, file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -35,6 +35,7 @@
 
 import UI
 import time, sqlite3, os
+from licenses import license_report, project_license, PROJECT_LICENSE_ENV
 
 def admin_access():
     print("Welcome to the Admin Menu:")
@@ -241,8 +242,14 @@ def licenses_menu():
     
     print("    License Menu     ")
     print("---------------------")
-    for license_list in license_list:
-        print(license_list)
+    #Each license is normalized to its SPDX id and, if PROJECT_LICENSE is set, checked against it
+    try:
+        for line in license_report(license_list, project_license()):
+            print(line)
+        if project_license() is None:
+            print(f"Set {PROJECT_LICENSE_ENV} to the project's license to check compatibility")
+    except ValueError as e:
+        print(f"Error: {e}")
     print("---------------------")
     
     cursor.close()
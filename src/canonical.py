@@ -0,0 +1,110 @@
+"""
+Canonicalization of Hugging Face model URLs
+Normalizes host, case, trailing paths and revisions so variant URLs of the same
+repo are scored once per run
+"""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+from urllib.parse import urlparse, unquote
+
+HF_HOSTS = {'huggingface.co', 'www.huggingface.co', 'hf.co'}
+NON_MODEL_PREFIXES = {'datasets', 'spaces', 'docs', 'blog', 'models', 'organizations'}
+REVISION_MARKERS = {'tree', 'blob', 'resolve', 'commit'}
+DEFAULT_REVISION = 'main'
+
+# Canonical repos remembered per run for de-duplication. Bounded so streaming
+# huge inputs stays flat; a repo seen again after falling out is rescored.
+DEFAULT_DEDUPE_SIZE = 65536
+
+
+class CanonicalModel(NamedTuple):
+    """A model repo at a revision; revision None means the default branch"""
+    repo_id: str
+    revision: Optional[str] = None
+
+    @property
+    def key(self) -> Tuple[str, Optional[str]]:
+        # Hub repo ids resolve case-insensitively
+        return (self.repo_id.lower(), self.revision)
+
+    @property
+    def url(self) -> str:
+        base = f"https://huggingface.co/{self.repo_id}"
+        return f"{base}/tree/{self.revision}" if self.revision else base
+
+
+def split_repo_path(path: str) -> Optional[Tuple[str, str, Optional[str]]]:
+    """Split a Hub URL path into (org, name, revision), ignoring trailing file paths"""
+    parts = [part for part in path.split('/') if part]
+    if len(parts) < 2:
+        return None
+    revision = None
+    if len(parts) >= 4 and parts[2] in REVISION_MARKERS:
+        revision = unquote(parts[3])
+        if revision == DEFAULT_REVISION:
+            revision = None
+    return parts[0], parts[1], revision
+
+
+def canonicalize_url(url: str) -> Optional[CanonicalModel]:
+    """Canonical model repo for a Hugging Face model URL, or None for anything else"""
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return None
+    if (parsed.hostname or '').lower() not in HF_HOSTS:
+        return None
+
+    parts = split_repo_path(parsed.path)
+    if parts is None or parts[0].lower() in NON_MODEL_PREFIXES:
+        return None
+    org, name, revision = parts
+    return CanonicalModel(f"{org}/{name}", revision)
+
+
+class SharedResult:
+    """Result of the first evaluation of a repo, awaited by its duplicates"""
+
+    def __init__(self):
+        self._ready = threading.Event()
+        self._value = None
+
+    def set_result(self, value):
+        self._value = value
+        self._ready.set()
+
+    def result(self, timeout: Optional[float] = None):
+        self._ready.wait(timeout)
+        return self._value
+
+
+class DuplicateTracker:
+    """Shares the evaluation of the first URL of each canonical repo with its duplicates
+
+    The first caller for a key becomes its owner and publishes the result on a
+    SharedResult; later callers wait on it instead of scoring again.
+    """
+
+    def __init__(self, size: int = DEFAULT_DEDUPE_SIZE):
+        self._size = size
+        self._slots: 'OrderedDict[Tuple, SharedResult]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.duplicates = 0
+
+    def claim(self, key: Tuple) -> Tuple[SharedResult, bool]:
+        """Return (slot, is_owner) for a canonical key"""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                self._slots.move_to_end(key)
+                self.duplicates += 1
+                return slot, False
+            slot = self._slots[key] = SharedResult()
+            while len(self._slots) > self._size:
+                self._slots.popitem(last=False)
+            return slot, True
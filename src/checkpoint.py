@@ -0,0 +1,88 @@
+"""
+Checkpoint journal for resumable scoring runs
+An append-only NDJSON file of finished results keyed by canonical URL, so a run
+that dies halfway can be restarted and only pay for the remaining models
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from canonical import CanonicalModel, canonicalize_url
+
+
+def checkpoint_key(url: str) -> str:
+    """Canonical URL used as the journal key (the raw URL if it is not a Hub model)"""
+    canonical = canonicalize_url(url)
+    if canonical is None:
+        return url.strip()
+    return CanonicalModel(canonical.repo_id.lower(), canonical.revision).url
+
+
+class CheckpointJournal:
+    """Append-only journal of scored models, safe to share between workers
+
+    Each entry records the metrics its result was scored with, so a resumed run
+    with a different selection rescores the model instead of mixing rows.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        # {'result', 'metrics'} journaled by earlier runs, by key
+        self.completed: Dict[str, Dict] = self._load() if resume else {}
+        self.resumed = 0
+        # Append when resuming; otherwise start a fresh journal for this run
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+        if resume and self._file.tell() > 0 and not self._ends_with_newline():
+            self._file.write('\n')  # Seal a torn last line before appending
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _load(self) -> Dict[str, Dict]:
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    completed[entry['key']] = {'result': entry['result'], 'metrics': entry.get('metrics')}
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn last line from a run killed mid-write
+        return completed
+
+    def lookup(self, url: str, metrics: Optional[List[str]] = None) -> Optional[Dict]:
+        """Stored result for a URL from an earlier run, re-labelled with this URL
+
+        With metrics, only a result scored with exactly those metrics is replayed.
+        """
+        entry = self.completed.get(checkpoint_key(url))
+        if entry is None:
+            return None
+        if metrics is not None and entry['metrics'] != list(metrics):
+            return None
+        with self._lock:
+            self.resumed += 1
+        return dict(entry['result'], URL=url)
+
+    def append(self, url: str, result: Dict, metrics: Optional[List[str]] = None):
+        """Journal a finished result; flushed immediately so a crash cannot lose it"""
+        entry = {'key': checkpoint_key(url), 'result': result}
+        if metrics is not None:
+            entry['metrics'] = list(metrics)
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
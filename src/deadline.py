@@ -0,0 +1,146 @@
+"""
+Deadlines for run.py
+Per-model and whole-run wall-clock budgets, and a way to stop waiting on a slow
+Hub call once its budget is spent instead of stalling the batch
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional, Tuple
+
+# Seconds a single Hub request may take before it fails with a timeout
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+# The call_with_deadline (if any) the running thread is working for
+_local = threading.local()
+
+
+class Deadline:
+    """A point in time on the monotonic clock; None-valued budgets never expire"""
+
+    def __init__(self, expires_at: Optional[float]):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: Optional[float], parent: Optional['Deadline'] = None) -> 'Deadline':
+        """Deadline seconds from now, but never later than parent"""
+        expires_at = None if seconds is None else time.monotonic() + seconds
+        if parent is not None and parent.expires_at is not None:
+            expires_at = parent.expires_at if expires_at is None else min(expires_at, parent.expires_at)
+        return cls(expires_at)
+
+    @property
+    def bounded(self) -> bool:
+        return self.expires_at is not None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None if unbounded"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+
+class _AbandonableCall:
+    """Cleanups to run if call_with_deadline stops waiting on a call"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.abandoned = False
+
+    def add(self, callback: Callable[[], None]):
+        with self._lock:
+            if not self.abandoned:
+                self._callbacks.append(callback)
+                return
+        callback()  # Given up on already; clean up straight away
+
+    def discard(self, callback: Callable[[], None]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def abandon(self):
+        with self._lock:
+            self.abandoned = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+@contextmanager
+def on_abandon(callback: Callable[[], None]):
+    """Run callback if the deadline of the call this thread works for runs out inside the block
+
+    Lets an abandoned call give back shared resources (e.g. a HubThrottle slot)
+    at once instead of when it finally ends. Outside call_with_deadline, or on
+    an unbounded deadline, it does nothing.
+    """
+    call = getattr(_local, 'call', None)
+    if call is None:
+        yield
+        return
+    call.add(callback)
+    try:
+        yield
+    finally:
+        call.discard(callback)
+
+
+def carry_deadline(func: Callable[..., Any]) -> Callable[..., Any]:
+    """func, made to run under the caller's on_abandon scope on whichever thread calls it"""
+    call = getattr(_local, 'call', None)
+    if call is None:
+        return func
+
+    def run(*args, **kwargs):
+        previous, _local.call = getattr(_local, 'call', None), call
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.call = previous
+    return run
+
+
+def call_with_deadline(func: Callable[[], Any], deadline: Optional[Deadline]) -> Tuple[bool, Any]:
+    """Run func, waiting at most until deadline; returns (finished, result)
+
+    With a bounded deadline func runs on a daemon thread, so a call that
+    overruns is abandoned (it ends on its own request timeout) rather than
+    holding up the caller or interpreter exit; its on_abandon callbacks run
+    as it is given up on. Exceptions from func propagate.
+    """
+    if deadline is None or not deadline.bounded:
+        return True, func()
+    if deadline.expired():
+        return False, None
+
+    outcome = {}
+    done = threading.Event()
+    call = _AbandonableCall()
+    parent = getattr(_local, 'call', None)
+
+    def target():
+        _local.call = call
+        if parent is not None:
+            parent.add(call.abandon)    # Giving up on the enclosing call gives up on this one too
+        try:
+            outcome['value'] = func()
+        except BaseException as e:
+            outcome['error'] = e
+        finally:
+            if parent is not None:
+                parent.discard(call.abandon)
+            done.set()
+
+    threading.Thread(target=target, name='deadline-call', daemon=True).start()
+    if not done.wait(deadline.remaining()):
+        call.abandon()
+        return False, None
+    if 'error' in outcome:
+        raise outcome['error']
+    return True, outcome['value']
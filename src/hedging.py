@@ -0,0 +1,116 @@
+"""
+Hedged Hub requests for the metadata layer
+A fetch still running after a percentile of recently observed latencies gets a
+duplicate request, and whichever answers first is used, trimming the tail that
+a few slow Hub responses add to per-model latency
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from deadline import carry_deadline
+
+DEFAULT_HEDGE_PERCENTILE = 95.0
+HEDGE_WINDOW = 256          # Recent latencies the percentile is taken over
+MIN_SAMPLES = 20            # No hedging until this many latencies were seen
+MIN_HEDGE_DELAY = 0.01      # Seconds; never hedge sooner than this
+
+
+class HedgePolicy:
+    """When to hedge, and counters of what hedging did
+
+    Safe to share between the worker threads of a run.
+    """
+
+    def __init__(self, percentile: float = DEFAULT_HEDGE_PERCENTILE, window: int = HEDGE_WINDOW,
+                 min_samples: int = MIN_SAMPLES, min_delay: float = MIN_HEDGE_DELAY):
+        if not 0 < percentile < 100:
+            raise ValueError(f"hedge percentile must be between 0 and 100, got {percentile}")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            'requests': 0,
+            'hedges_sent': 0,
+            'hedges_won': 0,    # The duplicate answered first
+        }
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while there is too little history"""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(self.min_delay, ordered[index])
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """Run func, hedging it once if it is slower than delay(); first success wins
+
+        Both attempts run on daemon threads; the loser is left to finish on its
+        own (it is bounded by the request timeout) and its answer is dropped.
+        If both attempts fail, the primary's exception is raised.
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+        delay = self.delay()
+        if delay is None:
+            start = time.perf_counter()
+            result = func()
+            self.observe(time.perf_counter() - start)
+            return result
+
+        finished = []   # (attempt, ok, value, seconds) in completion order
+        cond = threading.Condition()
+
+        def attempt(index: int):
+            start = time.perf_counter()
+            try:
+                outcome = (index, True, func())
+            except BaseException as e:
+                outcome = (index, False, e)
+            with cond:
+                finished.append(outcome + (time.perf_counter() - start,))
+                cond.notify_all()
+
+        def launch(index: int):
+            # Attempts share the caller's deadline, so giving up on it frees their throttle slots
+            threading.Thread(target=carry_deadline(attempt), args=(index,), name=f'hedge-{index}',
+                             daemon=True).start()
+
+        launch(0)
+        launched = 1
+        with cond:
+            if not cond.wait_for(lambda: finished, timeout=delay):
+                launch(1)
+                launched = 2
+                with self._lock:
+                    self.stats['hedges_sent'] += 1
+            cond.wait_for(lambda: any(ok for _, ok, _, _ in finished) or len(finished) == launched)
+            winner = next((f for f in finished if f[1]), None)
+            if winner is None:
+                winner = next(f for f in finished if f[0] == 0)
+
+        index, ok, value, seconds = winner
+        if not ok:
+            raise value
+        self.observe(seconds)
+        if index == 1:
+            with self._lock:
+                self.stats['hedges_won'] += 1
+        return value
+
+    def summary(self) -> str:
+        stats = self.stats
+        delay = self.delay()
+        threshold = 'not enough samples' if delay is None else f"{delay * 1000:.0f} ms"
+        return (f"Hedging: {stats['hedges_sent']} hedges sent, {stats['hedges_won']} won "
+                f"of {stats['requests']} fetches (p{self.percentile:g} delay {threshold})")
@@ -0,0 +1,266 @@
+"""
+Persistent on-disk cache for Hub model metadata
+SQLite-backed, keyed by repo id and revision, with a TTL and LRU size bound;
+also keeps size measurements per commit, which never go stale. ModelRecords are
+stored in their compact binary form, anything else pickled. Responses fetched
+without per-file metadata are kept apart from full ones, which serve both
+"""
+
+import sqlite3
+import pickle
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from model_record import ModelRecord, RECORD_FORMAT
+
+DEFAULT_TTL = 3600          # Seconds an entry is trusted before it is revalidated
+DEFAULT_MAX_ENTRIES = 10000
+BUSY_TIMEOUT = 30           # Seconds to wait for another process holding the write lock
+DEFAULT_REVISION = 'main'
+# Appended to the revision of entries fetched without files_metadata; git refs never contain ':'
+NO_FILES_SUFFIX = ':nofiles'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS model_metadata (
+    repo_id       TEXT NOT NULL,
+    revision      TEXT NOT NULL,
+    sha           TEXT,
+    last_modified TEXT,
+    fetched_at    REAL NOT NULL,
+    accessed_at   REAL NOT NULL,
+    payload       BLOB NOT NULL,
+    PRIMARY KEY (repo_id, revision)
+);
+CREATE INDEX IF NOT EXISTS idx_model_metadata_accessed ON model_metadata (accessed_at);
+CREATE TABLE IF NOT EXISTS model_size (
+    repo_id      TEXT NOT NULL,
+    sha          TEXT NOT NULL,
+    total_bytes  INTEGER,
+    weight_bytes INTEGER,
+    parameters   TEXT NOT NULL,
+    PRIMARY KEY (repo_id, sha)
+);
+"""
+
+
+class CacheEntry:
+    """A cached model_info payload plus the fields used to revalidate it"""
+
+    def __init__(self, data: Any, sha: Optional[str], last_modified: Optional[str], fetched_at: float,
+                 files: bool = True):
+        self.data = data
+        self.sha = sha
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.files = files      # Fetched with files_metadata (per-file sizes)
+
+    def is_fresh(self, ttl: float, now: Optional[float] = None) -> bool:
+        now = time.time() if now is None else now
+        return now - self.fetched_at < ttl
+
+    def matches(self, sha: Optional[str], last_modified: Any) -> bool:
+        """True if a lightweight Hub response describes the same repo state"""
+        if sha and self.sha:
+            return sha == self.sha
+        last_modified = _timestamp(last_modified)
+        return bool(last_modified) and last_modified == self.last_modified
+
+
+def _revision_key(revision: Optional[str], files: bool = True) -> str:
+    key = revision or DEFAULT_REVISION
+    return key if files else key + NO_FILES_SUFFIX
+
+
+def _timestamp(value: Any) -> Optional[str]:
+    """Normalize last_modified (datetime or string) for storage and comparison"""
+    if value is None:
+        return None
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+class MetadataCache:
+    """SQLite cache of model_info responses shared across ./run invocations"""
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self.stats: Dict[str, int] = {
+            'hits': 0,          # Fresh entry served without any network call
+            'revalidated': 0,   # Stale entry confirmed unchanged by a sha check
+            'misses': 0,        # Not cached, or changed upstream; full fetch
+            'evictions': 0,
+            'write_errors': 0,  # Writes given up on while another process held the lock
+        }
+
+    def lookup(self, repo_id: str, revision: Optional[str] = None,
+               files: bool = True) -> Optional[CacheEntry]:
+        """Return the cached entry for a repo revision, fresh or not
+
+        With files False an entry without per-file metadata will do, and the
+        most recently fetched of the two kinds is returned.
+        """
+        keys = (_revision_key(revision),)
+        if not files:
+            keys += (_revision_key(revision, files=False),)
+        row = self._read_one(
+            "SELECT payload, sha, last_modified, fetched_at, revision FROM model_metadata "
+            f"WHERE repo_id = ? AND revision IN ({', '.join('?' * len(keys))}) "
+            "ORDER BY fetched_at DESC, length(revision) LIMIT 1",  # Full entry on a tie
+            (repo_id,) + keys
+        )
+        if row is None:
+            return None
+        try:
+            payload = bytes(row[0])
+            if payload.startswith(RECORD_FORMAT):
+                data = ModelRecord.from_bytes(payload)
+            else:
+                data = pickle.loads(payload)
+        except Exception:
+            return None  # Written by an incompatible version of this code or huggingface_hub
+        return CacheEntry(data, row[1], row[2], row[3], files=row[4] == keys[0])
+
+    def store(self, repo_id: str, revision: Optional[str], data: Any, files: bool = True) -> bool:
+        """Cache a model_info response; returns False if it cannot be serialized or written
+
+        files tells whether it was fetched with files_metadata.
+        """
+        try:
+            if isinstance(data, ModelRecord):
+                payload = data.to_bytes()
+            else:
+                payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return False
+
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO model_metadata "
+                    "(repo_id, revision, sha, last_modified, fetched_at, accessed_at, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (repo_id, _revision_key(revision, files), getattr(data, 'sha', None),
+                     _timestamp(getattr(data, 'last_modified', None)), now, now, payload)
+                )
+                self._evict()
+                self._conn.commit()
+            except sqlite3.OperationalError:
+                return self._write_failed()
+        return True
+
+    def lookup_size(self, repo_id: str, sha: str) -> Optional[Tuple[Optional[int], Optional[int], Dict[str, int]]]:
+        """(total_bytes, weight_bytes, parameters) measured at a commit, if cached"""
+        row = self._read_one(
+            "SELECT total_bytes, weight_bytes, parameters FROM model_size "
+            "WHERE repo_id = ? AND sha = ?", (repo_id, sha)
+        )
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def store_size(self, repo_id: str, sha: str, total_bytes: Optional[int],
+                   weight_bytes: Optional[int], parameters: Dict[str, int]):
+        """Cache a size measurement; a commit never changes, so it needs no TTL"""
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO model_size "
+                    "(repo_id, sha, total_bytes, weight_bytes, parameters) VALUES (?, ?, ?, ?, ?)",
+                    (repo_id, sha, total_bytes, weight_bytes, json.dumps(parameters))
+                )
+                # Same bound as the metadata table; the oldest measurements go first
+                self._conn.execute(
+                    "DELETE FROM model_size WHERE rowid IN (SELECT rowid FROM model_size "
+                    "ORDER BY rowid DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                )
+                self._conn.commit()
+            except sqlite3.OperationalError:
+                self._write_failed()
+
+    def cached_size(self, repo_id: str, revision: Optional[str] = None) -> Optional[int]:
+        """Weight bytes (else total bytes) measured at the commit cached for a revision"""
+        row = self._read_one(
+            "SELECT s.weight_bytes, s.total_bytes FROM model_metadata m "
+            "JOIN model_size s ON s.repo_id = m.repo_id AND s.sha = m.sha "
+            "WHERE m.repo_id = ? AND m.revision = ?",
+            (repo_id, _revision_key(revision))
+        )
+        if row is None:
+            return None
+        return row[0] or row[1]
+
+    def touch(self, repo_id: str, revision: Optional[str] = None, revalidated: bool = False,
+              files: bool = True):
+        """Mark an entry as recently used; a revalidation also restarts its TTL"""
+        now = time.time()
+        with self._lock:
+            try:
+                if revalidated:
+                    self._conn.execute(
+                        "UPDATE model_metadata SET accessed_at = ?, fetched_at = ? "
+                        "WHERE repo_id = ? AND revision = ?",
+                        (now, now, repo_id, _revision_key(revision, files))
+                    )
+                else:
+                    self._conn.execute(
+                        "UPDATE model_metadata SET accessed_at = ? WHERE repo_id = ? AND revision = ?",
+                        (now, repo_id, _revision_key(revision, files))
+                    )
+                self._conn.commit()
+            except sqlite3.OperationalError:
+                self._write_failed()
+
+    def _read_one(self, sql: str, params: Tuple) -> Optional[Tuple]:
+        """First row of a query, or None (a miss) if another process kept the database locked"""
+        with self._lock:
+            try:
+                return self._conn.execute(sql, params).fetchone()
+            except sqlite3.OperationalError:
+                return None
+
+    def _write_failed(self) -> bool:
+        """Undo a write another process kept locked past BUSY_TIMEOUT (lock held)
+
+        The cache is only an optimisation, so the entry is simply left as it
+        was, and the model is scored from the response already in hand.
+        """
+        self._conn.rollback()
+        self.stats['write_errors'] += 1
+        return False
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_entries (lock held)"""
+        count = self._conn.execute("SELECT COUNT(*) FROM model_metadata").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM model_metadata WHERE rowid IN ("
+                "SELECT rowid FROM model_metadata ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+            self.stats['evictions'] += excess
+
+    def record(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM model_metadata").fetchone()[0]
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (f"Metadata cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+                f"{stats['misses']} misses, {stats['evictions']} evictions")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
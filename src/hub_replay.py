@@ -0,0 +1,275 @@
+"""
+Record/replay stand-in for the HfApi calls made by run.py
+Record mode saves real model_info responses and safetensors header reads to a
+JSON-lines cassette; replay mode
+serves them from disk, optionally with injected latency, so scoring can be
+benchmarked and regression-tested without network access
+"""
+
+import json
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+
+class CassetteMiss(Exception):
+    """Replay was asked for a call that is not in the cassette"""
+
+
+class ReplayedHTTPError(Exception):
+    """A recorded Hub error (404, 401, 429, ...) served back during replay
+
+    Like an HfHubHTTPError it carries a response with the status code and the
+    Retry-After header, so replayed throttling is retried as it was live.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None, error_type: str = '',
+                 retry_after: Optional[str] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.error_type = error_type
+        headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+HEADER_CALL = 'parse_safetensors_file_metadata'
+
+
+def _call_key(repo_id: str, revision: Optional[str], expand: Optional[List[str]],
+              files_metadata: bool = False) -> Tuple:
+    return ('model_info', repo_id, revision, tuple(sorted(expand)) if expand else None, bool(files_metadata))
+
+
+def _header_key(repo_id: str, revision: Optional[str], filename: str) -> Tuple:
+    return (HEADER_CALL, repo_id, revision, filename)
+
+
+def _entry_key(entry: Dict) -> Tuple:
+    if entry.get('call') == HEADER_CALL:
+        return _header_key(entry['repo_id'], entry.get('revision'), entry['filename'])
+    return _call_key(entry['repo_id'], entry.get('revision'), entry.get('expand'),
+                     entry.get('files_metadata', False))
+
+
+def model_info_to_dict(info: Any) -> Dict:
+    """Convert a ModelInfo into a JSON-safe dict that ModelInfo(**data) accepts"""
+    data = {}
+    for key, value in vars(info).items():
+        # camelCase attributes are backwards-compat aliases of the snake_case ones
+        if key in ('lastModified', 'cardData', 'transformersInfo', 'inference_provider_mapping'):
+            continue
+        if value is None:
+            continue
+        if isinstance(value, datetime):
+            # Same shape as the Hub API so ModelInfo's parser accepts it
+            value = value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+        elif key == 'card_data':
+            value = value.to_dict() if hasattr(value, 'to_dict') else dict(value)
+        elif key == 'siblings':
+            value = [_sibling_to_dict(sibling) for sibling in value]
+        elif key == 'safetensors':
+            value = {'parameters': value.parameters, 'total': value.total}
+        elif key == 'transformers_info':
+            value = dict(vars(value))
+        data[key] = value
+    return data
+
+
+def _sibling_to_dict(sibling: Any) -> Dict:
+    entry = {'rfilename': sibling.rfilename, 'size': sibling.size, 'blobId': sibling.blob_id}
+    if sibling.lfs is not None:
+        entry['lfs'] = {'size': sibling.lfs.size, 'sha256': sibling.lfs.sha256,
+                        'pointerSize': sibling.lfs.pointer_size}
+    return entry
+
+
+_ModelInfo: Any = False  # huggingface_hub's ModelInfo once imported
+
+
+def _model_info_class():
+    """huggingface_hub's ModelInfo, imported on first replay (None if not installed)"""
+    global _ModelInfo
+    if _ModelInfo is False:
+        try:
+            from huggingface_hub.hf_api import ModelInfo
+        except ImportError:
+            ModelInfo = None
+        _ModelInfo = ModelInfo
+    return _ModelInfo
+
+
+def model_info_from_dict(data: Dict) -> Any:
+    """Rebuild a model_info response from its cassette form"""
+    model_info_class = _model_info_class()
+    if model_info_class is not None:
+        return model_info_class(**data)
+    # Without huggingface_hub, expose the same attribute names the metrics read
+    fields = dict(data)
+    if isinstance(fields.get('card_data'), dict):
+        fields['card_data'] = SimpleNamespace(**fields['card_data'])
+    return SimpleNamespace(**fields)
+
+
+def load_cassette(path: str) -> Dict[Tuple, Dict]:
+    """Read a cassette into {call key: entry}; later entries win"""
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries[_entry_key(entry)] = entry
+    return entries
+
+
+class RecordingApi:
+    """Wraps a real HfApi and appends every model_info call and header read to a cassette"""
+
+    def __init__(self, api: Any, cassette_path: str):
+        self._api = api
+        self._path = cassette_path
+        self._lock = threading.Lock()
+
+    def model_info(self, repo_id: str, revision: Optional[str] = None,
+                   expand: Optional[List[str]] = None, **kwargs):
+        call_kwargs = dict(kwargs)
+        if revision is not None:
+            call_kwargs['revision'] = revision
+        if expand is not None:
+            call_kwargs['expand'] = expand
+
+        entry = {'repo_id': repo_id, 'revision': revision, 'expand': expand}
+        if kwargs.get('files_metadata'):
+            entry['files_metadata'] = True
+        return self._record(entry, lambda: self._api.model_info(repo_id, **call_kwargs), model_info_to_dict)
+
+    def parse_safetensors_file_metadata(self, repo_id: str, filename: str,
+                                        revision: Optional[str] = None, **kwargs):
+        entry = {'call': HEADER_CALL, 'repo_id': repo_id, 'revision': revision, 'filename': filename}
+        # Only the parameter counts are kept; they are all the size metric reads
+        to_dict = lambda header: {'parameter_count': dict(getattr(header, 'parameter_count', None) or {})}
+        return self._record(entry, lambda: self._api.parse_safetensors_file_metadata(
+            repo_id=repo_id, filename=filename, revision=revision, **kwargs), to_dict)
+
+    def _record(self, entry: Dict, call: Callable[[], Any], to_dict: Callable[[Any], Dict]) -> Any:
+        """Make the call and append its response or error, and its latency, to the cassette"""
+        start_time = time.time()
+        try:
+            result = call()
+            entry['response'] = to_dict(result)
+            return result
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            entry['error'] = {
+                'type': type(e).__name__,
+                'message': str(e),
+                'status_code': getattr(response, 'status_code', None),
+            }
+            headers = getattr(response, 'headers', None)
+            retry_after = headers.get('Retry-After') if isinstance(headers, Mapping) else None
+            if isinstance(retry_after, str):
+                entry['error']['retry_after'] = retry_after
+            raise
+        finally:
+            entry['latency_ms'] = round((time.time() - start_time) * 1000, 3)
+            self._append(entry)
+
+    def _append(self, entry: Dict):
+        with self._lock:
+            with open(self._path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+
+def parse_latency(spec: str, seed: Optional[int] = None) -> Callable[[Dict], float]:
+    """Build a latency model (milliseconds) from a spec string
+
+    recorded            replay the latency measured while recording (default)
+    none                no delay
+    fixed:MS            constant delay
+    uniform:LO:HI       uniformly distributed delay
+    lognormal:MEDIAN:SIGMA  long-tailed delay around a median
+    """
+    rng = random.Random(seed)
+    name, _, args = spec.partition(':')
+    params = [float(x) for x in args.split(':')] if args else []
+
+    if name == 'recorded':
+        return lambda entry: entry.get('latency_ms', 0.0)
+    if name == 'none':
+        return lambda entry: 0.0
+    if name == 'fixed' and len(params) == 1:
+        return lambda entry: params[0]
+    if name == 'uniform' and len(params) == 2:
+        return lambda entry: rng.uniform(params[0], params[1])
+    if name == 'lognormal' and len(params) == 2:
+        mu = math.log(params[0])
+        return lambda entry: rng.lognormvariate(mu, params[1])
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+class ReplayApi:
+    """Serves model_info and safetensors header reads from a cassette instead of the Hub"""
+
+    def __init__(self, cassette_path: str, latency: str = 'recorded', seed: Optional[int] = None):
+        self._entries = load_cassette(cassette_path)
+        self._latency = parse_latency(latency, seed)
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def model_info(self, repo_id: str, revision: Optional[str] = None,
+                   expand: Optional[List[str]] = None, files_metadata: bool = False, **kwargs):
+        entry = self._entries.get(_call_key(repo_id, revision, expand, files_metadata))
+        if entry is None and not files_metadata:
+            # A response with file metadata also answers a call without it,
+            # and a full response a lightweight expand=[...] probe
+            fallbacks = [(expand, True)] + ([(None, False), (None, True)] if expand else [])
+            for fallback_expand, fallback_files in fallbacks:
+                entry = self._entries.get(_call_key(repo_id, revision, fallback_expand, fallback_files))
+                if entry is not None:
+                    break
+        if entry is None:
+            self._miss(f"{repo_id}@{revision or 'main'} is not in the cassette")
+        return self._serve(entry, model_info_from_dict)
+
+    def parse_safetensors_file_metadata(self, repo_id: str, filename: str,
+                                        revision: Optional[str] = None, **kwargs):
+        """The recorded header's parameter counts (parameter_count, as on SafetensorsFileMetadata)"""
+        entry = self._entries.get(_header_key(repo_id, revision, filename))
+        if entry is None:
+            self._miss(f"{repo_id}@{revision or 'main'}/{filename} header is not in the cassette")
+        return self._serve(entry, lambda response: SimpleNamespace(**response))
+
+    def _miss(self, message: str):
+        with self._lock:
+            self.misses += 1
+        raise CassetteMiss(message)
+
+    def _serve(self, entry: Dict, from_dict: Callable[[Dict], Any]) -> Any:
+        """Wait out the entry's latency, then raise its error or rebuild its response"""
+        with self._lock:
+            delay = self._latency(entry)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if 'error' in entry:
+            error = entry['error']
+            raise ReplayedHTTPError(error['message'], error.get('status_code'), error.get('type', ''),
+                                    error.get('retry_after'))
+        return from_dict(entry['response'])
+
+
+def make_api_factory(base_factory: Optional[Callable[[], Any]], record: Optional[str] = None,
+                     replay: Optional[str] = None, latency: str = 'recorded',
+                     seed: Optional[int] = None) -> Optional[Callable[[], Any]]:
+    """Wrap the HfApi factory for record or replay mode (or return it unchanged)"""
+    if replay:
+        return lambda: ReplayApi(replay, latency=latency, seed=seed)
+    if record and base_factory is not None:
+        return lambda: RecordingApi(base_factory(), record)
+    return base_factory
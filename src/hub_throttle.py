@@ -0,0 +1,222 @@
+"""
+Rate-limit handling for Hub calls
+Recognizes HTTP 429 responses, honours Retry-After, adapts the number of calls in
+flight (AIMD) and holds every worker behind a circuit breaker while the Hub keeps
+throttling, so a throttled model is retried instead of scored as inaccessible
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from deadline import on_abandon
+
+DEFAULT_MAX_RETRIES = 6
+BASE_BACKOFF = 0.5          # Seconds; doubled per attempt when there is no Retry-After
+MAX_BACKOFF = 60.0          # Upper bound on any single wait, including Retry-After
+BREAKER_THRESHOLD = 5       # Consecutive throttled responses that open the breaker
+BREAKER_COOLDOWN = 5.0      # Seconds the breaker stays open; doubled on every re-trip
+
+# HfApi methods that make a Hub request and are worth retrying when throttled
+THROTTLED_METHODS = ('model_info', 'parse_safetensors_file_metadata')
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class RateLimited(Exception):
+    """A Hub call was still throttled (HTTP 429) after every retry"""
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    response = getattr(error, 'response', None)
+    code = getattr(response, 'status_code', None)
+    return code if isinstance(code, int) else None
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return status_code(error) == 429
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not hasattr(headers, 'get'):
+        return None
+    value = headers.get('Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Slot:
+    """One request's place among the requests in flight"""
+
+    __slots__ = ('started', 'held', 'probe')
+
+    def __init__(self, started: float, probe: bool = False):
+        self.started = started      # Monotonic time the slot was granted
+        self.held = True
+        self.probe = probe          # The one request that decides a half-open breaker
+
+
+class HubThrottle:
+    """Shared admission control for Hub requests made by every worker of a run
+
+    At most `limit` requests are in flight. The limit grows by 1/limit per
+    successful response and halves on a throttled one (once per window of
+    requests, so a burst of 429s counts once). A 429 also pauses new requests
+    for its Retry-After (or an exponential, jittered backoff). After
+    breaker_threshold throttled responses in a row the breaker opens: nothing
+    is sent for a cooldown, then a single probe decides whether to close it;
+    only a failed probe re-opens it, for twice the cooldown.
+    A request whose model deadline gives up on it leaves its slot at once
+    rather than when the request itself ends.
+    """
+
+    def __init__(self, max_concurrency: int = 8, min_concurrency: int = 1,
+                 max_retries: int = DEFAULT_MAX_RETRIES, base_backoff: float = BASE_BACKOFF,
+                 breaker_threshold: int = BREAKER_THRESHOLD,
+                 breaker_cooldown: float = BREAKER_COOLDOWN, seed: Optional[int] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.limit = float(self.max_concurrency)
+        self.state = CLOSED
+        self._rng = random.Random(seed)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._resume_at = 0.0       # No request is sent before this monotonic time
+        self._last_decrease = 0.0
+        self._consecutive = 0
+        self._trips = 0
+        self._probing = False
+        self.stats: Dict[str, int] = {
+            'requests': 0,
+            'throttled': 0,     # 429 responses
+            'retries': 0,
+            'gave_up': 0,       # Calls still throttled after max_retries
+            'breaker_trips': 0,
+        }
+
+    def _acquire(self) -> _Slot:
+        """Wait for a request slot"""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                wait = self._resume_at - now
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                if self.state == OPEN:
+                    self.state = HALF_OPEN
+                probe = self.state == HALF_OPEN
+                if probe:
+                    if self._probing:
+                        self._cond.wait()
+                        continue
+                    self._probing = True
+                elif self._in_flight >= int(self.limit):
+                    self._cond.wait()
+                    continue
+                self._in_flight += 1
+                self.stats['requests'] += 1
+                return _Slot(now, probe)
+
+    def _free(self, slot: _Slot):
+        """Give back slot's place in flight, once; call with the lock held"""
+        if slot.held:
+            slot.held = False
+            self._in_flight -= 1
+        if slot.probe:
+            slot.probe = self._probing = False
+
+    def _abandon(self, slot: _Slot):
+        """The caller stopped waiting on this request; let another one go"""
+        with self._cond:
+            self._free(slot)
+            self._cond.notify_all()
+
+    def _release(self, slot: _Slot, throttled: bool = False, delay: Optional[float] = None,
+                 attempt: int = 0):
+        with self._cond:
+            probe = slot.probe
+            self._free(slot)
+            now = time.monotonic()
+            if not throttled:
+                self._consecutive = 0
+                if probe:
+                    self.state, self._trips = CLOSED, 0
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            else:
+                self.stats['throttled'] += 1
+                self._consecutive += 1
+                if slot.started >= self._last_decrease:
+                    # Only requests sent after the last cut may cut again
+                    self.limit = max(float(self.min_concurrency), self.limit / 2)
+                    self._last_decrease = now
+                if delay is None:
+                    backoff = self.base_backoff * 2 ** attempt
+                    delay = self._rng.uniform(0, backoff)
+                # Late 429s from requests sent before the breaker opened do not re-trip it
+                if probe or (self.state == CLOSED and self._consecutive >= self.breaker_threshold):
+                    self.stats['breaker_trips'] += 1
+                    self.state = OPEN
+                    delay = max(delay, self.breaker_cooldown * 2 ** self._trips)
+                    self._trips += 1
+                self._resume_at = max(self._resume_at, now + min(delay, MAX_BACKOFF))
+            self._cond.notify_all()
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run one Hub request, retrying it while the Hub answers 429"""
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                with self._cond:
+                    self.stats['retries'] += 1
+            slot = self._acquire()
+            try:
+                with on_abandon(lambda: self._abandon(slot)):
+                    result = func(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited(e):
+                    self._release(slot)  # Any other answer still means the Hub is serving us
+                    raise
+                self._release(slot, throttled=True, delay=retry_after(e), attempt=attempt)
+                last_error = e
+                continue
+            self._release(slot)
+            return result
+        with self._cond:
+            self.stats['gave_up'] += 1
+        raise RateLimited(f"still rate limited after {self.max_retries} retries") from last_error
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (f"Hub throttling: {stats['throttled']} rate-limited responses, "
+                f"{stats['retries']} retries, {stats['gave_up']} given up, "
+                f"{stats['breaker_trips']} breaker trips, concurrency limit {int(self.limit)}")
+
+
+class ThrottledApi:
+    """HfApi wrapper that sends every request in THROTTLED_METHODS through a HubThrottle"""
+
+    def __init__(self, api: Any, throttle: HubThrottle):
+        self._api = api
+        self._throttle = throttle
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._api, name)
+        if name in THROTTLED_METHODS and callable(attr):
+            return lambda *args, **kwargs: self._throttle.call(attr, *args, **kwargs)
+        return attr
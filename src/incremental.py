@@ -0,0 +1,109 @@
+"""
+Incremental re-scoring for run.py
+A SQLite store of finished results keyed by repo, revision, commit sha and metric
+version, so repeated runs only rescore models that changed since they were scored
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Bump whenever a change to the scoring code should invalidate stored results
+METRIC_VERSION = 3
+
+DEFAULT_REVISION = 'main'
+BUSY_TIMEOUT = 30  # Seconds to wait for another process holding the write lock
+
+# A revision that is already a full commit sha names an immutable snapshot
+_COMMIT_SHA = re.compile(r'^[0-9a-f]{40}$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    repo_id        TEXT NOT NULL,
+    revision       TEXT NOT NULL,
+    metric_version INTEGER NOT NULL,
+    sha            TEXT NOT NULL,
+    scored_at      REAL NOT NULL,
+    result         TEXT NOT NULL,
+    PRIMARY KEY (repo_id, revision, metric_version)
+);
+"""
+
+
+def pinned_sha(revision: Optional[str]) -> Optional[str]:
+    """The commit sha a revision pins, or None for branches and tags"""
+    if revision and _COMMIT_SHA.match(revision):
+        return revision
+    return None
+
+
+def _key(repo_id: str, revision: Optional[str]) -> Tuple[str, str]:
+    # Hub repo ids resolve case-insensitively
+    return repo_id.lower(), revision or DEFAULT_REVISION
+
+
+class ScoreStore:
+    """Results of earlier runs, reusable while a repo's commit sha is unchanged"""
+
+    def __init__(self, path: str, metric_version: int = METRIC_VERSION):
+        self.path = path
+        self.metric_version = metric_version
+        self._lock = threading.Lock()
+        # Shard processes of one run may write the same store concurrently
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self.stats: Dict[str, int] = {
+            'reused': 0,     # Stored result for the current sha and metric version
+            'rescored': 0,   # New repo, new commit or new metric version
+        }
+
+    def lookup(self, repo_id: str, revision: Optional[str], sha: Optional[str]) -> Optional[Dict]:
+        """Stored result scored at this sha by the current metric version"""
+        if not sha:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM scores WHERE repo_id = ? AND revision = ? "
+                "AND metric_version = ? AND sha = ?",
+                _key(repo_id, revision) + (self.metric_version, sha)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def store(self, repo_id: str, revision: Optional[str], sha: Optional[str], result: Dict) -> bool:
+        """Remember a result for the commit it was scored at; False without a sha"""
+        if not sha:
+            return False
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scores "
+                "(repo_id, revision, metric_version, sha, scored_at, result) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                _key(repo_id, revision) + (self.metric_version, sha, time.time(), json.dumps(result))
+            )
+            self._conn.commit()
+        return True
+
+    def record(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def summary(self) -> str:
+        return (f"Incremental: {self.stats['reused']} reused, "
+                f"{self.stats['rescored']} rescored")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
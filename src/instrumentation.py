@@ -0,0 +1,133 @@
+"""
+Per-stage latency instrumentation for run.py
+Times network fetch, parsing and scoring with perf_counter_ns and aggregates
+each stage into a fixed-size histogram for the whole run
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# Stage names used by run.evaluate_model
+STAGE_PARSE = 'parse'
+STAGE_FETCH = 'fetch'
+STAGE_SCORE = 'score'
+STAGE_MODEL = 'model'
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond durations
+
+    Values below 64ns are exact; above that each power of two is split into 32
+    buckets, so percentiles are within ~3% while memory stays constant no matter
+    how many values are recorded.
+    """
+
+    SUB_BUCKETS = 32
+    LINEAR_LIMIT = 2 * SUB_BUCKETS
+
+    def __init__(self):
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns = 0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        if value < cls.LINEAR_LIMIT:
+            return value
+        shift = value.bit_length() - 6
+        return cls.LINEAR_LIMIT + (shift - 1) * cls.SUB_BUCKETS + ((value >> shift) - cls.SUB_BUCKETS)
+
+    @classmethod
+    def _bounds(cls, index: int):
+        """Inclusive [low, high] range of values that land in a bucket"""
+        if index < cls.LINEAR_LIMIT:
+            return index, index
+        shift = (index - cls.LINEAR_LIMIT) // cls.SUB_BUCKETS + 1
+        mantissa = (index - cls.LINEAR_LIMIT) % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value_ns: int):
+        value_ns = max(0, int(value_ns))
+        index = self._index(value_ns)
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self.count += 1
+            self.total_ns += value_ns
+            self.min_ns = value_ns if self.min_ns is None else min(self.min_ns, value_ns)
+            self.max_ns = max(self.max_ns, value_ns)
+
+    def percentile(self, pct: float) -> int:
+        """Approximate nearest-rank percentile in nanoseconds"""
+        with self._lock:
+            if not self.count:
+                return 0
+            rank = max(1, math.ceil(pct / 100 * self.count))
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= rank:
+                    low, high = self._bounds(index)
+                    return min(max((low + high) // 2, self.min_ns), self.max_ns)
+            return self.max_ns
+
+    def mean(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+
+class Instrumentation:
+    """Collects one LatencyHistogram per named stage across a run"""
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram()
+            return histogram
+
+    def record(self, stage: str, duration_ns: int):
+        self.histogram(stage).record(duration_ns)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as one sample of a stage"""
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter_ns() - start_ns)
+
+    def stages(self) -> List[str]:
+        with self._lock:
+            return list(self._histograms)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage count and p50/p95/p99/max in milliseconds"""
+        summary = {}
+        for name in self.stages():
+            histogram = self.histogram(name)
+            summary[name] = {
+                'count': histogram.count,
+                'mean_ms': histogram.mean() / 1e6,
+                'p50_ms': histogram.percentile(50) / 1e6,
+                'p95_ms': histogram.percentile(95) / 1e6,
+                'p99_ms': histogram.percentile(99) / 1e6,
+                'max_ms': histogram.max_ns / 1e6,
+            }
+        return summary
+
+    def format_table(self) -> str:
+        lines = [f"{'stage':<24} {'count':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10}"]
+        for name, row in self.summary().items():
+            lines.append(f"{name:<24} {row['count']:>8} {row['p50_ms']:>10.3f} {row['p95_ms']:>10.3f} "
+                         f"{row['p99_ms']:>10.3f} {row['max_ms']:>10.3f}")
+        return '\n'.join(lines)
@@ -0,0 +1,345 @@
+"""
+SPDX license normalization and compatibility
+Maps the free-form license values found on model cards (aliases, case variants,
+'other' plus license_name/license_link, license:* tags) to SPDX ids, and answers
+"can inbound be distributed under outbound?" from a precomputed matrix. The index
+is built once and cached on disk as JSON.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Categories, from most to least permissive
+PERMISSIVE = 'permissive'
+WEAK_COPYLEFT = 'weak-copyleft'
+STRONG_COPYLEFT = 'strong-copyleft'
+NETWORK_COPYLEFT = 'network-copyleft'
+RESTRICTED = 'restricted'          # Non-commercial, no-derivatives, use-based (RAIL) terms
+UNKNOWN = 'unknown'
+
+# A license is declared but not one we recognize (custom, proprietary, 'other')
+UNKNOWN_LICENSE = 'LicenseRef-unknown'
+
+# SPDX id (or Hub license id where SPDX has none) -> (category, extra aliases)
+LICENSES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    'MIT': (PERMISSIVE, ('expat', 'mit-license')),
+    'Apache-2.0': (PERMISSIVE, ('apache', 'apache-license-2.0', 'asl-2.0', 'alv2')),
+    'BSD-2-Clause': (PERMISSIVE, ('bsd-2', 'simplified-bsd', 'freebsd')),
+    'BSD-3-Clause': (PERMISSIVE, ('bsd', 'bsd-3', 'new-bsd', 'modified-bsd')),
+    'BSD-3-Clause-Clear': (PERMISSIVE, ('bsd-3-clause-clear',)),
+    'ISC': (PERMISSIVE, ()),
+    'Zlib': (PERMISSIVE, ()),
+    'BSL-1.0': (PERMISSIVE, ('boost',)),
+    'Unlicense': (PERMISSIVE, ('the-unlicense',)),
+    'CC0-1.0': (PERMISSIVE, ('cc0', 'public-domain')),
+    'WTFPL': (PERMISSIVE, ()),
+    'AFL-3.0': (PERMISSIVE, ()),
+    'ECL-2.0': (PERMISSIVE, ()),
+    'Artistic-2.0': (PERMISSIVE, ()),
+    'PostgreSQL': (PERMISSIVE, ()),
+    'NCSA': (PERMISSIVE, ()),
+    'OFL-1.1': (PERMISSIVE, ()),
+    'PDDL-1.0': (PERMISSIVE, ('pddl',)),
+    'ODC-By-1.0': (PERMISSIVE, ('odc-by',)),
+    'CC-BY-2.0': (PERMISSIVE, ()),
+    'CC-BY-3.0': (PERMISSIVE, ()),
+    'CC-BY-4.0': (PERMISSIVE, ('cc-by', 'creative-commons-attribution-4.0')),
+    'LGPL-2.1': (WEAK_COPYLEFT, ('lgpl-2', 'lgplv2.1', 'lesser-general-public-license-2.1')),
+    'LGPL-3.0': (WEAK_COPYLEFT, ('lgpl', 'lgplv3', 'lesser-general-public-license-3.0')),
+    'LGPLLR': (WEAK_COPYLEFT, ('lgpl-lr',)),
+    'MPL-2.0': (WEAK_COPYLEFT, ('mozilla-public-license-2.0',)),
+    'EPL-1.0': (WEAK_COPYLEFT, ()),
+    'EPL-2.0': (WEAK_COPYLEFT, ()),
+    'CDDL-1.0': (WEAK_COPYLEFT, ()),
+    'CC-BY-SA-3.0': (WEAK_COPYLEFT, ()),
+    'CC-BY-SA-4.0': (WEAK_COPYLEFT, ('cc-by-sa',)),
+    'GPL-2.0': (STRONG_COPYLEFT, ('gpl-2', 'gplv2', 'general-public-license-2.0')),
+    'GPL-3.0': (STRONG_COPYLEFT, ('gpl', 'gplv3', 'general-public-license-3.0')),
+    'OSL-3.0': (STRONG_COPYLEFT, ()),
+    'EUPL-1.2': (STRONG_COPYLEFT, ('eupl',)),
+    'AGPL-3.0': (NETWORK_COPYLEFT, ('agpl', 'agplv3', 'affero-general-public-license-3.0')),
+    'CC-BY-NC-2.0': (RESTRICTED, ()),
+    'CC-BY-NC-3.0': (RESTRICTED, ()),
+    'CC-BY-NC-4.0': (RESTRICTED, ('cc-by-nc',)),
+    'CC-BY-NC-SA-2.0': (RESTRICTED, ()),
+    'CC-BY-NC-SA-3.0': (RESTRICTED, ()),
+    'CC-BY-NC-SA-4.0': (RESTRICTED, ('cc-by-nc-sa',)),
+    'CC-BY-NC-ND-3.0': (RESTRICTED, ()),
+    'CC-BY-NC-ND-4.0': (RESTRICTED, ('cc-by-nc-nd',)),
+    'CC-BY-ND-4.0': (RESTRICTED, ('cc-by-nd',)),
+    'OpenRAIL': (RESTRICTED, ('open-rail',)),
+    'OpenRAIL++': (RESTRICTED, ('openrail++',)),
+    'CreativeML-OpenRAIL-M': (RESTRICTED, ()),
+    'BigScience-OpenRAIL-M': (RESTRICTED, ()),
+    'BigScience-BLOOM-RAIL-1.0': (RESTRICTED, ('bloom-rail',)),
+    'BigCode-OpenRAIL-M': (RESTRICTED, ()),
+    'Llama2': (RESTRICTED, ('llama-2', 'llama-2-community-license')),
+    'Llama3': (RESTRICTED, ('llama-3', 'meta-llama-3-community-license')),
+    'Llama3.1': (RESTRICTED, ('llama-3.1',)),
+    'Llama3.2': (RESTRICTED, ('llama-3.2',)),
+    'Llama3.3': (RESTRICTED, ('llama-3.3',)),
+    'Llama4': (RESTRICTED, ('llama-4',)),
+    'Gemma': (RESTRICTED, ('gemma-terms-of-use',)),
+    'DeepFloyd-IF-License': (RESTRICTED, ('deepfloyd-if',)),
+    'Apple-ASCL': (RESTRICTED, ('apple-amlr',)),
+    UNKNOWN_LICENSE: (UNKNOWN, ('other', 'unknown', 'custom', 'proprietary')),
+}
+
+# license_link fragments for 'license: other' cards, checked in order
+LINK_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    ('apache.org/licenses/license-2.0', 'Apache-2.0'),
+    ('opensource.org/licenses/mit', 'MIT'),
+    ('gnu.org/licenses/agpl', 'AGPL-3.0'),
+    ('gnu.org/licenses/lgpl-3', 'LGPL-3.0'),
+    ('gnu.org/licenses/old-licenses/lgpl-2.1', 'LGPL-2.1'),
+    ('gnu.org/licenses/gpl-3', 'GPL-3.0'),
+    ('gnu.org/licenses/old-licenses/gpl-2', 'GPL-2.0'),
+    ('creativecommons.org/licenses/by-nc-sa/4.0', 'CC-BY-NC-SA-4.0'),
+    ('creativecommons.org/licenses/by-nc/4.0', 'CC-BY-NC-4.0'),
+    ('creativecommons.org/licenses/by-sa/4.0', 'CC-BY-SA-4.0'),
+    ('creativecommons.org/licenses/by/4.0', 'CC-BY-4.0'),
+    ('llama.meta.com/llama3', 'Llama3'),
+    ('ai.google.dev/gemma/terms', 'Gemma'),
+)
+
+# Outbound licenses each inbound license can additionally be relicensed into,
+# beyond the category rules in _compatible (GPL "or later" is not assumed)
+EXTRA_COMPATIBLE: Dict[str, Tuple[str, ...]] = {
+    'LGPL-2.1': ('LGPL-3.0', 'GPL-2.0', 'GPL-3.0', 'AGPL-3.0'),
+    'LGPL-3.0': ('GPL-3.0', 'AGPL-3.0'),
+    'MPL-2.0': ('LGPL-2.1', 'LGPL-3.0', 'GPL-2.0', 'GPL-3.0', 'AGPL-3.0'),
+    'CC-BY-SA-4.0': ('GPL-3.0',),
+    'GPL-3.0': ('AGPL-3.0',),
+}
+
+# Permissive licenses whose patent terms conflict with the GPLv2 family
+EXCLUDED: Dict[str, Tuple[str, ...]] = {
+    'Apache-2.0': ('GPL-2.0', 'LGPL-2.1'),
+}
+
+# Model card scores by category; no declared license at all scores 0.5
+CATEGORY_SCORES = {
+    PERMISSIVE: 0.9,
+    WEAK_COPYLEFT: 0.9,
+    STRONG_COPYLEFT: 0.9,
+    NETWORK_COPYLEFT: 0.9,
+    RESTRICTED: 0.6,
+    UNKNOWN: 0.6,
+}
+NO_LICENSE_SCORE = 0.5
+
+INDEX_FORMAT = 1
+CACHE_ENV = 'LICENSE_INDEX_CACHE'
+# License the project is distributed under, for the admin compatibility report.
+# The project declares none itself, so no verdict is given unless it is set.
+PROJECT_LICENSE_ENV = 'PROJECT_LICENSE'
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'ece46100', 'license_index.json')
+
+_VERSION_SUFFIX = re.compile(r'(-only|-or-later|\+)$')
+_SEPARATORS = re.compile(r'[\s_/]+')
+
+
+def normalize(value: str) -> str:
+    """Lowercase, dash-separated form of a license string with SPDX suffixes removed"""
+    text = _SEPARATORS.sub('-', re.sub(r'[,;()]', '', value.strip().lower()))
+    text = re.sub(r'^(the|gnu)-', '', text)
+    text = re.sub(r'-version-|-v(?=\d)', '-', text)
+    text = re.sub(r'-licen[cs]e$', '', text)
+    return _VERSION_SUFFIX.sub('', text)
+
+
+def _variants(name: str) -> Iterable[str]:
+    """Spellings of a license id: as written, without '.0', without dashes"""
+    base = normalize(name)
+    for text in (base, base.replace('.0', '')):
+        yield text
+        yield text.replace('-', '')
+
+
+def _compatible(inbound: str, outbound: str) -> bool:
+    """Can work under inbound be combined into a work distributed under outbound?"""
+    if UNKNOWN in (LICENSES[inbound][0], LICENSES[outbound][0]):
+        return False  # Two unrecognized licenses are not known to be the same one
+    if inbound == outbound:
+        return True
+    if outbound in EXCLUDED.get(inbound, ()):
+        return False
+    category = LICENSES[inbound][0]
+    if category == PERMISSIVE:
+        return True
+    return outbound in EXTRA_COMPATIBLE.get(inbound, ())
+
+
+def _fingerprint() -> str:
+    """Changes whenever the tables above change, invalidating the disk cache"""
+    source = json.dumps([INDEX_FORMAT, LICENSES, LINK_PATTERNS, EXTRA_COMPATIBLE, EXCLUDED],
+                        sort_keys=True)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+class LicenseIndex:
+    """Alias -> SPDX id lookup table plus a dense compatibility matrix"""
+
+    def __init__(self, ids: List[str], aliases: Dict[str, str], matrix: List[str]):
+        self.ids = ids
+        self.aliases = aliases
+        self._position = {spdx_id: i for i, spdx_id in enumerate(ids)}
+        self._matrix = matrix  # One '0'/'1' string per inbound license
+
+    @classmethod
+    def build(cls) -> 'LicenseIndex':
+        ids = list(LICENSES)
+        aliases: Dict[str, str] = {}
+        for spdx_id, (_, extra) in LICENSES.items():
+            for name in (spdx_id,) + extra:
+                for variant in _variants(name):
+                    aliases.setdefault(variant, spdx_id)  # Earlier entries win clashes
+        matrix = [''.join('1' if _compatible(a, b) else '0' for b in ids) for a in ids]
+        return cls(ids, aliases, matrix)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'LicenseIndex':
+        """Index from the disk cache, rebuilding (and rewriting) it if stale or missing"""
+        path = path or os.environ.get(CACHE_ENV) or DEFAULT_CACHE_PATH
+        fingerprint = _fingerprint()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('fingerprint') == fingerprint:
+                return cls(cached['ids'], cached['aliases'], cached['matrix'])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            pass
+
+        index = cls.build()
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fingerprint': fingerprint, 'ids': index.ids,
+                           'aliases': index.aliases, 'matrix': index._matrix}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # A read-only home directory only costs a rebuild per process
+        return index
+
+    def lookup(self, value: Any) -> Optional[str]:
+        """SPDX id for one license string, or None if it is not recognized"""
+        if not isinstance(value, str) or not value.strip():
+            return None
+        return self.aliases.get(normalize(value))
+
+    def resolve(self, license_value: Any, license_name: Any = None,
+                license_link: Any = None) -> Optional[str]:
+        """SPDX id for a model card's license fields; None if no license is declared
+
+        license_value may be a list (dual licensing); the most open entry wins.
+        'other' is resolved through license_name, then license_link.
+        """
+        if isinstance(license_value, (list, tuple)):
+            resolved = [self.resolve(value, license_name, license_link) for value in license_value]
+            resolved = [spdx_id for spdx_id in resolved if spdx_id is not None]
+            return max(resolved, key=self.score, default=None)
+        if license_value is None or (isinstance(license_value, str) and not license_value.strip()):
+            return None
+
+        spdx_id = self.lookup(license_value)
+        if spdx_id == UNKNOWN_LICENSE or spdx_id is None:
+            spdx_id = self.lookup(license_name) or self._from_link(license_link) or spdx_id
+        return spdx_id or UNKNOWN_LICENSE
+
+    def _from_link(self, link: Any) -> Optional[str]:
+        if not isinstance(link, str):
+            return None
+        link = link.strip().lower()
+        for fragment, spdx_id in LINK_PATTERNS:
+            if fragment in link:
+                return spdx_id
+        return None
+
+    def category(self, spdx_id: Optional[str]) -> str:
+        return LICENSES[spdx_id][0] if spdx_id in LICENSES else UNKNOWN
+
+    def score(self, spdx_id: Optional[str]) -> float:
+        if spdx_id is None:
+            return NO_LICENSE_SCORE
+        return CATEGORY_SCORES[self.category(spdx_id)]
+
+    def compatible(self, inbound: str, outbound: str) -> bool:
+        """O(1) matrix lookup; unrecognized licenses are never compatible"""
+        row = self._position.get(inbound)
+        column = self._position.get(outbound)
+        if row is None or column is None:
+            return False
+        return self._matrix[row][column] == '1'
+
+
+_index: Optional[LicenseIndex] = None
+_index_lock = threading.Lock()
+
+
+def license_index() -> LicenseIndex:
+    """The process-wide index, loaded from the disk cache on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = LicenseIndex.load()
+        return _index
+
+
+def detect_license(model_data: Any) -> Optional[str]:
+    """SPDX id declared by a model_info() response, with no further Hub requests
+
+    Reads card_data license/license_name/license_link, falling back to the
+    'license:*' tags the Hub derives from the card.
+    """
+    index = license_index()
+    card_data = getattr(model_data, 'card_data', None)
+    if card_data:
+        spdx_id = index.resolve(getattr(card_data, 'license', None),
+                                getattr(card_data, 'license_name', None),
+                                getattr(card_data, 'license_link', None))
+        if spdx_id is not None:
+            return spdx_id
+
+    tags = getattr(model_data, 'tags', None)
+    if isinstance(tags, (list, tuple)):
+        declared = [tag.split(':', 1)[1] for tag in tags
+                    if isinstance(tag, str) and tag.startswith('license:')]
+        if declared:
+            return index.resolve(declared)
+    return None
+
+
+def project_license() -> Optional[str]:
+    """The project license configured in PROJECT_LICENSE, or None if unset"""
+    return os.environ.get(PROJECT_LICENSE_ENV, '').strip() or None
+
+
+def license_report(names: Iterable[str], project_license: Optional[str] = None) -> List[str]:
+    """One line per license name: SPDX id, category and, given a project license,
+    compatibility with it
+
+    Raises ValueError if project_license is not a recognized license.
+    """
+    index = license_index()
+    outbound = None
+    if project_license is not None:
+        outbound = index.resolve(project_license)
+        if outbound is None or outbound == UNKNOWN_LICENSE:
+            raise ValueError(f"unrecognized project license: {project_license}")
+    lines = []
+    for name in names:
+        spdx_id = index.resolve(name)
+        if spdx_id is None or spdx_id == UNKNOWN_LICENSE:
+            lines.append(f"{name:<24} {'unrecognized':<24} {UNKNOWN:<17} check manually")
+            continue
+        line = f"{name:<24} {spdx_id:<24} {index.category(spdx_id):<17}"
+        if outbound is not None:
+            verdict = 'compatible' if index.compatible(spdx_id, outbound) else 'INCOMPATIBLE'
+            line += f" {verdict} with {outbound}"
+        lines.append(line.rstrip())
+    return lines
@@ -0,0 +1,233 @@
+"""
+Hub metadata layer for run.py
+Fetches each model's ModelInfo once per run, slims it to a ModelRecord and shares
+it across the metric evaluators
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from hub_throttle import RateLimited, ThrottledApi
+from model_record import ModelRecord
+from singleflight import SingleFlight
+from size_metric import ModelSize, measure_size
+
+# Lookup outcomes. The evaluators map each one to their own fallback score.
+STATUS_OK = 'ok'
+STATUS_NO_HUB = 'no_hub'              # huggingface_hub is not installed
+STATUS_CLIENT_ERROR = 'client_error'  # HfApi() could not be constructed
+STATUS_FETCH_ERROR = 'fetch_error'    # model_info() failed (missing/private repo, network)
+STATUS_RATE_LIMITED = 'rate_limited'  # Still throttled (HTTP 429) after every retry; not memoized
+
+# Repos kept in memory per run. Bounded so streaming huge URL files stays flat;
+# anything older is refetched (or served by the on-disk cache) if it reappears.
+DEFAULT_MEMO_SIZE = 4096
+
+
+def _sha_of(data: Any) -> Optional[str]:
+    sha = getattr(data, 'sha', None)
+    return sha if isinstance(sha, str) and sha else None
+
+
+class ModelMetadata:
+    """Outcome of a single model_info lookup, shared by every metric of a model"""
+
+    __slots__ = ('repo_id', 'status', 'data', 'error', 'latency')
+
+    def __init__(self, repo_id: str, status: str, data: Any = None,
+                 error: Optional[BaseException] = None, latency: float = 0.0):
+        self.repo_id = repo_id
+        self.status = status
+        self.data = data
+        self.error = error
+        self.latency = latency  # Milliseconds spent in model_info()
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+    def __repr__(self):
+        return f"ModelMetadata({self.repo_id!r}, status={self.status!r})"
+
+
+class MetadataFetcher:
+    """Per-run metadata layer: one model_info() round trip per repo
+
+    Safe to share between the worker threads of a concurrent run. Workers
+    asking for the same repo at once (duplicate URLs, shared lineage) wait on
+    a single request through a SingleFlight.
+    """
+
+    def __init__(self, api_factory: Optional[Callable[[], Any]], cache: Optional[Any] = None,
+                 memo_size: int = DEFAULT_MEMO_SIZE, request_timeout: Optional[float] = None,
+                 throttle: Optional[Any] = None, hedge: Optional[Any] = None,
+                 files_metadata: bool = True):
+        # api_factory is normally HfApi; None means huggingface_hub is unavailable.
+        # cache is an optional hub_cache.MetadataCache persisted across runs.
+        # request_timeout (seconds) bounds every model_info() call.
+        # throttle is an optional hub_throttle.HubThrottle every Hub request goes through.
+        # hedge is an optional hedging.HedgePolicy applied to full metadata fetches.
+        # files_metadata asks for per-file sizes too; only needed when a metric reads them.
+        self._api_factory = api_factory
+        self._request_timeout = request_timeout
+        self._throttle = throttle
+        self._hedge = hedge
+        self._files_metadata = files_metadata
+        self._cache = cache
+        self._api = None
+        self._api_error = None
+        self._memo_size = memo_size
+        self._results: 'OrderedDict[Tuple[str, Optional[str]], ModelMetadata]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self.fetch_count = 0
+
+    @property
+    def cache(self):
+        """The on-disk hub_cache.MetadataCache behind this fetcher, if any"""
+        return self._cache
+
+    def client(self):
+        """Build the Hub client lazily, once per run"""
+        with self._lock:
+            if self._api is None and self._api_error is None:
+                try:
+                    self._api = self._api_factory()
+                    if self._throttle is not None:
+                        self._api = ThrottledApi(self._api, self._throttle)
+                except Exception as e:
+                    self._api_error = e
+            return self._api
+
+    def get(self, repo_id: str, revision: Optional[str] = None) -> ModelMetadata:
+        """Return metadata for repo_id, fetching it from the Hub on first use"""
+        key = (repo_id, revision)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                self._results.move_to_end(key)
+                return cached
+
+        return self._flights.do(('metadata',) + key, lambda: self._fetch_new(key))
+
+    def _fetch_new(self, key: Tuple[str, Optional[str]]) -> ModelMetadata:
+        """Fetch and memoize; runs once per key at a time (see SingleFlight)"""
+        with self._lock:
+            # Memoized by a flight that finished since get() looked
+            cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        metadata = self._fetch(*key)
+        if metadata.status == STATUS_RATE_LIMITED:
+            return metadata  # Throttling says nothing about the repo; ask again next time
+        with self._lock:
+            self._results[key] = metadata
+            while len(self._results) > self._memo_size:
+                self._results.popitem(last=False)
+        return metadata
+
+    def _fetch(self, repo_id: str, revision: Optional[str]) -> ModelMetadata:
+        if self._api_factory is None:
+            return ModelMetadata(repo_id, STATUS_NO_HUB)
+
+        files = self._files_metadata
+        entry = self._cache.lookup(repo_id, revision, files) if self._cache is not None else None
+        if entry is not None and entry.is_fresh(self._cache.ttl):
+            self._cache.touch(repo_id, revision, files=entry.files)
+            self._cache.record('hits')
+            return ModelMetadata(repo_id, STATUS_OK, data=ModelRecord.from_model_info(entry.data))
+
+        api = self.client()
+        if api is None:
+            return ModelMetadata(repo_id, STATUS_CLIENT_ERROR, error=self._api_error)
+
+        if entry is not None and self._revalidate(api, repo_id, revision, entry):
+            self._cache.touch(repo_id, revision, revalidated=True, files=entry.files)
+            self._cache.record('revalidated')
+            return ModelMetadata(repo_id, STATUS_OK, data=ModelRecord.from_model_info(entry.data))
+
+        with self._lock:
+            self.fetch_count += 1
+        start_ns = time.perf_counter_ns()
+        try:
+            # files_metadata adds per-file sizes to siblings in the same round trip
+            extra = {'files_metadata': True} if files else {}
+            fetch = lambda: self._model_info(api, repo_id, revision, **extra)
+            data = fetch() if self._hedge is None else self._hedge.call(fetch)
+            # Keep only what the metrics read; the full response is dropped here
+            data = ModelRecord.from_model_info(data)
+            status, error = STATUS_OK, None
+        except RateLimited as e:
+            data, status, error = None, STATUS_RATE_LIMITED, e
+        except Exception as e:
+            data, status, error = None, STATUS_FETCH_ERROR, e
+        latency = (time.perf_counter_ns() - start_ns) / 1e6
+
+        if self._cache is not None:
+            self._cache.record('misses')
+            if status == STATUS_OK:
+                self._cache.store(repo_id, revision, data, files)
+
+        return ModelMetadata(repo_id, status, data=data, error=error, latency=latency)
+
+    def model_size(self, repo_id: str, revision: Optional[str], metadata: ModelMetadata) -> ModelSize:
+        """Size of a fetched model, measured once per commit and cached on disk"""
+        sha = _sha_of(metadata.data)
+        if self._cache is not None and sha:
+            cached = self._cache.lookup_size(repo_id, sha)
+            if cached is not None:
+                return ModelSize(*cached)
+
+        size = self._flights.do(('size', repo_id, sha or revision),
+                                lambda: measure_size(self.client(), repo_id, revision, metadata.data))
+        if self._cache is not None and sha:
+            self._cache.store_size(repo_id, sha, *size)
+        return size
+
+    def _model_info(self, api, repo_id: str, revision: Optional[str], **kwargs):
+        if revision is not None:
+            kwargs['revision'] = revision
+        if self._request_timeout is not None:
+            kwargs['timeout'] = self._request_timeout
+        return api.model_info(repo_id, **kwargs)
+
+    def current_sha(self, repo_id: str, revision: Optional[str] = None) -> Optional[str]:
+        """Commit sha a repo revision points at now, or None if it cannot be determined
+
+        Answered from metadata already fetched this run or a fresh cache entry when
+        possible; otherwise asks the Hub for the sha alone, which is far cheaper than
+        a full model_info() response.
+        """
+        if self._api_factory is None:
+            return None
+        with self._lock:
+            known = self._results.get((repo_id, revision))
+        if known is not None and known.ok:
+            return _sha_of(known.data)
+
+        entry = self._cache.lookup(repo_id, revision, files=False) if self._cache is not None else None
+        if entry is not None and entry.sha and entry.is_fresh(self._cache.ttl):
+            return entry.sha
+
+        return self._flights.do(('sha', repo_id, revision), lambda: self._probe_sha(repo_id, revision))
+
+    def _probe_sha(self, repo_id: str, revision: Optional[str]) -> Optional[str]:
+        api = self.client()
+        if api is None:
+            return None
+        try:
+            probe = self._model_info(api, repo_id, revision, expand=['sha'])
+        except Exception:
+            return None
+        return _sha_of(probe)
+
+    def _revalidate(self, api, repo_id: str, revision: Optional[str], entry) -> bool:
+        """Ask the Hub for just sha/lastModified and compare with the cached entry"""
+        try:
+            probe = self._model_info(api, repo_id, revision, expand=['sha', 'lastModified'])
+        except Exception:
+            return False  # Fall back to a full fetch, which reports the failure
+        return entry.matches(getattr(probe, 'sha', None), getattr(probe, 'last_modified', None))
@@ -0,0 +1,134 @@
+"""
+Metric registry for run.py
+Every metric declares its relative cost, the Hub data it needs and its NetScore
+weight, so a run can evaluate only the metrics it asked for, fetch only the data
+those need, and evaluate the cheapest first to stop early on a NetScore bar
+"""
+
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+# Data a metric can depend on, and what obtaining it costs relative to scoring
+DATA_METADATA = 'metadata'    # The model_info() response shared by every metric
+DATA_FILES = 'files'          # Safetensors headers read with range requests
+DATA_COST = {DATA_METADATA: 10.0, DATA_FILES: 20.0}
+
+NETSCORE_ROUNDING = 0.0005
+
+
+class MetricSpec(NamedTuple):
+    name: str
+    evaluate: Callable          # (model_info, metadata, fetcher) -> (score, latency_ms)
+    cost: float                 # Relative cost of scoring once the data is there
+    needs: FrozenSet[str]       # DATA_* the metric reads
+    weight: float               # Weight in the default NetScore profile
+    max_score: float = 1.0      # Best score the metric can return
+    opt_in: bool = False        # Runs only when named or weighted (see MetricRegistry.defaults)
+
+    @property
+    def total_cost(self) -> float:
+        return self.cost + sum(DATA_COST[need] for need in self.needs)
+
+
+class MetricRegistry:
+    """Metrics in output order, registered by name"""
+
+    def __init__(self):
+        self._specs: Dict[str, MetricSpec] = {}
+
+    def register(self, name: str, evaluate: Callable, cost: float, needs: Iterable[str] = (),
+                 weight: float = 0.0, max_score: float = 1.0, opt_in: bool = False) -> MetricSpec:
+        unknown = set(needs) - set(DATA_COST)
+        if unknown:
+            raise ValueError(f"unknown data dependency for {name}: {sorted(unknown)}")
+        spec = self._specs[name] = MetricSpec(name, evaluate, cost, frozenset(needs), weight, max_score,
+                                                   opt_in)
+        return spec
+
+    def names(self) -> List[str]:
+        return list(self._specs)
+
+    def __getitem__(self, name: str) -> MetricSpec:
+        return self._specs[name]
+
+    def defaults(self) -> List[MetricSpec]:
+        """Metrics evaluated when none are named; an opt-in metric joins them only while weighted"""
+        return [spec for spec in self._specs.values() if not spec.opt_in or spec.weight > 0]
+
+    def plan(self, names: Optional[Iterable[str]] = None,
+             min_netscore: Optional[float] = None) -> 'MetricPlan':
+        """Evaluation plan for the named metrics (the defaults when names is None)"""
+        if names is None:
+            return MetricPlan(self.defaults(), min_netscore)
+        if isinstance(names, str):
+            names = names.split(',')
+        lookup = {name.lower(): spec for name, spec in self._specs.items()}
+        specs = []
+        for name in names:
+            spec = lookup.get(name.strip().lower())
+            if spec is None:
+                raise ValueError(f"unknown metric {name.strip()!r} (choose from {', '.join(self._specs)})")
+            if spec not in specs:
+                specs.append(spec)
+        if not specs:
+            raise ValueError("no metrics selected")
+        # Keep output order, whatever order they were asked for in
+        return MetricPlan([spec for spec in self._specs.values() if spec in specs], min_netscore,
+                          complete=set(specs) == set(self.defaults()),
+                          rescale=any(spec.weight > 0 and spec not in specs
+                                      for spec in self._specs.values()))
+
+
+class MetricPlan:
+    """Which metrics a run evaluates, in what order, and the NetScore weights they get
+
+    Metrics are evaluated cheapest first (data cost included). When a subset
+    of the weighted metrics is selected, their weights are rescaled to sum to 1
+    so NetScore keeps its 0-1 range. With min_netscore the plan also counts
+    the models kept, dropped and stopped early.
+    """
+
+    def __init__(self, specs: List[MetricSpec], min_netscore: Optional[float] = None,
+                 complete: bool = True, rescale: bool = False):
+        self.specs = specs
+        self.names = [spec.name for spec in specs]
+        self.order = sorted(specs, key=lambda spec: spec.total_cost)
+        self.min_netscore = min_netscore
+        self.complete = complete
+        self.needs = frozenset().union(*(spec.needs for spec in specs))
+        weights = {spec.name: spec.weight for spec in specs if spec.weight > 0}
+        total = sum(weights.values())
+        if rescale and total > 0:
+            weights = {name: weight / total for name, weight in weights.items()}
+        self.weights = weights
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {'kept': 0, 'dropped': 0, 'stopped_early': 0}
+
+    def best_net_score(self, scores: Dict[str, Optional[float]]) -> float:
+        """Highest NetScore still possible given the scores known so far"""
+        best = 0.0
+        for spec in self.specs:
+            weight = self.weights.get(spec.name, 0.0)
+            score = scores[spec.name] if spec.name in scores else spec.max_score
+            best += (score or 0.0) * weight  # None: timed out, counts as 0
+        return best
+
+    def cannot_reach(self, scores: Dict[str, Optional[float]]) -> bool:
+        """True once the bar is out of reach, so the remaining metrics can be skipped"""
+        # NetScore is rounded to 3 places; never skip a model that would round up to the bar
+        return (self.min_netscore is not None
+                and self.best_net_score(scores) < self.min_netscore - NETSCORE_ROUNDING)
+
+    def passes(self, net_score: Optional[float]) -> bool:
+        return self.min_netscore is None or (net_score is not None and net_score >= self.min_netscore)
+
+    def record(self, kept: bool, stopped_early: bool = False):
+        with self._lock:
+            self.stats['kept' if kept else 'dropped'] += 1
+            if stopped_early:
+                self.stats['stopped_early'] += 1
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (f"NetScore >= {self.min_netscore:g}: {stats['kept']} models kept, "
+                f"{stats['dropped']} dropped ({stats['stopped_early']} stopped early)")
@@ -0,0 +1,132 @@
+"""
+Slim model metadata for run.py
+A ModelRecord keeps only the model_info() fields the metrics read, in __slots__,
+instead of the full huggingface_hub ModelInfo (blob ids and LFS hashes of every
+file, the whole model card, config, widget data...), and has a compact binary
+form for the on-disk metadata cache
+"""
+
+import marshal
+from typing import Any, Dict, NamedTuple, Optional
+
+# Prefix of the binary form; bump the digit whenever its layout changes
+RECORD_FORMAT = b'MR1'
+
+_FIELDS = ('sha', 'last_modified', 'tags', 'card_data', 'siblings', 'safetensors')
+_UNSET = object()
+
+
+class FileRecord(NamedTuple):
+    rfilename: str
+    size: Optional[int]         # Bytes, from the LFS pointer for large files
+
+
+class CardRecord(NamedTuple):
+    license: Any                # str, or a list of str on multi-licensed cards
+    license_name: Any
+    license_link: Any
+
+
+class SafetensorsRecord(NamedTuple):
+    parameters: Dict[str, int]  # Parameter count per dtype
+
+
+def file_size(sibling: Any) -> Optional[int]:
+    """Bytes of a model_info() sibling, from the LFS pointer for large files; None if unknown"""
+    size = getattr(sibling, 'size', None)
+    if not isinstance(size, int):
+        size = getattr(getattr(sibling, 'lfs', None), 'size', None)
+    return size if isinstance(size, int) else None
+
+
+def _slim(field: str, value: Any) -> Any:
+    """Compact form of one model_info() field; values of unexpected types are kept"""
+    if field == 'tags' and isinstance(value, (list, tuple)):
+        return tuple(value)
+    if field == 'card_data' and value and not isinstance(value, CardRecord):
+        return CardRecord(getattr(value, 'license', None), getattr(value, 'license_name', None),
+                          getattr(value, 'license_link', None))
+    if field == 'siblings' and isinstance(value, (list, tuple)):
+        return tuple(FileRecord(str(getattr(sibling, 'rfilename', '')), file_size(sibling))
+                     for sibling in value)
+    if field == 'safetensors' and value is not None and not isinstance(value, SafetensorsRecord):
+        parameters = getattr(value, 'parameters', None)
+        return SafetensorsRecord(dict(parameters)) if isinstance(parameters, dict) else None
+    return value
+
+
+class ModelRecord:
+    """The parts of a model_info() response the metrics use
+
+    Attribute names match ModelInfo, so the evaluators read either. A field
+    the response did not have stays unset and hasattr() is False, as it was on
+    the response.
+    """
+
+    __slots__ = _FIELDS
+
+    @classmethod
+    def from_model_info(cls, info: Any) -> 'ModelRecord':
+        if isinstance(info, cls):
+            return info
+        record = cls()
+        for field in _FIELDS:
+            try:
+                value = getattr(info, field)
+            except AttributeError:
+                continue
+            setattr(record, field, _slim(field, value))
+        return record
+
+    def to_bytes(self) -> bytes:
+        """Binary form for hub_cache; raises ValueError if a field is not plain data"""
+        present = 0
+        values = []
+        for bit, field in enumerate(_FIELDS):
+            try:
+                value = getattr(self, field)
+            except AttributeError:
+                continue
+            present |= 1 << bit
+            if field == 'last_modified' and hasattr(value, 'isoformat'):
+                value = (value.isoformat(),)  # A datetime; a 1-tuple tells it from a string
+            elif field == 'safetensors' and isinstance(value, SafetensorsRecord):
+                value = value.parameters
+            elif field == 'siblings' and isinstance(value, tuple):
+                value = tuple(tuple(sibling) for sibling in value)
+            elif isinstance(value, tuple):
+                value = tuple(value)  # marshal only takes exact tuples, not NamedTuples
+            values.append(value)
+        return RECORD_FORMAT + marshal.dumps((present, tuple(values)))
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> 'ModelRecord':
+        payload = bytes(payload)
+        if not payload.startswith(RECORD_FORMAT):
+            raise ValueError("not a ModelRecord payload")
+        present, values = marshal.loads(payload[len(RECORD_FORMAT):])
+        record = cls()
+        values = iter(values)
+        for bit, field in enumerate(_FIELDS):
+            if not present & (1 << bit):
+                continue
+            value = next(values)
+            if field == 'last_modified' and isinstance(value, tuple):
+                from datetime import datetime
+                value = datetime.fromisoformat(value[0])
+            elif field == 'card_data' and isinstance(value, tuple):
+                value = CardRecord(*value)
+            elif field == 'siblings' and isinstance(value, tuple):
+                value = tuple(FileRecord(*sibling) for sibling in value)
+            elif field == 'safetensors' and isinstance(value, dict):
+                value = SafetensorsRecord(value)
+            setattr(record, field, value)
+        return record
+
+    def __eq__(self, other):
+        if not isinstance(other, ModelRecord):
+            return NotImplemented
+        return all(getattr(self, field, _UNSET) == getattr(other, field, _UNSET) for field in _FIELDS)
+
+    def __repr__(self):
+        return f"ModelRecord(sha={getattr(self, 'sha', None)!r})"
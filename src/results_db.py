@@ -0,0 +1,200 @@
+"""
+SQLite sink and query API for scoring results
+Every result row is written in batched transactions, with indexes so dashboard
+queries (top models, repo history, metric thresholds) never scan the whole table
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from canonical import canonicalize_url
+from pipeline import iter_url_lines, STDIN_PATH
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_REVISION = 'main'
+BUSY_TIMEOUT = 30  # Seconds to wait for another process holding the write lock
+
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id            INTEGER PRIMARY KEY,
+    url           TEXT NOT NULL,
+    repo_id       TEXT NOT NULL,
+    revision      TEXT NOT NULL,
+    scored_at     REAL NOT NULL,
+    net_score     REAL NOT NULL,
+    fetch_latency INTEGER,
+    result        TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metric_scores (
+    result_id INTEGER NOT NULL REFERENCES results (id),
+    metric    TEXT NOT NULL,
+    score     REAL NOT NULL,
+    latency   INTEGER,
+    PRIMARY KEY (result_id, metric)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_results_net_score ON results (net_score DESC);
+CREATE INDEX IF NOT EXISTS idx_results_repo ON results (repo_id, scored_at);
+CREATE INDEX IF NOT EXISTS idx_metric_scores_metric ON metric_scores (metric, score);
+"""
+
+# Keys of a result row that are not per-metric scores
+_RESULT_FIELDS = {'URL', 'NetScore', 'Fetch_Latency'}
+_LATENCY_SUFFIX = '_Latency'
+
+
+def _repo_key(url: str) -> Tuple[str, str]:
+    """(lowercased repo id, revision) a result URL was scored at"""
+    canonical = canonicalize_url(url)
+    if canonical is None:
+        return url.strip(), DEFAULT_REVISION
+    return canonical.repo_id.lower(), canonical.revision or DEFAULT_REVISION
+
+
+def _metric_scores(result: Dict) -> Iterable[Tuple[str, float, Optional[int]]]:
+    """(metric, score, latency) for every scored metric in a result row"""
+    for key, value in result.items():
+        if key in _RESULT_FIELDS or key.endswith(_LATENCY_SUFFIX):
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield key, value, result.get(key + _LATENCY_SUFFIX)
+
+
+class ResultsDB:
+    """Append-only store of every scoring result, queryable by index
+
+    Rows are buffered and written batch_size at a time with executemany inside
+    a single transaction; call flush() or close() to write the remainder.
+    """
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Dict, float]] = []
+        self._conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self.written = 0
+
+    def add(self, result: Dict, scored_at: Optional[float] = None):
+        """Queue one result row, writing the batch once it is full"""
+        with self._lock:
+            self._pending.append((result, time.time() if scored_at is None else scored_at))
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+
+    def flush(self):
+        with self._lock:
+            self._write_pending()
+
+    def _write_pending(self):
+        """Write every queued row in one transaction (lock held)"""
+        if not self._pending:
+            return
+        with self._conn:
+            # Take the write lock before allocating ids; shard processes may share the file
+            self._conn.execute("BEGIN IMMEDIATE")
+            first_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM results").fetchone()[0]
+            rows, scores = [], []
+            for offset, (result, scored_at) in enumerate(self._pending):
+                result_id = first_id + offset
+                repo_id, revision = _repo_key(result['URL'])
+                rows.append((result_id, result['URL'], repo_id, revision, scored_at,
+                             result['NetScore'], result.get('Fetch_Latency'), json.dumps(result)))
+                scores.extend((result_id,) + score for score in _metric_scores(result))
+            self._conn.executemany(
+                "INSERT INTO results (id, url, repo_id, revision, scored_at, net_score, "
+                "fetch_latency, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.executemany(
+                "INSERT INTO metric_scores (result_id, metric, score, latency) "
+                "VALUES (?, ?, ?, ?)", scores)
+        self.written += len(self._pending)
+        self._pending.clear()
+
+    def _query(self, sql: str, params: Tuple) -> List[Dict]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(json.loads(result), scored_at=scored_at, revision=revision)
+                for result, scored_at, revision in rows]
+
+    def top(self, n: int = 10) -> List[Dict]:
+        """The n highest NetScore results"""
+        return self._query(
+            "SELECT result, scored_at, revision FROM results "
+            "ORDER BY net_score DESC LIMIT ?", (n,))
+
+    def history(self, repo_id: str) -> List[Dict]:
+        """Every result recorded for a repo (any revision), oldest first"""
+        return self._query(
+            "SELECT result, scored_at, revision FROM results "
+            "WHERE repo_id = ? ORDER BY scored_at", (repo_id.lower(),))
+
+    def above(self, metric: str, threshold: float, limit: Optional[int] = None) -> List[Dict]:
+        """Results whose metric (e.g. 'License' or 'NetScore') is at least threshold"""
+        if metric == 'NetScore':
+            sql = ("SELECT result, scored_at, revision FROM results "
+                   "WHERE net_score >= ? ORDER BY net_score DESC")
+            params: Tuple = (threshold,)
+        else:
+            sql = ("SELECT r.result, r.scored_at, r.revision FROM metric_scores m "
+                   "JOIN results r ON r.id = m.result_id "
+                   "WHERE m.metric = ? AND m.score >= ? ORDER BY m.score DESC")
+            params = (metric, threshold)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return self._query(sql, params)
+
+    def iter_results(self, batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """Every stored result row in insertion order, read batch_size rows at a time"""
+        self.flush()
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, result FROM results WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size or self.batch_size)).fetchall()
+            if not rows:
+                return
+            for last_id, result in rows:
+                yield json.loads(result)
+
+    def explain(self, sql: str, params: Tuple = ()) -> List[str]:
+        """SQLite's query plan for a statement, to confirm it uses an index"""
+        with self._lock:
+            return [row[-1] for row in self._conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+    def __len__(self):
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def summary(self) -> str:
+        return f"Results DB: {self.written} rows written to {self.path}"
+
+    def close(self):
+        with self._lock:
+            self._write_pending()
+            self._conn.close()
+
+
+def iter_stored_results(path: str) -> Iterator[Dict]:
+    """Results from a --results-db database or an NDJSON output file ('-' for stdin)"""
+    if path != STDIN_PATH:
+        with open(path, 'rb') as f:
+            is_sqlite = f.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+        if is_sqlite:
+            db = ResultsDB(path)
+            try:
+                yield from db.iter_results()
+            finally:
+                db.close()
+            return
+    for line in iter_url_lines(path):
+        yield json.loads(line)
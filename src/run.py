@@ -7,25 +7,65 @@ Handles installation, URL processing for model evaluation, and testing
 import sys
 import os
 import time
-import json
 import re
-import subprocess
-import requests
+import argparse
+from contextlib import ExitStack
 from urllib.parse import urlparse
-from typing import List, Dict, Tuple, Optional
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional, Iterable, Iterator, Callable
 
 # Add the src directory to Python path to import our modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-try:
-    from huggingface_hub import HfApi, InferenceClient
-    from huggingface_hub.utils import HfHubHTTPError
-except ImportError:
-    HfApi = None
-    InferenceClient = None
+# huggingface_hub (and requests/urllib3 behind it) takes hundreds of milliseconds
+# to import, so it is only loaded once a scoring run needs a Hub client. This keeps
+# ./run install and ./run test fast; run.HfApi can still be read and patched.
+_HUB_NAMES = ('HfApi', 'InferenceClient', 'HfHubHTTPError')
+
+def _load_hub():
+    """Import huggingface_hub on first use and return HfApi (None if not installed)"""
+    module_globals = globals()
+    if 'HfApi' not in module_globals:
+        try:
+            from huggingface_hub import HfApi, InferenceClient
+            from huggingface_hub.utils import HfHubHTTPError
+        except ImportError:
+            HfApi = InferenceClient = HfHubHTTPError = None
+        module_globals.setdefault('HfApi', HfApi)
+        module_globals.setdefault('InferenceClient', InferenceClient)
+        module_globals.setdefault('HfHubHTTPError', HfHubHTTPError)
+    return module_globals['HfApi']
+
+def __getattr__(name):
+    if name in _HUB_NAMES:
+        _load_hub()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+from canonical import canonicalize_url, split_repo_path, DuplicateTracker
+from deadline import Deadline, call_with_deadline, DEFAULT_REQUEST_TIMEOUT
+from hub_throttle import HubThrottle, RateLimited
+from metrics import MetricRegistry, MetricPlan, DATA_METADATA, DATA_FILES
+from size_metric import size_score
+from weights import DEFAULT_WEIGHTS, get_profile
+from pipeline import iter_url_lines, bounded_map, open_output, NDJSONWriter, STDIN_PATH
+from instrumentation import Instrumentation, STAGE_PARSE, STAGE_FETCH, STAGE_SCORE, STAGE_MODEL
+from metadata import (
+    MetadataFetcher, ModelMetadata,
+    STATUS_NO_HUB, STATUS_CLIENT_ERROR, STATUS_FETCH_ERROR, STATUS_RATE_LIMITED
+)
+
+if TYPE_CHECKING:
+    # Imported where an option needs them, so ./run and `import run` never load
+    # sqlite3, pickle, hashlib or subprocess unless the run uses them
+    from checkpoint import CheckpointJournal
+    from hedging import HedgePolicy
+    from hub_cache import MetadataCache
+    from incremental import ScoreStore
+    from scheduling import LatencyHistory
 
 def install():
     """Install dependencies from requirements.txt"""
+    import subprocess
     try:
         requirements_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'requirements.txt')
         if not os.path.exists(requirements_path):
@@ -48,6 +88,7 @@ def install():
     
 def run_tests():
     """Run test suite with coverage reporting"""
+    import subprocess
     try:
         # Try to install coverage if not available
         try:
@@ -107,33 +148,254 @@ def run_tests():
         print(f"Error running tests: {e}", file=sys.stderr)
         return 1
     
-def process_url_file(url_file_path: str):
-    """Process URL file and evaluate models"""
+def process_url_file(url_file_path: str, workers: int = 1, ordered: bool = True,
+                     cache_path: Optional[str] = None, cache_ttl: Optional[float] = None,
+                     cache_size: Optional[int] = None, record: Optional[str] = None,
+                     replay: Optional[str] = None, replay_latency: str = 'recorded',
+                     replay_seed: Optional[int] = None, stats: bool = False,
+                     dedupe: bool = True, checkpoint: Optional[str] = None,
+                     resume: bool = False, shard: Optional[Tuple[int, int]] = None,
+                     processes: int = 1, incremental: Optional[str] = None,
+                     results_db: Optional[str] = None,
+                     request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+                     model_deadline: Optional[float] = None,
+                     time_budget: Optional[float] = None,
+                     hub_concurrency: Optional[int] = None,
+                     hedge: Optional[float] = None,
+                     metrics: Optional[Iterable[str]] = None,
+                     min_netscore: Optional[float] = None,
+                     schedule_history: Optional[str] = None,
+                     line_buffered: Optional[bool] = None,
+                     output: Optional[str] = None):
+    """Process URL file and evaluate models
+    
+    cache_ttl and cache_size default to hub_cache.DEFAULT_TTL and DEFAULT_MAX_ENTRIES.
+    shard restricts the run to one hash partition of the model URLs; processes > 1
+    scores every partition in its own process and merges them in input order.
+    incremental names a ScoreStore whose results are reused for unchanged repos.
+    results_db names a SQLite ResultsDB that receives every complete result row as well.
+    request_timeout, model_deadline and time_budget (seconds) bound each Hub
+    call, each model and the whole run; see iter_evaluations.
+    hub_concurrency caps the Hub requests in flight (default: workers); the
+    run lowers it while the Hub answers 429 and raises it back afterwards.
+    hedge is a latency percentile (e.g. 95): a metadata fetch still running
+    after it gets a duplicate request and the first answer wins.
+    metrics names the metrics to evaluate (default: all); only the Hub data they
+    need is fetched. min_netscore writes only models reaching that NetScore,
+    evaluating cheap metrics first and stopping once a model cannot reach it.
+    schedule_history names earlier results (NDJSON output or a ResultsDB) whose
+    latencies order the work longest expected first.
+    line_buffered flushes every result line at once; by default that happens only
+    when stdout is a terminal, and other output is written in large chunks.
+    output names a file to write results to instead of stdout, compressed when it
+    ends in .gz, .xz or .bz2. The URL file may itself be gzip, xz or bz2 compressed.
+    """
+    cache = None
+    journal = None
+    store = None
+    results = None
+    writer = None
+    outputs = ExitStack()
     try:
-        if not os.path.exists(url_file_path):
+        if url_file_path != STDIN_PATH and not os.path.exists(url_file_path):
             print(f"Error: URL file not found: {url_file_path}", file=sys.stderr)
             return 1
         
-        # Read URLs from file
-        with open(url_file_path, 'r', encoding='ascii') as f:
-            urls = [line.strip() for line in f if line.strip()]
+        if processes > 1:
+            if url_file_path == STDIN_PATH or shard is not None:
+                print("Error: --processes needs a URL file and cannot be combined with --shard",
+                      file=sys.stderr)
+                return 1
+            options = {
+                'workers': workers, 'cache_path': cache_path, 'cache_ttl': cache_ttl,
+                'cache_size': cache_size, 'record': record, 'replay': replay,
+                'replay_latency': replay_latency, 'replay_seed': replay_seed, 'stats': stats,
+                'dedupe': dedupe, 'checkpoint': checkpoint, 'resume': resume,
+                'incremental': incremental, 'results_db': results_db,
+                'request_timeout': request_timeout, 'model_deadline': model_deadline,
+                'time_budget': time_budget, 'hub_concurrency': hub_concurrency,
+                'hedge': hedge, 'metrics': metrics, 'min_netscore': min_netscore,
+                'schedule_history': schedule_history, 'line_buffered': line_buffered,
+            }
+            from sharding import run_shards
+            out = outputs.enter_context(open_output(output)) if output else None
+            return run_shards(url_file_path, processes, options,
+                              url_lines=lambda: iter_url_lines(url_file_path),
+                              is_model=_is_model_url, out=out)
         
-        if not urls:
-            print("Error: No URLs found in file", file=sys.stderr)
+        if resume and not checkpoint:
+            print("Error: --resume requires --checkpoint PATH", file=sys.stderr)
             return 1
         
-        # Process URLs and evaluate models
-        model_results = evaluate_urls(urls)
+        plan = METRICS.plan(metrics, min_netscore)
+        if incremental and not plan.complete:
+            print("Error: --incremental stores the default metrics and cannot be combined with --metrics",
+                  file=sys.stderr)
+            return 1
+        if (min_netscore is not None or results_db) and not plan.weights:
+            print("Error: --min-netscore and --results-db need at least one metric that carries "
+                  "NetScore weight", file=sys.stderr)
+            return 1
+        
+        if cache_path:
+            from hub_cache import MetadataCache, DEFAULT_TTL, DEFAULT_MAX_ENTRIES
+            cache = MetadataCache(cache_path, ttl=DEFAULT_TTL if cache_ttl is None else cache_ttl,
+                                  max_entries=DEFAULT_MAX_ENTRIES if cache_size is None else cache_size)
+        
+        if checkpoint:
+            from checkpoint import CheckpointJournal
+            journal = CheckpointJournal(checkpoint, resume=resume)
+        
+        if incremental:
+            from incremental import ScoreStore
+            store = ScoreStore(incremental)
+        
+        if results_db:
+            # Only runs that write a results database pay for importing it
+            from results_db import ResultsDB
+            results = ResultsDB(results_db)
+        
+        history = None
+        if schedule_history:
+            if schedule_history != STDIN_PATH and not os.path.exists(schedule_history):
+                print(f"Error: latency history not found: {schedule_history}", file=sys.stderr)
+                return 1
+            from results_db import iter_stored_results
+            from scheduling import LatencyHistory
+            history = LatencyHistory.from_results(iter_stored_results(schedule_history),
+                                                  size_of=_cached_size(cache))
+        
+        if replay:
+            from hub_replay import parse_latency
+            parse_latency(replay_latency)  # Reject a bad spec before scoring starts
+            if not os.path.exists(replay):
+                print(f"Error: cassette not found: {replay}", file=sys.stderr)
+                return 1
+        # Replay never talks to the Hub, so it does not need huggingface_hub loaded
+        api_factory = None if replay else _load_hub()
+        if record or replay:
+            from hub_replay import make_api_factory
+            api_factory = make_api_factory(api_factory, record=record, replay=replay,
+                                           latency=replay_latency, seed=replay_seed)
         
-        # Output results in JSON format
-        for result in model_results:
-            print(json.dumps(result))
+        # Stream URLs through evaluation and write each result as soon as it is ready
+        urls = _CountingIterator(iter_url_lines(url_file_path))
+        out = outputs.enter_context(open_output(output)) if output else None
+        if line_buffered is None:
+            line_buffered = (out or sys.stdout).isatty()
+        writer = NDJSONWriter(out, streaming=line_buffered)
+        instrumentation = Instrumentation() if stats else None
+        throttle = HubThrottle(max_concurrency=hub_concurrency or workers)
+        hedging = None
+        if hedge is not None:
+            from hedging import HedgePolicy
+            hedging = HedgePolicy(hedge)
+        for result in iter_evaluations(urls, workers=workers, ordered=ordered, cache=cache,
+                                       api_factory=api_factory, stats=instrumentation,
+                                       dedupe=dedupe, journal=journal, shard=shard,
+                                       store=store, request_timeout=request_timeout,
+                                       model_deadline=model_deadline, time_budget=time_budget,
+                                       throttle=throttle, hedge=hedging, plan=plan,
+                                       history=history):
+            writer.write(result)
+            if results is not None and not is_partial(result):
+                # Missing metrics would count as 0 in its NetScore and skew top()/above()
+                results.add(result)
+        writer.flush()
+        
+        if urls.count == 0:
+            print("Error: No URLs found in file", file=sys.stderr)
+            return 1
+        
+        if journal is not None and resume:
+            print(f"Checkpoint: {journal.resumed} results replayed from {checkpoint}", file=sys.stderr)
+        if instrumentation is not None:
+            print(instrumentation.format_table(), file=sys.stderr)
+        if throttle.stats['throttled']:
+            print(throttle.summary(), file=sys.stderr)
+        if hedging is not None:
+            print(hedging.summary(), file=sys.stderr)
+        if min_netscore is not None:
+            print(plan.summary(), file=sys.stderr)
+        if history is not None:
+            print(f"Scheduling: longest expected first, {len(history)} models with latency history",
+                  file=sys.stderr)
+        if cache is not None:
+            print(cache.summary(), file=sys.stderr)
+        if store is not None:
+            print(store.summary(), file=sys.stderr)
+        if results is not None:
+            results.flush()
+            print(results.summary(), file=sys.stderr)
         
         return 0
         
     except Exception as e:
         print(f"Error processing URL file: {e}", file=sys.stderr)
         return 1
+    finally:
+        if writer is not None:
+            writer.flush()
+        if cache is not None:
+            cache.close()
+        if journal is not None:
+            journal.close()
+        if store is not None:
+            store.close()
+        if results is not None:
+            results.close()
+        outputs.close()
+
+def _cached_size(cache: Optional['MetadataCache']) -> Optional[Callable[[str], Optional[int]]]:
+    """Repo size lookup for scheduling estimates, served from the metadata cache"""
+    if cache is None:
+        return None
+    def size_of(url: str) -> Optional[int]:
+        info = extract_model_info(url)
+        return cache.cached_size(info['full_name'], info.get('revision'))
+    return size_of
+
+def merge_shard_files(url_file_path: str, shard_paths: List[str]) -> int:
+    """Recombine NDJSON outputs of --shard i/N runs (listed by i) in input order"""
+    try:
+        for path in [url_file_path] + shard_paths:
+            if not os.path.exists(path):
+                print(f"Error: file not found: {path}", file=sys.stderr)
+                return 1
+        from sharding import merge_outputs
+        merge_outputs(iter_url_lines(url_file_path), shard_paths, sys.stdout, _is_model_url)
+        return 0
+    except Exception as e:
+        print(f"Error merging shard outputs: {e}", file=sys.stderr)
+        return 1
+
+def rescore_stored(source: str, profile: str = 'default', profiles: Optional[str] = None,
+                   output: Optional[str] = None) -> int:
+    """Recompute NetScore for stored results with a weight profile; no Hub access
+
+    output names a file for the rescored NDJSON instead of stdout (compressed
+    when it ends in .gz, .xz or .bz2).
+    """
+    try:
+        weights = get_profile(profile, profiles)
+        if source != STDIN_PATH and not os.path.exists(source):
+            print(f"Error: results file not found: {source}", file=sys.stderr)
+            return 1
+        # NumPy is only needed here, so ordinary runs do not pay for importing it
+        from rescore import write_rescored
+        if output:
+            with open_output(output) as out:
+                count = write_rescored(source, weights, out)
+        else:
+            count = write_rescored(source, weights)
+        print(f"Rescored {count} results with profile {profile!r}", file=sys.stderr)
+        return 0
+    except Exception as e:
+        print(f"Error rescoring results: {e}", file=sys.stderr)
+        return 1
+
+def _is_model_url(url: str) -> bool:
+    return categorize_url(url) == 'model'
 
 def categorize_url(url: str) -> str:
     """Categorize URL as model, dataset, or code"""
@@ -149,59 +411,90 @@ def categorize_url(url: str) -> str:
 def extract_model_info(url: str) -> Dict[str, str]:
     """Extract model information from Hugging Face URL"""
     try:
-        # Parse HF model URL: https://huggingface.co/org/model-name
-        path_parts = urlparse(url).path.strip('/').split('/')
-        if len(path_parts) >= 2:
-            org = path_parts[0]
-            model_name = path_parts[1]
-            return {
+        # Parse HF model URL: https://huggingface.co/org/model-name[/tree/<revision>/...]
+        path_parts = split_repo_path(urlparse(url).path)
+        if path_parts is not None:
+            org, model_name, revision = path_parts
+            info = {
                 'organization': org,
                 'model_name': model_name,
                 'full_name': f"{org}/{model_name}",
                 'url': url
             }
+            if revision:
+                info['revision'] = revision
+            return info
     except Exception:
         pass
     
     return {'full_name': url, 'url': url}
 
-def evaluate_model_correctness(model_info: Dict[str, str]) -> Tuple[float, float]:
+def _elapsed_ms(start_ns: int) -> float:
+    """Milliseconds since a perf_counter_ns() reading"""
+    return (time.perf_counter_ns() - start_ns) / 1e6
+
+def fetch_model_metadata(model_info: Dict[str, str],
+                         fetcher: Optional[MetadataFetcher] = None) -> ModelMetadata:
+    """Look up Hub metadata for a model, through the run's shared fetcher when given"""
+    if fetcher is None:
+        fetcher = MetadataFetcher(_load_hub())
+    return fetcher.get(model_info.get('full_name', ''), model_info.get('revision'))
+
+def _scorable_metadata(model_info: Dict[str, str],
+                      metadata: Optional[ModelMetadata] = None,
+                      fetcher: Optional[MetadataFetcher] = None) -> ModelMetadata:
+    """Metadata for an evaluator to score, fetched when not given
+
+    Raises RateLimited for throttled metadata: throttling says nothing about
+    the repo, so no evaluator may score it.
+    """
+    if metadata is None:
+        metadata = fetch_model_metadata(model_info, fetcher)
+    if metadata.status == STATUS_RATE_LIMITED:
+        raise RateLimited(f"metadata for {metadata.repo_id} is rate limited") from metadata.error
+    return metadata
+
+def evaluate_model_correctness(model_info: Dict[str, str],
+                               metadata: Optional[ModelMetadata] = None) -> Tuple[float, float]:
     """Evaluate model correctness - placeholder implementation"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
-        if HfApi is None:
+        metadata = _scorable_metadata(model_info, metadata)
+
+        if metadata.status == STATUS_NO_HUB:
             # Fallback scoring if huggingface_hub not available
             score = 0.5
+        elif metadata.status == STATUS_CLIENT_ERROR:
+            score = 0.0
+        elif metadata.status == STATUS_FETCH_ERROR:
+            score = 0.3  # Lower score for inaccessible models
         else:
-            api = HfApi()
-            try:
-                # Try to get model info to verify it exists and is accessible
-                model_data = api.model_info(model_info.get('full_name', ''))
-                
-                # Basic correctness scoring based on model availability and metadata
-                score = 0.8  # Base score for accessible model
-                
-                # Bonus points for having proper documentation, tags, etc.
-                if hasattr(model_data, 'tags') and model_data.tags:
-                    score += 0.1
-                if hasattr(model_data, 'card_data') and model_data.card_data:
-                    score += 0.1
-                
-                score = min(1.0, score)  # Cap at 1.0
-                
-            except Exception:
-                score = 0.3  # Lower score for inaccessible models
+            model_data = metadata.data
+            
+            # Basic correctness scoring based on model availability and metadata
+            score = 0.8  # Base score for accessible model
+            
+            # Bonus points for having proper documentation, tags, etc.
+            if hasattr(model_data, 'tags') and model_data.tags:
+                score += 0.1
+            if hasattr(model_data, 'card_data') and model_data.card_data:
+                score += 0.1
+            
+            score = min(1.0, score)  # Cap at 1.0
     
+    except RateLimited:
+        raise  # Reported as a rate-limited metric by evaluate_model, not scored
     except Exception:
         score = 0.0
     
-    latency = (time.time() - start_time) * 1000  # Convert to milliseconds
+    latency = _elapsed_ms(start_ns)  # Convert to milliseconds
     return score, latency
 
-def evaluate_model_fairness(model_info: Dict[str, str]) -> Tuple[float, float]:
+def evaluate_model_fairness(model_info: Dict[str, str],
+                            metadata: Optional[ModelMetadata] = None) -> Tuple[float, float]:
     """Evaluate model fairness - placeholder implementation"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
         # This would normally involve bias testing, demographic parity analysis, etc.
@@ -215,162 +508,583 @@ def evaluate_model_fairness(model_info: Dict[str, str]) -> Tuple[float, float]:
     except Exception:
         score = 0.4  # Default moderate score
     
-    latency = (time.time() - start_time) * 1000
+    latency = _elapsed_ms(start_ns)
     return score, latency
 
-def evaluate_model_maintainability(model_info: Dict[str, str]) -> Tuple[float, float]:
+def evaluate_model_maintainability(model_info: Dict[str, str],
+                                   metadata: Optional[ModelMetadata] = None) -> Tuple[float, float]:
     """Evaluate model maintainability"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
-        if HfApi is None:
+        metadata = _scorable_metadata(model_info, metadata)
+
+        if metadata.status == STATUS_NO_HUB:
             score = 0.5
+        elif metadata.status == STATUS_CLIENT_ERROR:
+            score = 0.0
+        elif metadata.status == STATUS_FETCH_ERROR:
+            score = 0.2
         else:
-            api = HfApi()
-            try:
-                model_data = api.model_info(model_info.get('full_name', ''))
-                
-                score = 0.3  # Base score
-                
-                # Check for recent updates (last modified)
-                if hasattr(model_data, 'last_modified'):
-                    # More points for recently updated models
-                    score += 0.3
-                
-                # Check for proper documentation
-                if hasattr(model_data, 'card_data') and model_data.card_data:
-                    score += 0.2
-                
-                # Check for tags and proper categorization
-                if hasattr(model_data, 'tags') and model_data.tags:
-                    score += 0.2
-                
-                score = min(1.0, score)
-                
-            except Exception:
-                score = 0.2
+            model_data = metadata.data
+            
+            score = 0.3  # Base score
+            
+            # Check for recent updates (last modified)
+            if hasattr(model_data, 'last_modified'):
+                # More points for recently updated models
+                score += 0.3
+            
+            # Check for proper documentation
+            if hasattr(model_data, 'card_data') and model_data.card_data:
+                score += 0.2
+            
+            # Check for tags and proper categorization
+            if hasattr(model_data, 'tags') and model_data.tags:
+                score += 0.2
+            
+            score = min(1.0, score)
     
+    except RateLimited:
+        raise  # Reported as a rate-limited metric by evaluate_model, not scored
     except Exception:
         score = 0.0
     
-    latency = (time.time() - start_time) * 1000
+    latency = _elapsed_ms(start_ns)
     return score, latency
 
-def evaluate_model_license(model_info: Dict[str, str]) -> Tuple[float, float]:
+def evaluate_model_license(model_info: Dict[str, str],
+                           metadata: Optional[ModelMetadata] = None) -> Tuple[float, float]:
     """Evaluate model license compliance"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
-        if HfApi is None:
+        metadata = _scorable_metadata(model_info, metadata)
+
+        if metadata.status == STATUS_NO_HUB:
             score = 0.5
+        elif metadata.status == STATUS_CLIENT_ERROR:
+            score = 0.0
+        elif metadata.status == STATUS_FETCH_ERROR:
+            score = 0.3  # Lower score for unclear licensing
         else:
-            api = HfApi()
-            try:
-                model_data = api.model_info(model_info.get('full_name', ''))
-                
-                # Check for license information
-                license_score = 0.5  # Base score
-                
-                if hasattr(model_data, 'card_data') and model_data.card_data:
-                    card_data = model_data.card_data
-                    if hasattr(card_data, 'license'):
-                        license_type = card_data.license
-                        
-                        # Score based on license openness
-                        open_licenses = ['mit', 'apache-2.0', 'bsd', 'gpl', 'cc']
-                        if any(ol in str(license_type).lower() for ol in open_licenses):
-                            license_score = 0.9
-                        else:
-                            license_score = 0.6  # Restrictive but present license
-                    
-                score = license_score
-                
-            except Exception:
-                score = 0.3  # Lower score for unclear licensing
+            # Normalize the card's license (aliases, 'other' + license_link,
+            # license:* tags) to an SPDX id and score it by openness: open
+            # licenses 0.9, restrictive or unrecognized 0.6, none declared 0.5.
+            # Imported here so commands that never score skip building the tables.
+            from licenses import license_index, detect_license
+            score = license_index().score(detect_license(metadata.data))
+    
+    except RateLimited:
+        raise  # Reported as a rate-limited metric by evaluate_model, not scored
+    except Exception:
+        score = 0.0
+    
+    latency = _elapsed_ms(start_ns)
+    return score, latency
+
+def evaluate_model_size(model_info: Dict[str, str],
+                        metadata: Optional[ModelMetadata] = None,
+                        fetcher: Optional[MetadataFetcher] = None) -> Tuple[float, float]:
+    """Evaluate model size from the Hub's file metadata, without downloading weights"""
+    start_ns = time.perf_counter_ns()
+    
+    try:
+        if fetcher is None:
+            fetcher = MetadataFetcher(_load_hub())
+        metadata = _scorable_metadata(model_info, metadata, fetcher)
+
+        if metadata.status == STATUS_NO_HUB:
+            score = 0.5
+        elif metadata.status == STATUS_CLIENT_ERROR:
+            score = 0.0
+        elif metadata.status == STATUS_FETCH_ERROR:
+            score = 0.3
+        else:
+            # Smaller models fit more deployment targets (see size_metric.DEVICE_CAPACITY)
+            size = fetcher.model_size(model_info.get('full_name', ''), model_info.get('revision'), metadata)
+            score = size_score(size.estimated_bytes)
     
+    except RateLimited:
+        raise  # Reported as a rate-limited metric by evaluate_model, not scored
     except Exception:
         score = 0.0
     
-    latency = (time.time() - start_time) * 1000
+    latency = _elapsed_ms(start_ns)
     return score, latency
 
-def calculate_net_score(scores: Dict[str, float]) -> float:
-    """Calculate weighted net score based on Sarah's priorities"""
-    # Weights based on typical ML engineering priorities
-    weights = {
-        'Correctness': 0.4,      # Most important - does it work?
-        'Fairness': 0.25,        # Important for ethical AI
-        'Maintainability': 0.25, # Important for long-term use
-        'License': 0.1           # Important but less critical
-    }
-    
-    net_score = sum(scores[metric] * weights[metric] for metric in weights)
+def calculate_net_score(scores: Dict[str, float],
+                        weights: Optional[Dict[str, float]] = None) -> float:
+    """Calculate weighted net score based on Sarah's priorities (or another weight profile)"""
+    weights = weights or DEFAULT_WEIGHTS
+    
+    # A metric that timed out (None) contributes nothing
+    net_score = sum((scores[metric] or 0.0) * weights[metric] for metric in weights)
     return round(net_score, 3)
 
-def evaluate_urls(urls: List[str]) -> List[Dict]:
-    """Evaluate URLs and return results for model URLs only"""
-    results = []
+# Every metric with its relative cost, the Hub data it needs and its NetScore weight.
+# Registration order is the order of the output fields.
+METRICS = MetricRegistry()
+METRICS.register('Correctness', lambda info, metadata, fetcher: evaluate_model_correctness(info, metadata),
+                 cost=1, needs=[DATA_METADATA], weight=DEFAULT_WEIGHTS.get('Correctness', 0.0))
+METRICS.register('Fairness', lambda info, metadata, fetcher: evaluate_model_fairness(info, metadata),
+                 cost=1, weight=DEFAULT_WEIGHTS.get('Fairness', 0.0))
+METRICS.register('Maintainability', lambda info, metadata, fetcher: evaluate_model_maintainability(info, metadata),
+                 cost=1, needs=[DATA_METADATA], weight=DEFAULT_WEIGHTS.get('Maintainability', 0.0))
+METRICS.register('License', lambda info, metadata, fetcher: evaluate_model_license(info, metadata),
+                 cost=2, needs=[DATA_METADATA], weight=DEFAULT_WEIGHTS.get('License', 0.0))
+METRICS.register('Size', evaluate_model_size,
+                 cost=5, needs=[DATA_METADATA, DATA_FILES], weight=DEFAULT_WEIGHTS.get('Size', 0.0),
+                 opt_in=True)  # Its file metadata and header reads cost Hub traffic
+
+# Upcoming models reordered at once by longest-expected-first scheduling
+DEFAULT_SCHEDULE_WINDOW = 1024
+
+# Result fields listing metrics left unscored. Such results are written to the
+# output but never journaled, stored for --incremental or added to --results-db
+PARTIAL_FIELDS = ('Timed_Out', 'Rate_Limited', 'Skipped')
+
+def is_partial(result: Dict) -> bool:
+    """True for a result emitted with some metrics unscored"""
+    return any(field in result for field in PARTIAL_FIELDS)
+
+def evaluate_model(model_url: str, fetcher: MetadataFetcher,
+                   stats: Optional[Instrumentation] = None,
+                   deadline: Optional[Deadline] = None,
+                   plan: Optional[MetricPlan] = None) -> Optional[Dict]:
+    """Score a single model URL; returns None if the model could not be evaluated
     
-    # Group URLs by type
-    models = []
-    datasets = []
-    code_repos = []
+    Parsing, metadata fetch and scoring are timed as separate stages with
+    perf_counter_ns. When stats is given every stage is also added to its
+    run-wide histogram.
     
-    for url in urls:
-        url_type = categorize_url(url)
-        if url_type == 'model':
-            models.append(url)
-        elif url_type == 'dataset':
-            datasets.append(url)
-        elif url_type == 'code':
-            code_repos.append(url)
+    plan (default: the METRICS defaults) picks the metrics and their order,
+    cheapest first. Hub metadata is only fetched once a metric needs it, and
+    with a NetScore bar the metrics left once it is out of reach are listed
+    under Skipped instead of evaluated.
     
-    # Process only model URLs for scoring
-    for model_url in models:
-        try:
-            model_info = extract_model_info(model_url)
-            
-            # Evaluate each metric
-            correctness, correctness_latency = evaluate_model_correctness(model_info)
-            fairness, fairness_latency = evaluate_model_fairness(model_info)
-            maintainability, maintainability_latency = evaluate_model_maintainability(model_info)
-            license_score, license_latency = evaluate_model_license(model_info)
-            
-            scores = {
-                'Correctness': correctness,
-                'Fairness': fairness,
-                'Maintainability': maintainability,
-                'License': license_score
-            }
-            
-            net_score = calculate_net_score(scores)
-            
-            # Format result according to specifications
-            result = {
-                'URL': model_url,
-                'Correctness': correctness,
-                'Correctness_Latency': round(correctness_latency),
-                'Fairness': fairness,
-                'Fairness_Latency': round(fairness_latency),
-                'Maintainability': maintainability,
-                'Maintainability_Latency': round(maintainability_latency),
-                'License': license_score,
-                'License_Latency': round(license_latency),
-                'NetScore': net_score
-            }
-            
-            results.append(result)
+    If deadline runs out first, the model is emitted with the scores finished so
+    far: metrics that timed out have None scores and latencies and are listed
+    under Timed_Out. Metrics the Hub kept throttling are listed under
+    Rate_Limited the same way, rather than scored as an inaccessible model.
+    """
+    plan = plan or METRICS.plan()
+    model_start = time.perf_counter_ns()
+    try:
+        parse_start = time.perf_counter_ns()
+        model_info = extract_model_info(model_url)
+        parse_ns = time.perf_counter_ns() - parse_start
+        
+        # Evaluate each metric; latencies now cover scoring only, not the network.
+        # Each metric is timed inside the worker running it, so the numbers stay
+        # per-model even when several models are scored at once.
+        score_start = time.perf_counter_ns()
+        fetched, metadata, fetch_ns = None, None, None
+        scores = {}
+        latencies = {}
+        unscored = {'Timed_Out': [], 'Rate_Limited': [], 'Skipped': []}
+        for spec in plan.order:
+            if plan.cannot_reach(scores):
+                unscored['Skipped'].append(spec.name)
+                continue
+            if spec.needs and fetched is None:
+                fetch_start = time.perf_counter_ns()
+                fetched, metadata = call_with_deadline(lambda: fetch_model_metadata(model_info, fetcher),
+                                                       deadline)
+                fetch_ns = time.perf_counter_ns() - fetch_start
             
-        except Exception as e:
-            print(f"Error evaluating model {model_url}: {e}", file=sys.stderr)
+            # Bind spec now: an evaluation abandoned at the deadline outlives this iteration
+            evaluate = lambda spec=spec: spec.evaluate(model_info, metadata, fetcher)
+            outcome, reason = None, 'Timed_Out'
+            if spec.needs and fetched and metadata.status == STATUS_RATE_LIMITED:
+                reason = 'Rate_Limited'
+            elif fetched or not spec.needs:
+                try:
+                    if DATA_FILES in spec.needs:
+                        # Reading safetensors headers is more Hub traffic, so it runs under the deadline too
+                        _, outcome = call_with_deadline(evaluate, deadline)
+                    else:
+                        outcome = evaluate()
+                except RateLimited:
+                    reason = 'Rate_Limited'
+            if outcome is not None:
+                scores[spec.name], latencies[spec.name] = outcome
+            else:
+                scores[spec.name] = latencies[spec.name] = None
+                unscored[reason].append(spec.name)
+        
+        for name in unscored['Skipped']:
+            scores[name] = latencies[name] = None
+        net_score = calculate_net_score(scores, plan.weights) if plan.weights else None
+        score_ns = time.perf_counter_ns() - score_start - (fetch_ns or 0)
+        
+        if stats is not None:
+            stats.record(STAGE_PARSE, parse_ns)
+            if fetch_ns is not None:
+                stats.record(STAGE_FETCH, fetch_ns)
+            stats.record(STAGE_SCORE, score_ns)
+            for metric, latency in latencies.items():
+                if latency is not None:
+                    stats.record(f"{STAGE_SCORE}:{metric}", int(latency * 1e6))
+            stats.record(STAGE_MODEL, time.perf_counter_ns() - model_start)
+        
+        # Format result according to specifications
+        result = {'URL': model_url, 'Fetch_Latency': round((fetch_ns or 0) / 1e6)}
+        for metric in plan.names:
+            latency = latencies[metric]
+            result[metric] = scores[metric]
+            result[f'{metric}_Latency'] = None if latency is None else round(latency)
+        result['NetScore'] = net_score
+        for field in PARTIAL_FIELDS:
+            if unscored[field]:
+                # Listed in output order, not evaluation order
+                result[field] = [name for name in plan.names if name in unscored[field]]
+        return result
+        
+    except Exception as e:
+        print(f"Error evaluating model {model_url}: {e}", file=sys.stderr)
+        return None
+
+def evaluate_incremental(model_url: str, fetcher: MetadataFetcher, store: 'ScoreStore',
+                         stats: Optional[Instrumentation] = None,
+                         deadline: Optional[Deadline] = None,
+                         plan: Optional[MetricPlan] = None) -> Optional[Dict]:
+    """Reuse the stored result for a model unless its commit or the metrics changed
+    
+    Only the repo's current sha is looked up (free for revisions pinned to a
+    commit); the full metadata fetch and scoring run only for changed repos.
+    Stored results cover the default metrics, so any other plan bypasses the store.
+    """
+    from incremental import pinned_sha
+    plan = plan or METRICS.plan()
+    model_info = extract_model_info(model_url)
+    repo_id, revision = model_info['full_name'], model_info.get('revision')
+    
+    fetched, sha = call_with_deadline(lambda: pinned_sha(revision) or fetcher.current_sha(repo_id, revision),
+                                      deadline)
+    stored = store.lookup(repo_id, revision, sha) if fetched and plan.complete else None
+    if stored is not None:
+        store.record('reused')
+        return dict(stored, URL=model_url)
+    
+    result = evaluate_model(model_url, fetcher, stats, deadline, plan)
+    if result is not None:
+        store.record('rescored')
+        # Fallback scores for an unreachable repo, or partial ones, are not worth keeping
+        if plan.complete and not is_partial(result) and fetcher.get(repo_id, revision).ok:
+            store.store(repo_id, revision, pinned_sha(revision) or fetcher.current_sha(repo_id, revision),
+                        result)
+    return result
+
+def iter_evaluations(urls: Iterable[str], workers: int = 1, ordered: bool = True,
+                     cache: Optional['MetadataCache'] = None,
+                     api_factory: Optional[Callable] = None,
+                     stats: Optional[Instrumentation] = None,
+                     dedupe: bool = True,
+                     journal: Optional['CheckpointJournal'] = None,
+                     shard: Optional[Tuple[int, int]] = None,
+                     store: Optional['ScoreStore'] = None,
+                     request_timeout: Optional[float] = None,
+                     model_deadline: Optional[float] = None,
+                     time_budget: Optional[float] = None,
+                     throttle: Optional[HubThrottle] = None,
+                     hedge: Optional['HedgePolicy'] = None,
+                     plan: Optional[MetricPlan] = None,
+                     history: Optional['LatencyHistory'] = None,
+                     schedule_window: int = DEFAULT_SCHEDULE_WINDOW) -> Iterator[Dict]:
+    """Lazily evaluate model URLs, yielding each result as soon as it is available
+    
+    URLs are consumed one at a time and at most a few per worker are in flight, so
+    memory does not grow with the length of the input. With workers > 1 models are
+    scored concurrently on a thread pool. Results keep the input order unless
+    ordered is False, in which case they come back in completion order. An
+    optional MetadataCache serves model_info from disk, and api_factory replaces
+    HfApi (e.g. with a record/replay stand-in). stats collects per-stage
+    latency histograms.
+    
+    With dedupe, URLs naming the same canonical repo and revision (host, case
+    and trailing-path variants) are scored once and the result is repeated for
+    every original line.
+    
+    With a CheckpointJournal, models already scored by an earlier run with the
+    same metrics are replayed from it without any Hub call, and every new
+    result is journaled.
+    
+    shard (index, count) keeps only the model URLs hashed to that partition.
+    
+    With a ScoreStore, models whose commit sha and metric version match a
+    stored result are not rescored.
+    
+    request_timeout bounds each Hub call, model_deadline the wall-clock time
+    spent on one model and time_budget the whole run (all in seconds). A model
+    that runs out of time is emitted with partial scores and never journaled
+    or stored; once the run budget is spent the remaining models come back
+    immediately with only the metrics that need no Hub access.
+    
+    Every Hub request goes through a HubThrottle (by default one allowing a
+    request per worker in flight), which retries HTTP 429s and adapts the
+    request concurrency to what the Hub accepts.
+    
+    With a HedgePolicy, a metadata fetch slower than its percentile of recent
+    fetch latencies is duplicated and the first answer is used.
+    
+    plan (a METRICS.plan()) selects the metrics to evaluate; with a NetScore
+    bar, models that cannot clear it stop early and are not yielded.
+    
+    With a LatencyHistory and workers > 1, each of the next schedule_window
+    models is handed to the pool longest expected first, so slow repos do not
+    start last and stretch the run; results still come back in input order
+    when ordered.
+    """
+    plan = plan or METRICS.plan()
+    # One metadata fetch per model for the whole run, shared by every metric
+    throttle = throttle or HubThrottle(max_concurrency=workers)
+    fetcher = MetadataFetcher(api_factory or _load_hub(), cache=cache,
+                              request_timeout=request_timeout, throttle=throttle, hedge=hedge,
+                              files_metadata=DATA_FILES in plan.needs)
+    tracker = DuplicateTracker() if dedupe else None
+    run_deadline = Deadline.after(time_budget)
+    
+    def evaluate(model_url: str) -> Optional[Dict]:
+        if journal is not None:
+            stored = journal.lookup(model_url, plan.names)
+            if stored is not None:
+                return stored
+        result = evaluate_unique(model_url)
+        # Partial results are rescored by a resumed run rather than replayed
+        if journal is not None and result is not None and not is_partial(result):
+            journal.append(model_url, result, plan.names)
+        return result
+    
+    def score(model_url: str) -> Optional[Dict]:
+        # The per-model clock starts when a worker picks the model up
+        deadline = Deadline.after(model_deadline, parent=run_deadline)
+        if store is not None:
+            return evaluate_incremental(model_url, fetcher, store, stats, deadline, plan)
+        return evaluate_model(model_url, fetcher, stats, deadline, plan)
+    
+    def evaluate_unique(model_url: str) -> Optional[Dict]:
+        canonical = canonicalize_url(model_url) if tracker is not None else None
+        if canonical is None:
+            return score(model_url)
+        
+        slot, owner = tracker.claim(canonical.key)
+        if owner:
+            result = None
+            try:
+                result = score(model_url)
+            finally:
+                # Always release waiting duplicates, even if scoring was interrupted
+                slot.set_result(result)
+            return result
+        
+        # The owner was submitted earlier, so it is already running or done
+        shared = slot.result()
+        return None if shared is None else dict(shared, URL=model_url)
+    
+    # Process only model URLs for scoring
+    models = (url for url in urls if _is_model_url(url))
+    if shard is not None:
+        from sharding import in_shard
+        models = (url for url in models if in_shard(url, shard))
+    
+    if history is None or workers <= 1:
+        results = bounded_map(evaluate, models, workers=workers, ordered=ordered)
+    else:
+        from scheduling import longest_first, restore_order
+        scheduled = longest_first(models, history.estimate, schedule_window)
+        indexed = bounded_map(lambda job: (job[0], evaluate(job[1])), scheduled,
+                              workers=workers, ordered=False)
+        results = restore_order(indexed) if ordered else (result for _, result in indexed)
+    
+    for result in results:
+        if result is None:
             continue
+        if plan.min_netscore is not None:
+            kept = plan.passes(result['NetScore'])
+            plan.record(kept, stopped_early='Skipped' in result)
+            if not kept:
+                continue
+        yield result
+
+def evaluate_urls(urls: List[str], workers: int = 1, ordered: bool = True,
+                  cache: Optional['MetadataCache'] = None,
+                  api_factory: Optional[Callable] = None,
+                  stats: Optional[Instrumentation] = None,
+                  dedupe: bool = True, metrics: Optional[Iterable[str]] = None,
+                  min_netscore: Optional[float] = None) -> List[Dict]:
+    """Evaluate URLs and return results for model URLs only
+    
+    metrics limits evaluation to the named metrics; min_netscore keeps only the
+    models reaching that NetScore and stops evaluating the others early.
+    """
+    return list(iter_evaluations(urls, workers=workers, ordered=ordered, cache=cache,
+                                 api_factory=api_factory, stats=stats, dedupe=dedupe,
+                                 plan=METRICS.plan(metrics, min_netscore)))
+
+class _CountingIterator:
+    """Passes items through while counting them, to detect empty input while streaming"""
+    
+    def __init__(self, iterable: Iterable):
+        self._iterator = iter(iterable)
+        self.count = 0
     
-    return results
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        item = next(self._iterator)
+        self.count += 1
+        return item
+
+USAGE = ("Usage: ./run <install|test|merge <URL_FILE> <SHARD_OUTPUT>...|"
+         "rescore <RESULTS> [--profile NAME] [--profiles FILE] [--output PATH]|"
+         "<URL_FILE> [--workers N] [--unordered] "
+         "[--cache PATH] [--cache-ttl SECONDS] [--cache-size N] "
+         "[--record CASSETTE | --replay CASSETTE [--replay-latency SPEC] [--replay-seed N]] "
+         "[--stats] [--no-dedupe] [--checkpoint PATH [--resume]] "
+         "[--shard i/N | --processes N] [--incremental STORE] [--results-db PATH] "
+         "[--request-timeout SECONDS] [--model-deadline SECONDS] [--time-budget SECONDS] "
+         "[--hub-concurrency N] [--hedge PERCENTILE] [--metrics LIST] [--min-netscore X] "
+         "[--schedule-history RESULTS] [--line-buffered] [--output PATH]>")
+
+class _UsageParser(argparse.ArgumentParser):
+    """ArgumentParser that reports bad options the same way as the rest of ./run"""
+    
+    def error(self, message):
+        print(f"{USAGE}\nError: {message}", file=sys.stderr)
+        sys.exit(1)
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return number
+
+def _percentile(value: str) -> float:
+    number = float(value)
+    if not 0 < number < 100:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 100, got {value}")
+    return number
+
+def _metric_list(value: str) -> List[str]:
+    try:
+        return METRICS.plan(value).names
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def _netscore_bar(value: str) -> float:
+    number = float(value)
+    if not 0 <= number <= 1:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 1, got {value}")
+    return number
+
+def _shard_spec(value: str) -> Tuple[int, int]:
+    from sharding import parse_shard
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def build_url_parser() -> argparse.ArgumentParser:
+    """Options accepted by ./run <URL_FILE>
+    
+    Defaults are suppressed so that only options given on the command line are
+    forwarded to process_url_file, which owns the real defaults.
+    """
+    parser = _UsageParser(prog='./run', add_help=False, argument_default=argparse.SUPPRESS)
+    parser.add_argument('url_file', help="File with one URL per line, or '-' for stdin")
+    parser.add_argument('--workers', type=_positive_int,
+                        help='Number of models to score concurrently')
+    parser.add_argument('--unordered', dest='ordered', action='store_false',
+                        help='Emit results in completion order instead of input order')
+    parser.add_argument('--cache', dest='cache_path',
+                        help='SQLite file used to cache Hub metadata between runs')
+    parser.add_argument('--cache-ttl', type=float,
+                        help='Seconds before a cached entry is revalidated against the Hub')
+    parser.add_argument('--cache-size', type=_positive_int,
+                        help='Maximum number of cached models (least recently used are evicted)')
+    hub_mode = parser.add_mutually_exclusive_group()
+    hub_mode.add_argument('--record', metavar='CASSETTE',
+                          help='Save every Hub response to a cassette file')
+    hub_mode.add_argument('--replay', metavar='CASSETTE',
+                          help='Serve Hub responses from a cassette instead of the network')
+    parser.add_argument('--replay-latency', metavar='SPEC',
+                        help='Injected replay latency: recorded, none, fixed:MS, '
+                             'uniform:LO:HI or lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--replay-seed', type=int,
+                        help='Random seed for injected replay latency')
+    parser.add_argument('--stats', action='store_true',
+                        help='Print p50/p95/p99 latency per stage to stderr after the run')
+    parser.add_argument('--no-dedupe', dest='dedupe', action='store_false',
+                        help='Score every URL line even if it names an already scored repo')
+    parser.add_argument('--checkpoint', metavar='PATH',
+                        help='Journal every finished result to PATH as it is produced')
+    parser.add_argument('--resume', action='store_true',
+                        help='Replay results already in the --checkpoint journal and '
+                             'only score the remaining models')
+    partition = parser.add_mutually_exclusive_group()
+    partition.add_argument('--shard', type=_shard_spec, metavar='i/N',
+                           help='Only score model URLs in hash partition i of N (0-based)')
+    partition.add_argument('--processes', type=_positive_int,
+                           help='Score N partitions in parallel processes and merge them')
+    parser.add_argument('--incremental', metavar='STORE',
+                        help='Keep results in the SQLite file STORE and only rescore models '
+                             'whose commit or metric version changed')
+    parser.add_argument('--results-db', metavar='PATH',
+                        help='Also write every result row to an indexed SQLite database')
+    parser.add_argument('--request-timeout', type=_positive_float, metavar='SECONDS',
+                        help=f'Fail a single Hub request after SECONDS (default: {DEFAULT_REQUEST_TIMEOUT:g})')
+    parser.add_argument('--model-deadline', type=_positive_float, metavar='SECONDS',
+                        help='Emit a model with partial scores once it has taken SECONDS')
+    parser.add_argument('--time-budget', type=_positive_float, metavar='SECONDS',
+                        help='Wall-clock budget for the whole run; models left when it '
+                             'runs out get partial scores')
+    parser.add_argument('--hub-concurrency', type=_positive_int, metavar='N',
+                        help='Most Hub requests in flight (default: --workers); lowered '
+                             'automatically while the Hub rate-limits')
+    parser.add_argument('--hedge', type=_percentile, metavar='PERCENTILE',
+                        help='Send a duplicate metadata request when a fetch outlasts this '
+                             'percentile of recent fetch latencies (e.g. 95); first answer wins')
+    parser.add_argument('--metrics', type=_metric_list, metavar='LIST',
+                        help=f"Comma-separated metrics to evaluate, of {','.join(METRICS.names())} "
+                             f"(default: {','.join(spec.name for spec in METRICS.defaults())}); "
+                             f"only the Hub data they need is fetched")
+    parser.add_argument('--min-netscore', type=_netscore_bar, metavar='X',
+                        help='Only output models with NetScore >= X; cheap metrics run first '
+                             'and a model is dropped as soon as it cannot reach X')
+    parser.add_argument('--schedule-history', metavar='RESULTS',
+                        help='Earlier NDJSON output or --results-db database; with --workers, '
+                             'models expected to take longest are started first')
+    parser.add_argument('--line-buffered', action='store_true',
+                        help='Flush every result line at once, even when stdout is not a terminal')
+    parser.add_argument('--output', metavar='PATH',
+                        help='Write results to PATH instead of stdout; .gz, .xz and .bz2 are '
+                             'compressed as they are written')
+    return parser
+
+def build_rescore_parser() -> argparse.ArgumentParser:
+    """Options accepted by ./run rescore <RESULTS>"""
+    parser = _UsageParser(prog='./run rescore', add_help=False, argument_default=argparse.SUPPRESS)
+    parser.add_argument('source', help="--results-db database or NDJSON output, or '-' for stdin")
+    parser.add_argument('--profile', help='Weight profile to apply (default: default)')
+    parser.add_argument('--profiles', metavar='FILE',
+                        help='JSON file of named weight profiles (default: weight_profiles.json)')
+    parser.add_argument('--output', metavar='PATH',
+                        help='Write rescored results to PATH instead of stdout; .gz, .xz and .bz2 '
+                             'are compressed as they are written')
+    return parser
 
 def main():
     """Main entry point"""
-    if len(sys.argv) != 2:
-        print("Usage: ./run <install|<URL_FILE>|test>", file=sys.stderr)
+    if len(sys.argv) < 2:
+        print(USAGE, file=sys.stderr)
         sys.exit(1)
 
     cmd = sys.argv[1]
@@ -382,9 +1096,21 @@ def main():
         elif cmd == "test":
             sys.exit(run_tests())
 
+        elif cmd == "merge":
+            if len(sys.argv) < 4:
+                print(USAGE, file=sys.stderr)
+                sys.exit(1)
+            sys.exit(merge_shard_files(sys.argv[2], sys.argv[3:]))
+
+        elif cmd == "rescore":
+            options = vars(build_rescore_parser().parse_args(sys.argv[2:]))
+            sys.exit(rescore_stored(options.pop('source'), **options))
+
         else:
-            # Anything else is treated as a path to the URL file
-            sys.exit(process_url_file(cmd))
+            # Anything else is treated as a path to the URL file plus options
+            options = vars(build_url_parser().parse_args(sys.argv[1:]))
+            url_file = options.pop('url_file')
+            sys.exit(process_url_file(url_file, **options))
 
     except KeyboardInterrupt:
         print("\nOperation cancelled by user", file=sys.stderr)
@@ -0,0 +1,131 @@
+"""
+Longest-expected-first scheduling for run.py
+Per-model latency learned from the *_Latency fields of earlier results decides the
+order work is handed to the worker pool, so slow repos start early instead of
+stretching the end of the run; output order is restored afterwards
+"""
+
+import heapq
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+
+from checkpoint import checkpoint_key
+
+T = TypeVar('T')
+
+DEFAULT_ESTIMATE_MS = 1000.0    # Expected latency when there is no history at all
+SMOOTHING = 0.5                 # Weight of the newest sample in the running estimate
+GIB = 1024 ** 3
+
+_LATENCY_SUFFIX = '_Latency'
+
+
+def result_latency(result: Dict) -> Optional[float]:
+    """Milliseconds a stored result took: its fetch plus every metric latency"""
+    values = [value for key, value in result.items()
+              if key.endswith(_LATENCY_SUFFIX) and isinstance(value, (int, float))
+              and not isinstance(value, bool)]
+    return float(sum(values)) if values else None
+
+
+def _median(values) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+class LatencyHistory:
+    """Expected per-model latency, keyed by canonical URL
+
+    Models seen before get a smoothed average of their recorded latencies. New
+    models are estimated from their repo size when size_of knows it (at the
+    median milliseconds per GiB of models with a known size), otherwise from
+    the median latency of every known model.
+    """
+
+    def __init__(self, size_of: Optional[Callable[[str], Optional[int]]] = None):
+        self._expected: Dict[str, float] = {}
+        # A URL as observed for each key; the key is lowercased, repo ids are not
+        self._urls: Dict[str, str] = {}
+        self._size_of = size_of
+        self._median: Optional[float] = None
+        self._ms_per_gib: Optional[float] = None
+        self._fitted = False
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict],
+                     size_of: Optional[Callable[[str], Optional[int]]] = None) -> 'LatencyHistory':
+        history = cls(size_of)
+        for result in results:
+            latency = result_latency(result)
+            if latency is not None and 'URL' in result:
+                history.observe(result['URL'], latency)
+        return history
+
+    def observe(self, url: str, latency_ms: float):
+        key = checkpoint_key(url)
+        self._urls[key] = url
+        previous = self._expected.get(key)
+        self._expected[key] = latency_ms if previous is None else \
+            SMOOTHING * latency_ms + (1 - SMOOTHING) * previous
+        self._fitted = False
+
+    def __len__(self):
+        return len(self._expected)
+
+    def _fit(self):
+        """Median latency, and median ms per GiB over models whose size is known"""
+        values = list(self._expected.values())
+        self._median = _median(values) if values else DEFAULT_ESTIMATE_MS
+        rates = []
+        if self._size_of is not None:
+            for key, latency in self._expected.items():
+                size = self._size_of(self._urls[key])
+                if size:
+                    rates.append(latency / (size / GIB))
+        self._ms_per_gib = _median(rates) if rates else None
+        self._fitted = True
+
+    def estimate(self, url: str) -> float:
+        """Expected milliseconds to score url"""
+        known = self._expected.get(checkpoint_key(url))
+        if known is not None:
+            return known
+        if not self._fitted:
+            self._fit()
+        if self._ms_per_gib is not None:
+            size = self._size_of(url)
+            if size:
+                return self._ms_per_gib * size / GIB
+        return self._median
+
+
+def longest_first(items: Iterable[T], estimate: Callable[[T], float],
+                  window: int) -> Iterator[Tuple[int, T]]:
+    """Yield (input index, item), always the longest expected of the next `window` items
+
+    Only `window` items are held at once, so streaming inputs keep flat memory;
+    ties keep input order.
+    """
+    heap = []
+    for index, item in enumerate(items):
+        heapq.heappush(heap, (-estimate(item), index, item))
+        if len(heap) >= window:
+            _, first, chosen = heapq.heappop(heap)
+            yield first, chosen
+    while heap:
+        _, first, chosen = heapq.heappop(heap)
+        yield first, chosen
+
+
+def restore_order(indexed: Iterable[Tuple[int, T]]) -> Iterator[T]:
+    """Re-sequence (index, value) pairs by consecutive index; None values hold a slot
+
+    Indexes must be 0, 1, 2, ... with each appearing exactly once.
+    """
+    buffered: Dict[int, T] = {}
+    next_index = 0
+    for index, value in indexed:
+        buffered[index] = value
+        while next_index in buffered:
+            yield buffered.pop(next_index)
+            next_index += 1
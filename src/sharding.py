@@ -0,0 +1,122 @@
+"""
+Sharded scoring for run.py
+Deterministic hash-partitioning of canonical repo ids, a local multi-process
+launcher, and a streaming merge of shard outputs back into input order
+"""
+
+import hashlib
+import json
+import os
+import sys
+from contextlib import ExitStack, redirect_stdout
+from typing import Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from checkpoint import checkpoint_key
+from pipeline import open_input
+
+Shard = Tuple[int, int]  # (index, count), index in [0, count)
+
+
+def parse_shard(spec: str) -> Shard:
+    """Parse 'i/N' (0-based shard i of N)"""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got {spec!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"shard index must be in 0..{count - 1}, got {spec!r}")
+    return index, count
+
+
+def shard_of(url: str, count: int) -> int:
+    """Shard owning a URL; every variant of one repo lands on the same shard
+
+    Uses a stable hash of the canonical URL (not Python's per-process hash()),
+    so every machine computes the same partition.
+    """
+    digest = hashlib.blake2b(checkpoint_key(url).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def in_shard(url: str, shard: Optional[Shard]) -> bool:
+    return shard is None or shard_of(url, shard[1]) == shard[0]
+
+
+def merge_outputs(url_lines: Iterable[str], shard_paths: List[str], out: TextIO,
+                  is_model: Callable[[str], bool] = lambda url: True) -> int:
+    """Interleave shard NDJSON outputs back into the order of the original URL file
+
+    Each shard output must be in its own input order (the default). Shard files
+    are listed by shard index and may be gzip, xz or bz2 compressed. Only one
+    pending line per shard is held, so memory does not depend on the size of
+    the run. Returns the number of lines written.
+    """
+    count = len(shard_paths)
+    opened = ExitStack()
+    files = [opened.enter_context(open_input(path)) for path in shard_paths]
+    heads: Dict[int, Optional[Tuple[str, str]]] = {}
+    written = 0
+
+    def head(index: int) -> Optional[Tuple[str, str]]:
+        """(URL, raw line) of the next unmerged result in a shard"""
+        if index not in heads:
+            heads[index] = None
+            for line in files[index]:
+                if line.strip():
+                    heads[index] = (json.loads(line)['URL'], line if line.endswith('\n') else line + '\n')
+                    break
+        return heads[index]
+
+    try:
+        for url in url_lines:
+            if not is_model(url):
+                continue
+            index = shard_of(url, count)
+            pending = head(index)
+            # A model whose evaluation failed has no output line; skip it
+            if pending is not None and pending[0] == url:
+                out.write(pending[1])
+                written += 1
+                del heads[index]
+        out.flush()
+    finally:
+        opened.close()
+    return written
+
+
+def _score_shard(url_file_path: str, shard: Shard, output_path: str, options: Dict) -> int:
+    """Process-pool entry point: score one shard into its own output file"""
+    import run
+    with open(output_path, 'w', encoding='utf-8') as out, redirect_stdout(out):
+        return run.process_url_file(url_file_path, shard=shard, **options)
+
+
+def _shard_options(options: Dict, index: int) -> Dict:
+    """Per-shard copy of the run options; files written by a shard get a suffix"""
+    shard_options = dict(options)
+    for key in ('checkpoint', 'record'):
+        if shard_options.get(key):
+            shard_options[key] = f"{shard_options[key]}.shard{index}"
+    # Merging relies on every shard writing in input order
+    shard_options['ordered'] = True
+    return shard_options
+
+
+def run_shards(url_file_path: str, processes: int, options: Dict,
+               url_lines: Callable[[], Iterable[str]],
+               is_model: Callable[[str], bool], out: Optional[TextIO] = None) -> int:
+    """Score every shard of a URL file on a process pool and merge the outputs"""
+    # Only multi-process runs need these; keep them off the startup path
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    out = out or sys.stdout
+    with tempfile.TemporaryDirectory(prefix='run-shards-') as tmp:
+        outputs = [os.path.join(tmp, f"shard-{index}.ndjson") for index in range(processes)]
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [pool.submit(_score_shard, url_file_path, (index, processes), outputs[index],
+                                   _shard_options(options, index))
+                       for index in range(processes)]
+            codes = [future.result() for future in futures]
+        merge_outputs(url_lines(), outputs, out, is_model)
+    return max(codes)
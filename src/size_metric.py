@@ -0,0 +1,131 @@
+"""
+Size metric for run.py
+Model size from the Hub's per-file metadata (sibling sizes) and parameter counts
+from safetensors headers fetched with HTTP range requests, so weights are never
+downloaded; measurements are cached per commit
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from hub_throttle import RateLimited
+from model_record import file_size
+
+# Files that hold model weights, in order of preference when several formats exist
+WEIGHT_SUFFIXES = ('.safetensors', '.bin', '.pt', '.pth', '.ckpt', '.gguf', '.onnx', '.h5', '.msgpack')
+
+# Bytes per element for safetensors dtypes
+DTYPE_BYTES = {
+    'F64': 8, 'I64': 8, 'U64': 8,
+    'F32': 4, 'I32': 4, 'U32': 4,
+    'F16': 2, 'BF16': 2, 'I16': 2, 'U16': 2,
+    'F8_E4M3': 1, 'F8_E5M2': 1, 'I8': 1, 'U8': 1, 'BOOL': 1,
+}
+
+GIB = 1024 ** 3
+# Memory of each deployment target; a model scores 1 on targets it fits and
+# falls to 0 at twice their capacity
+DEVICE_CAPACITY = {
+    'raspberry_pi': 1 * GIB,
+    'jetson_nano': 4 * GIB,
+    'desktop_pc': 16 * GIB,
+    'aws_server': 64 * GIB,
+}
+
+# Sharded checkpoints larger than this are sized from sibling metadata alone
+MAX_HEADER_READS = 64
+
+
+class ModelSize(NamedTuple):
+    """Size of a model at one commit; None where the Hub did not say"""
+    total_bytes: Optional[int]       # Every file in the repo
+    weight_bytes: Optional[int]      # Weight files of the preferred format only
+    parameters: Dict[str, int]       # Parameter count per dtype
+
+    @property
+    def parameter_count(self) -> int:
+        return sum(self.parameters.values())
+
+    @property
+    def estimated_bytes(self) -> Optional[int]:
+        """Bytes needed to load the weights, from file sizes or else parameter dtypes"""
+        if self.weight_bytes:
+            return self.weight_bytes
+        if self.parameters:
+            return sum(count * DTYPE_BYTES.get(dtype, 4) for dtype, count in self.parameters.items())
+        return self.total_bytes
+
+
+def size_score(size_bytes: Optional[int]) -> float:
+    """Mean fit over the deployment targets in DEVICE_CAPACITY; 0.5 if the size is unknown"""
+    if size_bytes is None:
+        return 0.5
+    fits = [max(0.0, min(1.0, 2.0 - size_bytes / capacity)) for capacity in DEVICE_CAPACITY.values()]
+    return round(sum(fits) / len(fits), 3)
+
+
+def _siblings(data: Any) -> List[Any]:
+    siblings = getattr(data, 'siblings', None)
+    return list(siblings) if isinstance(siblings, (list, tuple)) else []
+
+
+def _weight_files(siblings: List[Any]) -> List[Any]:
+    """Weight files of the first format present (safetensors over pickles, etc.)"""
+    for suffix in WEIGHT_SUFFIXES:
+        files = [s for s in siblings if str(getattr(s, 'rfilename', '')).endswith(suffix)]
+        if files:
+            return files
+    return []
+
+
+def _sum_sizes(files: List[Any]) -> Optional[int]:
+    sizes = [file_size(f) for f in files]
+    if not sizes or any(size is None for size in sizes):
+        return None
+    return sum(sizes)
+
+
+def _parameter_counts(value: Any) -> Dict[str, int]:
+    if not isinstance(value, dict):
+        return {}
+    return {str(dtype): count for dtype, count in value.items() if isinstance(count, int)}
+
+
+def _header_parameters(api: Any, repo_id: str, revision: Optional[str],
+                       files: List[Any]) -> Dict[str, int]:
+    """Parameter counts from safetensors headers, read with ranged requests
+
+    Only the 8-byte length prefix and JSON header of each file are transferred
+    (huggingface_hub's parse_safetensors_file_metadata). Hub stand-ins without
+    it, and any failed read, leave the counts unknown; RateLimited propagates.
+    """
+    reader = getattr(api, 'parse_safetensors_file_metadata', None)
+    if reader is None or not files or len(files) > MAX_HEADER_READS:
+        return {}
+    totals: Dict[str, int] = {}
+    try:
+        for sibling in files:
+            header = reader(repo_id=repo_id, filename=sibling.rfilename, revision=revision)
+            for dtype, count in _parameter_counts(getattr(header, 'parameter_count', None)).items():
+                totals[dtype] = totals.get(dtype, 0) + count
+    except RateLimited:
+        raise  # Throttled, not unreadable; let the caller retry later
+    except Exception:
+        return {}
+    return totals
+
+
+def measure_size(api: Any, repo_id: str, revision: Optional[str], data: Any) -> ModelSize:
+    """Size of a model from a model_info(files_metadata=True) response
+
+    Parameter counts come from the Hub's own safetensors summary when present,
+    otherwise from the safetensors headers of the weight files.
+    """
+    siblings = _siblings(data)
+    weights = _weight_files(siblings)
+
+    safetensors = getattr(data, 'safetensors', None)
+    parameters = _parameter_counts(getattr(safetensors, 'parameters', None))
+    if not parameters and weights and weights[0].rfilename.endswith('.safetensors') and api is not None:
+        parameters = _header_parameters(api, repo_id, revision, weights)
+
+    return ModelSize(_sum_sizes(siblings), _sum_sizes(weights), parameters)
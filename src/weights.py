@@ -0,0 +1,58 @@
+"""
+NetScore weight profiles
+The built-in default profile plus named profiles loaded from a JSON config file
+"""
+
+import json
+import os
+from typing import Dict, Optional
+
+# Weights based on typical ML engineering priorities (Sarah's priorities)
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    'Correctness': 0.4,      # Most important - does it work?
+    'Fairness': 0.25,        # Important for ethical AI
+    'Maintainability': 0.25, # Important for long-term use
+    'License': 0.1           # Important but less critical
+}
+
+DEFAULT_PROFILE = 'default'
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'weight_profiles.json')
+
+
+def load_profiles(path: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """Named weight profiles: {"profile": {"Metric": weight, ...}, ...}
+
+    The built-in default profile is always available; the config file may add
+    profiles or override it. A missing default config file is not an error.
+    """
+    profiles = {DEFAULT_PROFILE: dict(DEFAULT_WEIGHTS)}
+    config_path = path or PROFILES_PATH
+    if path is None and not os.path.exists(config_path):
+        return profiles
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"{config_path}: expected an object of named profiles")
+    for name, weights in config.items():
+        profiles[name] = validate_weights(name, weights)
+    return profiles
+
+
+def validate_weights(name: str, weights) -> Dict[str, float]:
+    if not isinstance(weights, dict) or not weights:
+        raise ValueError(f"profile {name!r}: expected an object of metric weights")
+    validated = {}
+    for metric, weight in weights.items():
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+            raise ValueError(f"profile {name!r}: weight for {metric} must be a non-negative number")
+        validated[metric] = float(weight)
+    return validated
+
+
+def get_profile(name: str = DEFAULT_PROFILE, path: Optional[str] = None) -> Dict[str, float]:
+    profiles = load_profiles(path)
+    if name not in profiles:
+        raise ValueError(f"unknown weight profile {name!r} (available: {', '.join(sorted(profiles))})")
+    return profiles[name]
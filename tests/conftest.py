@@ -0,0 +1,23 @@
+"""
+Shared test setup
+"""
+import os
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def license_index_cache(tmp_path_factory):
+    """Keep the license index cache out of the home directory of whoever runs the suite
+
+    Set for the whole session (and inherited by subprocesses), since any test
+    scoring License loads the process-wide index.
+    """
+    path = str(tmp_path_factory.mktemp('licenses') / 'license_index.json')
+    previous = os.environ.get('LICENSE_INDEX_CACHE')
+    os.environ['LICENSE_INDEX_CACHE'] = path
+    yield path
+    if previous is None:
+        del os.environ['LICENSE_INDEX_CACHE']
+    else:
+        os.environ['LICENSE_INDEX_CACHE'] = previous
@@ -0,0 +1,49 @@
+"""
+Smoke tests for the scoring benchmark suite
+"""
+import sys
+import os
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+import bench_scoring
+
+
+def test_generated_file_matches_sample_mix():
+    """Synthetic files mix models, datasets and code like sample_urls.txt"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'urls.txt')
+        assert bench_scoring.generate_url_file(path, 10) == 4
+        with open(path) as f:
+            lines = f.read().splitlines()
+    assert len(lines) == 10
+    assert sum('github.com' in line for line in lines) == 2
+
+
+def test_bench_pipeline_reports_metrics():
+    """A tiny run scores every model once against the fake Hub"""
+    case = bench_scoring.bench_pipeline(50, workers=2, latency='none', seed=0)
+    assert case['models'] == case['expected_models'] == 20
+    assert case['hub_calls'] == 20
+    assert case['models_per_s'] > 0
+    assert case['p50_ms'] <= case['p95_ms'] <= case['p99_ms']
+    assert case['peak_rss_mb'] > 0
+    assert case['stages']['fetch']['count'] == 20
+
+
+def test_main_writes_comparable_json():
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'bench.json')
+        assert bench_scoring.main(['--sizes', '25', '--skip-micro', '--rescore-rows', '2000',
+                                   '--schedule-models', '16', '--memory-models', '20',
+                                   '--writer-rows', '100', '--output', output]) == 0
+        with open(output) as f:
+            results = json.load(f)
+    assert results['pipeline'][0]['lines'] == 25
+    assert results['rescore']['rows'] == 2000 and results['rescore']['vectorized_s'] >= 0
+    assert results['schedule']['models'] == 16 and results['schedule']['longest_first_s'] > 0
+    memory = results['metadata_memory']
+    assert memory['record_bytes_per_model'] < memory['full_bytes_per_model']
+    assert results['writer']['rows'] == 100 and results['writer']['fast_buffered_lines_per_s'] > 0
+    assert bench_scoring.compare(results, results)
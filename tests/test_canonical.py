@@ -0,0 +1,84 @@
+"""
+Tests for URL canonicalization and de-duplication
+"""
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from canonical import canonicalize_url, CanonicalModel, DuplicateTracker
+
+
+def test_variants_share_a_canonical_key():
+    """Host, case, trailing paths and the default branch all normalize away"""
+    variants = [
+        "https://huggingface.co/google/gemma-3-270m",
+        "https://huggingface.co/google/gemma-3-270m/",
+        "https://huggingface.co/google/gemma-3-270m/tree/main",
+        "https://www.huggingface.co/Google/Gemma-3-270M",
+        "http://hf.co/google/gemma-3-270m/blob/main/config.json",
+        "https://huggingface.co/google/gemma-3-270m?library=transformers#usage",
+        "huggingface.co/google/gemma-3-270m",
+    ]
+    keys = {canonicalize_url(url).key for url in variants}
+    assert keys == {('google/gemma-3-270m', None)}
+
+
+def test_revision_is_part_of_the_key():
+    canonical = canonicalize_url("https://huggingface.co/org/model/tree/v1.0/subdir")
+    assert canonical == CanonicalModel('org/model', 'v1.0')
+    assert canonical.url == "https://huggingface.co/org/model/tree/v1.0"
+    assert canonicalize_url("https://huggingface.co/org/model/resolve/refs%2Fpr%2F3/x").revision == 'refs/pr/3'
+    assert canonical.key != canonicalize_url("https://huggingface.co/org/model").key
+
+
+def test_non_model_urls_are_not_canonicalized():
+    for url in ["https://huggingface.co/datasets/squad/plain",
+                "https://github.com/org/repo",
+                "https://huggingface.co/single",
+                "https://huggingface.co/spaces/org/demo"]:
+        assert canonicalize_url(url) is None
+
+
+def test_tracker_owner_then_duplicates():
+    tracker = DuplicateTracker(size=2)
+    slot, owner = tracker.claim(('a', None))
+    again, second_owner = tracker.claim(('a', None))
+    assert owner and not second_owner and slot is again
+    assert tracker.duplicates == 1
+
+
+def test_duplicates_scored_once_and_echoed_per_line():
+    """Variant URLs cost one Hub round trip but each line gets its own result"""
+    urls = [
+        "https://huggingface.co/org/model",
+        "https://huggingface.co/datasets/org/data",
+        "https://huggingface.co/org/model/tree/main",
+        "https://huggingface.co/ORG/Model",
+        "https://huggingface.co/org/other",
+    ]
+    mock_api = MagicMock()
+    for workers in (1, 4):
+        mock_api.reset_mock()
+        with patch('run.HfApi', return_value=mock_api):
+            results = run.evaluate_urls(urls, workers=workers)
+        assert [r['URL'] for r in results] == [urls[0], urls[2], urls[3], urls[4]]
+        assert mock_api.model_info.call_count == 2
+        assert results[0]['NetScore'] == results[1]['NetScore'] == results[2]['NetScore']
+
+
+def test_no_dedupe_scores_every_line():
+    urls = ["https://huggingface.co/org/model", "https://huggingface.co/ORG/Model"]
+    mock_api = MagicMock()
+    with patch('run.HfApi', return_value=mock_api):
+        run.evaluate_urls(urls, dedupe=False)
+    assert mock_api.model_info.call_count == 2
+
+
+def test_revision_reaches_model_info():
+    """A /tree/<rev> URL fetches that revision"""
+    mock_api = MagicMock()
+    with patch('run.HfApi', return_value=mock_api):
+        run.evaluate_urls(["https://huggingface.co/org/model/tree/v2"])
+    mock_api.model_info.assert_called_once_with('org/model', revision='v2')
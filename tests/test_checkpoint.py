@@ -0,0 +1,122 @@
+"""
+Tests for checkpointed, resumable scoring runs
+"""
+import sys
+import os
+import json
+import tempfile
+from unittest.mock import patch, MagicMock
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from checkpoint import CheckpointJournal, checkpoint_key
+
+URLS = [f"https://huggingface.co/org/model-{i}" for i in range(5)]
+
+
+@pytest.fixture
+def workdir():
+    with tempfile.TemporaryDirectory() as tmp:
+        url_path = os.path.join(tmp, 'urls.txt')
+        with open(url_path, 'w') as f:
+            f.write('\n'.join(URLS) + '\n')
+        yield url_path, os.path.join(tmp, 'journal.ndjson')
+
+
+def test_checkpoint_key_is_canonical():
+    assert checkpoint_key("https://www.huggingface.co/Org/Model/tree/main") == \
+        checkpoint_key("https://huggingface.co/org/model") == \
+        "https://huggingface.co/org/model"
+    assert checkpoint_key("https://github.com/a/b ") == "https://github.com/a/b"
+
+
+def test_interrupted_run_resumes_remaining_models(workdir):
+    """A run killed after 3 models only scores the last 2 when resumed"""
+    url_path, journal_path = workdir
+    api = MagicMock()
+    calls = []
+
+    def model_info(repo_id, **kwargs):
+        calls.append(repo_id)
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        return MagicMock()
+
+    api.model_info.side_effect = model_info
+    with patch('run.HfApi', return_value=api):
+        with patch('sys.stdout', new=StringIO()):
+            with pytest.raises(KeyboardInterrupt):
+                run.process_url_file(url_path, checkpoint=journal_path)
+
+    with open(journal_path) as f:
+        assert len(f.readlines()) == 3
+
+    api.model_info.side_effect = None
+    api.model_info.reset_mock()
+    with patch('run.HfApi', return_value=api):
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with patch('sys.stderr', new=StringIO()) as fake_err:
+                assert run.process_url_file(url_path, checkpoint=journal_path, resume=True) == 0
+
+    results = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+    assert [r['URL'] for r in results] == URLS
+    assert api.model_info.call_count == 2
+    assert '3 results replayed' in fake_err.getvalue()
+    with open(journal_path) as f:
+        assert len(f.readlines()) == 5
+
+
+def test_resume_rescores_models_journaled_with_other_metrics(workdir):
+    """A --metrics License run is not replayed into a resumed run over the default metrics"""
+    url_path, journal_path = workdir
+    api = MagicMock()
+    with patch('run.HfApi', return_value=api):
+        with patch('sys.stdout', new=StringIO()):
+            assert run.process_url_file(url_path, checkpoint=journal_path, metrics=['License']) == 0
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with patch('sys.stderr', new=StringIO()) as fake_err:
+                assert run.process_url_file(url_path, checkpoint=journal_path, resume=True) == 0
+
+    results = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+    assert all('Correctness' in r and 'Maintainability' in r for r in results)
+    assert '0 results replayed' in fake_err.getvalue()
+
+    journal = CheckpointJournal(journal_path, resume=True)
+    assert journal.lookup(URLS[0], ['License']) is None   # Superseded by the full result
+    assert journal.lookup(URLS[0], run.METRICS.plan().names)['Correctness'] is not None
+    journal.close()
+
+
+def test_resume_tolerates_torn_last_line(workdir):
+    _, journal_path = workdir
+    with open(journal_path, 'w') as f:
+        f.write(json.dumps({'key': checkpoint_key(URLS[0]), 'result': {'URL': URLS[0], 'NetScore': 0.5}}) + '\n')
+        f.write('{"key": "https://huggingface.co/org/mod')
+
+    journal = CheckpointJournal(journal_path, resume=True)
+    assert list(journal.completed) == [checkpoint_key(URLS[0])]
+    assert journal.lookup(URLS[0].upper().replace('HTTPS://HUGGINGFACE.CO', 'https://huggingface.co'))['NetScore'] == 0.5
+    journal.append(URLS[1], {'URL': URLS[1], 'NetScore': 0.7})
+    journal.close()
+
+    reloaded = CheckpointJournal(journal_path, resume=True)
+    assert len(reloaded.completed) == 2
+    reloaded.close()
+
+
+def test_fresh_checkpoint_truncates_old_journal(workdir):
+    _, journal_path = workdir
+    with open(journal_path, 'w') as f:
+        f.write('stale\n')
+    CheckpointJournal(journal_path).close()
+    assert os.path.getsize(journal_path) == 0
+
+
+def test_resume_requires_checkpoint(workdir):
+    url_path, _ = workdir
+    with patch('sys.stderr', new=StringIO()) as fake_err:
+        assert run.process_url_file(url_path, resume=True) == 1
+    assert '--checkpoint' in fake_err.getvalue()
@@ -0,0 +1,104 @@
+"""
+Tests for concurrent model evaluation
+"""
+import sys
+import os
+import time
+import threading
+from unittest.mock import patch, MagicMock
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+
+
+def _slow_api(delays):
+    """Mock HfApi whose model_info sleeps for a per-repo delay (seconds)"""
+    mock_api = MagicMock()
+
+    def model_info(repo_id, **kwargs):
+        time.sleep(delays.get(repo_id, 0))
+        data = MagicMock()
+        data.tags = ['nlp']
+        return data
+
+    mock_api.model_info.side_effect = model_info
+    return mock_api
+
+
+def test_concurrent_results_keep_input_order():
+    """Workers finish out of order but results come back in input order"""
+    urls = [f"https://huggingface.co/org/model-{i}" for i in range(6)]
+    delays = {f"org/model-{i}": 0.05 * (6 - i) for i in range(6)}
+
+    with patch('run.HfApi', return_value=_slow_api(delays)):
+        results = run.evaluate_urls(urls, workers=6)
+
+    assert [r['URL'] for r in results] == urls
+
+
+def test_unordered_results_follow_completion_order():
+    """With ordered=False the fastest model is emitted first"""
+    urls = ["https://huggingface.co/org/slow", "https://huggingface.co/org/fast"]
+    delays = {'org/slow': 0.2, 'org/fast': 0.0}
+
+    with patch('run.HfApi', return_value=_slow_api(delays)):
+        results = run.evaluate_urls(urls, workers=2, ordered=False)
+
+    assert [r['URL'] for r in results] == [urls[1], urls[0]]
+
+
+def test_concurrent_run_overlaps_fetches():
+    """Four 0.2s fetches on four workers take well under the sequential 0.8s"""
+    urls = [f"https://huggingface.co/org/model-{i}" for i in range(4)]
+    delays = {f"org/model-{i}": 0.2 for i in range(4)}
+    peak = {'active': 0, 'max': 0}
+    lock = threading.Lock()
+    api = _slow_api(delays)
+    original = api.model_info.side_effect
+
+    def tracking_model_info(repo_id, **kwargs):
+        with lock:
+            peak['active'] += 1
+            peak['max'] = max(peak['max'], peak['active'])
+        try:
+            return original(repo_id, **kwargs)
+        finally:
+            with lock:
+                peak['active'] -= 1
+
+    api.model_info.side_effect = tracking_model_info
+
+    with patch('run.HfApi', return_value=api):
+        start = time.time()
+        results = run.evaluate_urls(urls, workers=4)
+        elapsed = time.time() - start
+
+    assert len(results) == 4
+    assert peak['max'] > 1
+    assert elapsed < 0.6
+    # Fetch time is reported per model, not inflated by the other workers
+    for result in results:
+        assert 150 <= result['Fetch_Latency'] < 600
+
+
+def test_main_forwards_worker_options():
+    """./run <URL_FILE> --workers N --unordered reaches process_url_file"""
+    with patch('sys.argv', ['run.py', 'urls.txt', '--workers', '8', '--unordered']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with patch('sys.exit') as mock_exit:
+                run.main()
+                mock_process.assert_called_once_with('urls.txt', workers=8, ordered=False)
+                mock_exit.assert_called_with(0)
+
+
+def test_main_rejects_bad_worker_count():
+    """A non-positive worker count is a usage error"""
+    with patch('sys.argv', ['run.py', 'urls.txt', '--workers', '0']):
+        with patch('sys.stderr', new=StringIO()) as fake_err:
+            try:
+                run.main()
+                assert False, "Should have exited"
+            except SystemExit as e:
+                assert e.code == 1
+            assert 'Usage' in fake_err.getvalue()
@@ -96,9 +96,16 @@ def test_run_tests_import_error_handling():
             MagicMock(stdout="TOTAL    100    20    80%")  # Coverage report
         ]
         
-        with patch('builtins.__import__', side_effect=ImportError):
+        real_import = __import__
+        def import_without_coverage(name, *args, **kwargs):
+            if name == 'coverage':
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        with patch('builtins.__import__', side_effect=import_without_coverage):
             result = run.run_tests()
             assert result == 0
+        assert mock_run.call_args_list[0].args[0][-2:] == ['coverage', 'pytest']
 
 
 def test_run_tests_parsing():
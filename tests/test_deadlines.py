@@ -0,0 +1,170 @@
+"""
+Tests for request timeouts, per-model deadlines and the run time budget
+"""
+import sys
+import os
+import json
+import time
+import threading
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from deadline import Deadline, call_with_deadline, on_abandon, DEFAULT_REQUEST_TIMEOUT
+from checkpoint import CheckpointJournal
+
+URLS = [f"https://huggingface.co/org/model-{i}" for i in range(3)]
+
+
+class SlowHub:
+    """model_info stand-in that hangs on the repos listed in slow"""
+
+    def __init__(self, slow=(), delay=5.0):
+        self.slow = set(slow)
+        self.delay = delay
+        self.calls = []
+        self.release = threading.Event()
+
+    def model_info(self, repo_id, **kwargs):
+        self.calls.append((repo_id, kwargs))
+        if repo_id in self.slow:
+            self.release.wait(self.delay)
+        return SimpleNamespace(sha='a' * 40, tags=['nlp'], card_data=None,
+                               last_modified='2025-01-01')
+
+
+def test_deadline_after_never_outlives_parent():
+    parent = Deadline.after(1.0)
+    assert Deadline.after(10.0, parent=parent).expires_at == parent.expires_at
+    assert Deadline.after(None, parent=parent).expires_at == parent.expires_at
+    assert not Deadline.after(None).bounded
+    assert Deadline.after(0.01).remaining() <= 0.01
+
+
+def test_call_with_deadline():
+    assert call_with_deadline(lambda: 42, None) == (True, 42)
+    assert call_with_deadline(lambda: 42, Deadline.after(1.0)) == (True, 42)
+    assert call_with_deadline(lambda: time.sleep(1.0), Deadline.after(0.05)) == (False, None)
+    assert call_with_deadline(lambda: 42, Deadline.after(0)) == (False, None)
+    with pytest.raises(ValueError):
+        call_with_deadline(lambda: int('x'), Deadline.after(1.0))
+
+
+def test_hanging_fetch_yields_partial_result():
+    hub = SlowHub(slow={'org/model-1'})
+    start = time.monotonic()
+    with patch('run.HfApi', return_value=hub):
+        results = list(run.iter_evaluations(URLS, workers=3, model_deadline=0.2))
+    hub.release.set()
+    assert time.monotonic() - start < 2.0
+
+    assert [r['URL'] for r in results] == URLS
+    partial = results[1]
+    assert partial['Timed_Out'] == ['Correctness', 'Maintainability', 'License']
+    assert partial['Correctness'] is None and partial['Correctness_Latency'] is None
+    assert partial['Fairness'] == 0.6
+    assert partial['NetScore'] == round(0.6 * 0.25, 3)
+    assert 'Timed_Out' not in results[0] and 'Timed_Out' not in results[2]
+
+
+def test_spent_time_budget_skips_remaining_fetches():
+    hub = SlowHub(slow={'org/model-0'})
+    with patch('run.HfApi', return_value=hub):
+        results = list(run.iter_evaluations(URLS, workers=1, time_budget=0.2))
+    hub.release.set()
+    # The first model spends the budget; the rest never reach the Hub
+    assert [repo for repo, _ in hub.calls] == ['org/model-0']
+    assert all('Timed_Out' in r for r in results)
+
+
+def test_abandoned_fetch_frees_its_throttle_slot():
+    urls = [f"https://huggingface.co/org/model-{i}" for i in range(4)]
+    hub = SlowHub(slow={'org/model-0'}, delay=3.0)
+    start = time.monotonic()
+    with patch('run.HfApi', return_value=hub):
+        results = list(run.iter_evaluations(urls, workers=1, model_deadline=0.5))
+    hub.release.set()
+    # The hung request no longer holds the only slot, so healthy models after it still score
+    assert time.monotonic() - start < 2.0
+    assert results[0]['Timed_Out']
+    assert all('Timed_Out' not in r and r['License'] is not None for r in results[1:])
+
+
+def test_abandon_callbacks_run_when_the_deadline_gives_up():
+    abandoned = []
+    def hang():
+        with on_abandon(lambda: abandoned.append('slow')):
+            time.sleep(0.5)
+    assert call_with_deadline(hang, Deadline.after(0.05)) == (False, None)
+    assert abandoned == ['slow']
+    def quick():
+        with on_abandon(lambda: abandoned.append('quick')):
+            return 1
+    assert call_with_deadline(quick, Deadline.after(1.0)) == (True, 1)
+    with on_abandon(lambda: abandoned.append('outside')):
+        pass
+    assert abandoned == ['slow']
+
+
+def test_request_timeout_is_passed_to_model_info():
+    hub = SlowHub()
+    with patch('run.HfApi', return_value=hub):
+        list(run.iter_evaluations(URLS[:1], request_timeout=7.5))
+    assert hub.calls[0][1]['timeout'] == 7.5
+
+
+def test_partial_results_are_not_journaled():
+    hub = SlowHub(slow={'org/model-1'})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal')
+        journal = CheckpointJournal(path)
+        try:
+            with patch('run.HfApi', return_value=hub):
+                list(run.iter_evaluations(URLS, workers=3, model_deadline=0.2, journal=journal))
+            hub.release.set()
+        finally:
+            journal.close()
+        resumed = CheckpointJournal(path, resume=True)
+        try:
+            assert resumed.lookup(URLS[0]) is not None
+            assert resumed.lookup(URLS[1]) is None
+        finally:
+            resumed.close()
+
+
+def test_process_url_file_applies_default_request_timeout():
+    hub = SlowHub()
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write(URLS[0] + '\n')
+    try:
+        with patch('run.HfApi', return_value=hub):
+            with patch('sys.stdout', new=StringIO()) as fake_out:
+                assert run.process_url_file(f.name) == 0
+        assert json.loads(fake_out.getvalue())['URL'] == URLS[0]
+        assert hub.calls[0][1]['timeout'] == DEFAULT_REQUEST_TIMEOUT
+    finally:
+        os.unlink(f.name)
+
+
+def test_deadline_options_reach_process_url_file():
+    argv = ['run', 'urls.txt', '--request-timeout', '5', '--model-deadline', '20',
+            '--time-budget', '600']
+    with patch('sys.argv', argv):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with pytest.raises(SystemExit):
+                run.main()
+    mock_process.assert_called_once_with('urls.txt', request_timeout=5.0,
+                                         model_deadline=20.0, time_budget=600.0)
+
+
+def test_deadline_options_reject_non_positive():
+    with patch('sys.argv', ['run', 'urls.txt', '--model-deadline', '0']):
+        with patch('sys.stderr', new=StringIO()):
+            with pytest.raises(SystemExit) as exc:
+                run.main()
+    assert exc.value.code == 1
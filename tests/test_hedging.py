@@ -0,0 +1,128 @@
+"""
+Tests for hedged metadata fetches
+"""
+import sys
+import os
+import time
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from hedging import HedgePolicy
+from metadata import MetadataFetcher
+
+
+def _warmed(seconds=0.01, **kwargs):
+    policy = HedgePolicy(min_samples=5, **kwargs)
+    for _ in range(5):
+        policy.observe(seconds)
+    return policy
+
+
+class StragglerHub:
+    """model_info stand-in whose first request per repo hangs"""
+
+    def __init__(self, hang=2.0):
+        self.hang = hang
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def model_info(self, repo_id, **kwargs):
+        with self._lock:
+            count = self.calls[repo_id] = self.calls.get(repo_id, 0) + 1
+        time.sleep(self.hang if count == 1 else 0.001)
+        # The sha tells which attempt answered
+        return SimpleNamespace(sha=str(count) * 40, tags=['nlp'], card_data=None,
+                               last_modified='2025-01-01')
+
+
+def test_delay_is_the_percentile_of_recent_latencies():
+    policy = HedgePolicy(percentile=90, min_samples=10, min_delay=0)
+    assert policy.delay() is None
+    for ms in range(1, 101):
+        policy.observe(ms / 1000)
+    assert policy.delay() == pytest.approx(0.091)
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=100)
+
+
+def test_no_hedge_without_history_or_for_fast_calls():
+    policy = HedgePolicy(min_samples=5)
+    assert policy.call(lambda: 1) == 1
+    warmed = _warmed(0.5)
+    assert warmed.call(lambda: 2) == 2
+    assert warmed.stats['hedges_sent'] == 0 and warmed.stats['requests'] == 1
+
+
+def test_slow_request_is_hedged_and_hedge_wins():
+    policy = _warmed(0.01)
+    hub = StragglerHub()
+    start = time.monotonic()
+    result = policy.call(lambda: hub.model_info('org/model'))
+    assert time.monotonic() - start < 1.0
+    assert result.sha == '2' * 40
+    assert policy.stats['hedges_sent'] == 1 and policy.stats['hedges_won'] == 1
+
+
+def test_primary_can_still_win():
+    policy = _warmed(0.01)
+    calls = []
+
+    def request():
+        calls.append(1)
+        attempt = len(calls)
+        # The primary is a little slow; the hedge is much slower
+        time.sleep(0.05 if attempt == 1 else 1.0)
+        return attempt
+
+    assert policy.call(request) == 1
+    assert policy.stats['hedges_sent'] == 1 and policy.stats['hedges_won'] == 0
+
+
+def test_failures_fall_back_to_the_other_attempt():
+    policy = _warmed(0.01)
+    calls = []
+
+    def request():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.05)
+            raise ValueError("primary failed")
+        time.sleep(0.1)
+        return 'hedge'
+
+    assert policy.call(request) == 'hedge'
+    with pytest.raises(ValueError):
+        policy.call(lambda: int('x'))
+
+
+def test_fetcher_hedges_full_fetches():
+    policy = _warmed(0.01)
+    hub = StragglerHub()
+    fetcher = MetadataFetcher(lambda: hub, hedge=policy)
+    metadata = fetcher.get('org/model')
+    assert metadata.ok and metadata.data.sha == '2' * 40
+    assert hub.calls['org/model'] == 2
+
+
+def test_hedge_option_reports_counters(tmp_path):
+    url_path = tmp_path / 'urls.txt'
+    url_path.write_text("https://huggingface.co/org/a\nhttps://huggingface.co/org/b\n")
+    hub = StragglerHub(hang=0.0)
+    with patch('run.HfApi', return_value=hub):
+        with patch('sys.stdout', new=StringIO()):
+            with patch('sys.stderr', new=StringIO()) as fake_err:
+                assert run.process_url_file(str(url_path), hedge=95) == 0
+    assert 'Hedging: 0 hedges sent, 0 won of 2 fetches' in fake_err.getvalue()
+
+    with patch('sys.argv', ['run', 'urls.txt', '--hedge', '99']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with pytest.raises(SystemExit):
+                run.main()
+    mock_process.assert_called_once_with('urls.txt', hedge=99.0)
+
@@ -0,0 +1,173 @@
+"""
+Tests for the persistent Hub metadata cache
+"""
+import sys
+import os
+import time
+import sqlite3
+import tempfile
+from unittest.mock import patch, MagicMock
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from hub_cache import MetadataCache
+from metadata import MetadataFetcher, STATUS_OK
+
+ModelInfo = pytest.importorskip('huggingface_hub.hf_api').ModelInfo
+
+
+def _model(repo_id, sha='abc123'):
+    return ModelInfo(id=repo_id, sha=sha, lastModified='2024-01-01T00:00:00.000Z',
+                     tags=['nlp'], cardData={'license': 'mit'})
+
+
+@pytest.fixture
+def cache_path():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield os.path.join(tmp, 'hub_cache.db')
+
+
+def test_warm_cache_skips_network(cache_path):
+    """A second run within the TTL serves model_info from disk"""
+    api = MagicMock()
+    api.model_info.return_value = _model('org/model')
+
+    cold = MetadataCache(cache_path)
+    assert MetadataFetcher(lambda: api, cache=cold).get('org/model').status == STATUS_OK
+    cold.close()
+
+    warm = MetadataCache(cache_path)
+    metadata = MetadataFetcher(lambda: api, cache=warm).get('org/model')
+
+    assert metadata.ok
+    assert metadata.data.card_data.license == 'mit'
+    assert api.model_info.call_count == 1
+    assert warm.stats['hits'] == 1
+    warm.close()
+
+
+def test_stale_entry_revalidated_by_sha(cache_path):
+    """An expired entry with an unchanged sha only costs a lightweight probe"""
+    api = MagicMock()
+    api.model_info.return_value = _model('org/model')
+    cache = MetadataCache(cache_path, ttl=0)
+
+    MetadataFetcher(lambda: api, cache=cache).get('org/model')
+    metadata = MetadataFetcher(lambda: api, cache=cache).get('org/model')
+
+    assert metadata.ok
+    assert cache.stats['revalidated'] == 1
+    assert cache.stats['misses'] == 1
+    _, kwargs = api.model_info.call_args
+    assert kwargs['expand'] == ['sha', 'lastModified']
+    cache.close()
+
+
+def test_changed_sha_triggers_full_fetch(cache_path):
+    """An expired entry whose sha moved is refetched and replaced"""
+    api = MagicMock()
+    api.model_info.return_value = _model('org/model', sha='old')
+    cache = MetadataCache(cache_path, ttl=0)
+    MetadataFetcher(lambda: api, cache=cache).get('org/model')
+
+    api.model_info.return_value = _model('org/model', sha='new')
+    metadata = MetadataFetcher(lambda: api, cache=cache).get('org/model')
+
+    assert metadata.data.sha == 'new'
+    assert cache.stats['misses'] == 2
+    assert cache.lookup('org/model').sha == 'new'
+    cache.close()
+
+
+def test_cache_keyed_by_revision(cache_path):
+    """Different revisions of the same repo are cached separately"""
+    cache = MetadataCache(cache_path)
+    cache.store('org/model', None, _model('org/model', sha='main-sha'))
+    cache.store('org/model', 'v1', _model('org/model', sha='v1-sha'))
+
+    assert cache.lookup('org/model').sha == 'main-sha'
+    assert cache.lookup('org/model', 'main').sha == 'main-sha'
+    assert cache.lookup('org/model', 'v1').sha == 'v1-sha'
+    cache.close()
+
+
+def test_entries_without_file_metadata_only_serve_runs_that_skip_it(cache_path):
+    """A response fetched without files_metadata never stands in for a full one"""
+    api = MagicMock()
+    api.model_info.return_value = _model('org/model')
+    cache = MetadataCache(cache_path)
+
+    MetadataFetcher(lambda: api, cache=cache, files_metadata=False).get('org/model')
+    api.model_info.assert_called_once_with('org/model')
+    assert cache.lookup('org/model') is None
+    assert not cache.lookup('org/model', files=False).files
+
+    MetadataFetcher(lambda: api, cache=cache).get('org/model')
+    assert api.model_info.call_args.kwargs == {'files_metadata': True}
+    # The newer full response now answers both kinds of run
+    assert MetadataFetcher(lambda: api, cache=cache, files_metadata=False).get('org/model').ok
+    assert api.model_info.call_count == 2
+    assert cache.lookup('org/model', files=False).files
+    cache.close()
+
+
+def test_locked_cache_does_not_drop_the_model(cache_path):
+    """Reads and writes blocked by another process are a miss; the fetched metadata is still used"""
+    api = MagicMock()
+    api.model_info.return_value = _model('org/model')
+    with patch('hub_cache.BUSY_TIMEOUT', 0.05):
+        cache = MetadataCache(cache_path)
+    other = sqlite3.connect(cache_path)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        assert MetadataFetcher(lambda: api, cache=cache).get('org/model').ok
+        cache.touch('org/model')
+        cache.store_size('org/model', 'abc123', 1, 1, {})
+    finally:
+        other.rollback()
+        other.close()
+    assert cache.stats['write_errors'] == 3
+    assert cache.store('org/model', None, _model('org/model'))
+    cache.close()
+
+
+def test_lru_eviction(cache_path):
+    """The least recently used entry is evicted once the cache is full"""
+    cache = MetadataCache(cache_path, max_entries=2)
+    cache.store('org/a', None, _model('org/a'))
+    time.sleep(0.01)
+    cache.store('org/b', None, _model('org/b'))
+    time.sleep(0.01)
+    cache.touch('org/a')
+    time.sleep(0.01)
+    cache.store('org/c', None, _model('org/c'))
+
+    assert len(cache) == 2
+    assert cache.lookup('org/b') is None
+    assert cache.lookup('org/a') is not None
+    assert cache.stats['evictions'] == 1
+    cache.close()
+
+
+def test_process_url_file_reports_cache_summary(cache_path):
+    """--cache prints hit/miss counters to stderr and keeps stdout NDJSON only"""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
+        f.write("https://huggingface.co/org/model\n")
+        url_path = f.name
+
+    api = MagicMock()
+    api.model_info.return_value = _model('org/model')
+    try:
+        with patch('run.HfApi', return_value=api):
+            for _ in range(2):
+                with patch('sys.stdout', new=StringIO()) as fake_out:
+                    with patch('sys.stderr', new=StringIO()) as fake_err:
+                        assert run.process_url_file(url_path, cache_path=cache_path) == 0
+        assert fake_out.getvalue().count('\n') == 1
+        assert 'Metadata cache: 1 hits' in fake_err.getvalue()
+        assert api.model_info.call_count == 1
+    finally:
+        os.unlink(url_path)
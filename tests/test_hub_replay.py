@@ -0,0 +1,181 @@
+"""
+Tests for the Hub record/replay stand-in
+"""
+import sys
+import os
+import json
+import time
+import tempfile
+from unittest.mock import patch, MagicMock
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from hub_throttle import HubThrottle
+from hub_replay import (
+    RecordingApi, ReplayApi, ReplayedHTTPError, CassetteMiss, parse_latency
+)
+
+ModelInfo = pytest.importorskip('huggingface_hub.hf_api').ModelInfo
+
+URLS = [
+    "https://huggingface.co/org/open-model",
+    "https://huggingface.co/org/missing-model",
+]
+
+
+def _real_api():
+    """Mock HfApi returning a full ModelInfo for one repo and a 404 for the other"""
+    api = MagicMock()
+
+    def model_info(repo_id, **kwargs):
+        if repo_id == 'org/missing-model':
+            error = Exception("404 Client Error: Repository Not Found")
+            error.response = MagicMock(status_code=404)
+            raise error
+        return ModelInfo(
+            id=repo_id, sha='abc', lastModified='2024-05-01T10:00:00.000Z',
+            tags=['text-generation'], cardData={'license': 'apache-2.0'},
+            siblings=[{'rfilename': 'model.safetensors', 'size': 1024,
+                       'lfs': {'size': 1024, 'sha256': 'f' * 64, 'pointerSize': 130}}],
+            safetensors={'parameters': {'F32': 256}, 'total': 256},
+        )
+
+    api.model_info.side_effect = model_info
+    return api
+
+
+@pytest.fixture
+def cassette():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield os.path.join(tmp, 'hub.jsonl')
+
+
+def test_record_then_replay_gives_identical_scores(cassette):
+    """Scores from a replayed run match the recorded live run"""
+    recorded = run.evaluate_urls(URLS, api_factory=lambda: RecordingApi(_real_api(), cassette))
+    with patch('run.HfApi', None):
+        replayed = run.evaluate_urls(URLS, api_factory=lambda: ReplayApi(cassette, latency='none'))
+
+    strip = lambda rows: [{k: v for k, v in r.items() if not k.endswith('Latency')} for r in rows]
+    assert strip(replayed) == strip(recorded)
+    assert replayed[0]['License'] == 0.9
+    assert replayed[1]['Correctness'] == 0.3
+
+
+def test_replay_restores_model_info_fields(cassette):
+    """Card data, siblings and safetensors survive the cassette round trip"""
+    RecordingApi(_real_api(), cassette).model_info('org/open-model')
+    info = ReplayApi(cassette, latency='none').model_info('org/open-model')
+
+    assert info.card_data.license == 'apache-2.0'
+    assert info.siblings[0].size == 1024
+    assert info.siblings[0].lfs.sha256 == 'f' * 64
+    assert info.safetensors.total == 256
+    assert info.last_modified.year == 2024
+
+
+def test_files_metadata_is_part_of_the_call_key(cassette):
+    """A response without file sizes never answers a call that asked for them"""
+    RecordingApi(_real_api(), cassette).model_info('org/open-model')
+    replay = ReplayApi(cassette, latency='none')
+    with pytest.raises(CassetteMiss):
+        replay.model_info('org/open-model', files_metadata=True)
+
+    RecordingApi(_real_api(), cassette).model_info('org/open-model', files_metadata=True)
+    replay = ReplayApi(cassette, latency='none')
+    assert replay.model_info('org/open-model', files_metadata=True).siblings[0].size == 1024
+    assert replay.misses == 0
+
+
+def test_size_metric_header_reads_replay(cassette):
+    """Safetensors header reads are recorded, so a replayed Size run matches the live one"""
+    api = _real_api()
+    api.model_info.side_effect = lambda repo_id, **kwargs: ModelInfo(
+        id=repo_id, sha='abc', siblings=[{'rfilename': 'model.safetensors', 'size': 1024}])
+    api.parse_safetensors_file_metadata.return_value = MagicMock(parameter_count={'F16': 512})
+    recorded = run.evaluate_urls(URLS[:1], metrics=['Size'],
+                                 api_factory=lambda: RecordingApi(api, cassette))
+    assert api.parse_safetensors_file_metadata.call_count == 1
+
+    replay = ReplayApi(cassette, latency='none')
+    header = replay.parse_safetensors_file_metadata(repo_id='org/open-model', filename='model.safetensors')
+    assert header.parameter_count == {'F16': 512}
+    with patch('run.HfApi', None):
+        with patch.object(replay, 'parse_safetensors_file_metadata',
+                          wraps=replay.parse_safetensors_file_metadata) as header_reads:
+            replayed = run.evaluate_urls(URLS[:1], metrics=['Size'], api_factory=lambda: replay)
+    assert header_reads.call_count == 1
+    assert replayed[0]['Size'] == recorded[0]['Size']
+    assert replay.misses == 0
+
+
+def test_replay_serves_recorded_errors_and_misses(cassette):
+    """Recorded failures are raised again; unknown repos are cassette misses"""
+    with pytest.raises(Exception):
+        RecordingApi(_real_api(), cassette).model_info('org/missing-model')
+    replay = ReplayApi(cassette, latency='none')
+
+    with pytest.raises(ReplayedHTTPError) as excinfo:
+        replay.model_info('org/missing-model')
+    assert excinfo.value.status_code == 404
+
+    with pytest.raises(CassetteMiss):
+        replay.model_info('org/never-recorded')
+    assert replay.misses == 1
+
+
+def test_replayed_429_is_rate_limited_not_inaccessible(cassette):
+    """A recorded 429 keeps its status and Retry-After, so it is retried and reported as throttling"""
+    api = MagicMock()
+    error = Exception("429 Client Error: Too Many Requests")
+    error.response = MagicMock(status_code=429, headers={'Retry-After': '0'})
+    api.model_info.side_effect = error
+    with pytest.raises(Exception):
+        RecordingApi(api, cassette).model_info('org/open-model')
+
+    replay = ReplayApi(cassette, latency='none')
+    with pytest.raises(ReplayedHTTPError) as excinfo:
+        replay.model_info('org/open-model')
+    assert excinfo.value.response.status_code == 429
+    assert excinfo.value.response.headers == {'Retry-After': '0'}
+
+    throttle = HubThrottle(max_retries=1, breaker_threshold=10)
+    [result] = run.iter_evaluations(URLS[:1], api_factory=lambda: replay, throttle=throttle)
+    assert throttle.stats['throttled'] == 2
+    assert 'Correctness' in result['Rate_Limited'] and result['Correctness'] is None
+
+
+def test_injected_latency(cassette):
+    """fixed:MS delays each replayed call; distributions are seeded"""
+    RecordingApi(_real_api(), cassette).model_info('org/open-model')
+    replay = ReplayApi(cassette, latency='fixed:50')
+    start = time.time()
+    replay.model_info('org/open-model')
+    assert time.time() - start >= 0.045
+
+    first = parse_latency('lognormal:40:0.5', seed=7)
+    second = parse_latency('lognormal:40:0.5', seed=7)
+    assert [first({}) for _ in range(5)] == [second({}) for _ in range(5)]
+
+    with pytest.raises(ValueError):
+        parse_latency('gaussian:1')
+
+
+def test_process_url_file_replay_offline(cassette):
+    """./run URLS --replay CASSETTE works with no Hub client at all"""
+    RecordingApi(_real_api(), cassette).model_info('org/open-model')
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
+        f.write(URLS[0] + "\n")
+        url_path = f.name
+
+    try:
+        with patch('run.HfApi', None):
+            with patch('sys.stdout', new=StringIO()) as fake_out:
+                assert run.process_url_file(url_path, replay=cassette, replay_latency='none') == 0
+        result = json.loads(fake_out.getvalue())
+        assert result['Correctness'] == 1.0
+    finally:
+        os.unlink(url_path)
@@ -0,0 +1,204 @@
+"""
+Tests for 429-aware retries, adaptive concurrency and the circuit breaker
+"""
+import sys
+import os
+import time
+import threading
+from email.utils import formatdate
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from hub_throttle import (HubThrottle, ThrottledApi, RateLimited, retry_after, is_rate_limited,
+                          CLOSED, OPEN, HALF_OPEN)
+from metadata import MetadataFetcher, STATUS_RATE_LIMITED, STATUS_FETCH_ERROR
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def throttled(retry='0'):
+    return FakeHTTPError(429, {'Retry-After': retry} if retry is not None else {})
+
+
+class FlakyHub:
+    """model_info stand-in that answers 429 for the first `throttle` calls per repo"""
+
+    def __init__(self, throttle=0, error=None):
+        self.throttle = throttle
+        self.error = error
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def model_info(self, repo_id, **kwargs):
+        with self._lock:
+            count = self.calls[repo_id] = self.calls.get(repo_id, 0) + 1
+        if count <= self.throttle:
+            raise throttled()
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(sha='a' * 40, tags=['nlp'], card_data=None,
+                               last_modified='2025-01-01')
+
+
+def test_retry_after_forms():
+    assert retry_after(throttled('3')) == 3.0
+    assert retry_after(throttled(None)) is None
+    assert 8 <= retry_after(throttled(formatdate(time.time() + 10, usegmt=True))) <= 10
+    assert retry_after(throttled('garbage')) is None
+    assert is_rate_limited(throttled()) and not is_rate_limited(FakeHTTPError(404))
+
+
+def test_retries_429_and_honours_retry_after():
+    hub = FlakyHub(throttle=2)
+    throttle = HubThrottle(max_concurrency=4, breaker_threshold=10)
+    with patch('hub_throttle.retry_after', return_value=0.05):
+        start = time.monotonic()
+        result = ThrottledApi(hub, throttle).model_info('org/model')
+    assert result.sha == 'a' * 40
+    assert time.monotonic() - start >= 0.1
+    assert hub.calls['org/model'] == 3
+    assert throttle.stats['throttled'] == 2 and throttle.stats['retries'] == 2
+
+
+def test_other_errors_are_not_retried():
+    hub = FlakyHub(error=FakeHTTPError(404))
+    throttle = HubThrottle()
+    with pytest.raises(FakeHTTPError):
+        ThrottledApi(hub, throttle).model_info('org/missing')
+    assert hub.calls['org/missing'] == 1 and throttle.stats['throttled'] == 0
+
+
+def test_gives_up_with_rate_limited():
+    throttle = HubThrottle(max_retries=2, breaker_threshold=10)
+    with pytest.raises(RateLimited):
+        ThrottledApi(FlakyHub(throttle=10), throttle).model_info('org/model')
+    assert throttle.stats['gave_up'] == 1
+
+
+def test_aimd_halves_once_per_burst_and_recovers():
+    throttle = HubThrottle(max_concurrency=8, breaker_threshold=100)
+    # Requests that were all in flight when the Hub started throttling count once
+    started = [throttle._acquire() for _ in range(4)]
+    for when in started:
+        throttle._release(when, throttled=True, delay=0)
+    assert throttle.limit == 4
+    throttle._release(throttle._acquire(), throttled=True, delay=0)
+    assert throttle.limit == 2
+    for _ in range(20):
+        throttle._release(throttle._acquire())
+    assert 2 < throttle.limit <= 8
+
+
+def test_concurrency_limit_bounds_requests_in_flight():
+    throttle = HubThrottle(max_concurrency=2)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def request():
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+
+    threads = [threading.Thread(target=throttle.call, args=(request,)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+
+def test_breaker_opens_and_closes_after_probe():
+    throttle = HubThrottle(max_concurrency=4, breaker_threshold=3, breaker_cooldown=0.05)
+    for _ in range(3):
+        throttle._release(throttle._acquire(), throttled=True, delay=0)
+    assert throttle.state == OPEN and throttle.stats['breaker_trips'] == 1
+
+    start = time.monotonic()
+    probe = throttle._acquire()
+    assert time.monotonic() - start >= 0.04
+    throttle._release(probe)
+    assert throttle.state == CLOSED
+
+
+def test_burst_of_429s_trips_the_breaker_once():
+    throttle = HubThrottle(max_concurrency=8, breaker_threshold=5, breaker_cooldown=0.05)
+    burst = [throttle._acquire() for _ in range(8)]
+    for slot in burst:
+        throttle._release(slot, throttled=True, delay=0)
+    assert throttle.stats['breaker_trips'] == 1 and throttle._trips == 1
+    assert throttle._resume_at - time.monotonic() <= 0.05
+
+
+def test_only_the_probe_decides_a_half_open_breaker():
+    throttle = HubThrottle(max_concurrency=8, breaker_threshold=2, breaker_cooldown=0.02)
+    early, late = throttle._acquire(), throttle._acquire()
+    for _ in range(2):
+        throttle._release(throttle._acquire(), throttled=True, delay=0)
+    assert throttle.state == OPEN
+
+    probe = throttle._acquire()
+    assert probe.probe and not early.probe
+    # Answers to requests sent before the breaker opened neither close nor re-trip it
+    throttle._release(early)
+    throttle._release(late, throttled=True, delay=0)
+    assert throttle.state == HALF_OPEN and throttle.stats['breaker_trips'] == 1
+
+    throttle._release(probe, throttled=True, delay=0)
+    assert throttle.state == OPEN and throttle.stats['breaker_trips'] == 2
+    assert throttle._resume_at - time.monotonic() > 0.02    # Cooldown doubled
+    probe = throttle._acquire()
+    throttle._release(probe)
+    assert throttle.state == CLOSED and throttle._trips == 0
+
+
+def test_fetcher_reports_rate_limited_without_memoizing():
+    hub = FlakyHub(throttle=3)
+    throttle = HubThrottle(max_retries=1, breaker_threshold=10)
+    fetcher = MetadataFetcher(lambda: hub, throttle=throttle)
+    assert fetcher.get('org/model').status == STATUS_RATE_LIMITED
+    # Throttling is not cached as a failure; the next lookup asks the Hub again
+    assert fetcher.get('org/model').ok
+    assert hub.calls['org/model'] == 4
+
+
+def test_rate_limited_model_is_not_scored_as_inaccessible():
+    hub = FlakyHub(throttle=100)
+    throttle = HubThrottle(max_retries=1, breaker_threshold=100)
+    result = list(run.iter_evaluations(['https://huggingface.co/org/model'], throttle=throttle,
+                                       api_factory=lambda: hub))[0]
+    assert result['Rate_Limited'] == ['Correctness', 'Maintainability', 'License']
+    assert result['Correctness'] is None and result['Fairness'] == 0.6
+    assert run.is_partial(result)
+
+
+@pytest.mark.parametrize('evaluate', [run.evaluate_model_correctness, run.evaluate_model_maintainability,
+                                      run.evaluate_model_license, run.evaluate_model_size])
+def test_standalone_evaluators_refuse_rate_limited_metadata(evaluate):
+    metadata = run.ModelMetadata('org/model', STATUS_RATE_LIMITED, error=RateLimited('429'))
+    with pytest.raises(RateLimited):
+        evaluate({'full_name': 'org/model'}, metadata)
+
+
+def test_fetch_errors_still_score_as_inaccessible():
+    hub = FlakyHub(error=FakeHTTPError(404))
+    fetcher = MetadataFetcher(lambda: hub, throttle=HubThrottle())
+    assert fetcher.get('org/missing').status == STATUS_FETCH_ERROR
+
+
+def test_hub_concurrency_option_reaches_process_url_file():
+    with patch('sys.argv', ['run', 'urls.txt', '--hub-concurrency', '3']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with pytest.raises(SystemExit):
+                run.main()
+    mock_process.assert_called_once_with('urls.txt', hub_concurrency=3)
@@ -0,0 +1,132 @@
+"""
+Tests for incremental re-scoring of unchanged models
+"""
+import sys
+import os
+import json
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from incremental import ScoreStore, pinned_sha, METRIC_VERSION
+
+URLS = [f"https://huggingface.co/org/model-{i}" for i in range(4)]
+SHA = 'a' * 40
+
+
+class FakeHub:
+    """model_info stand-in that serves a per-repo sha and counts full fetches"""
+
+    def __init__(self):
+        self.shas = {url.split('co/')[1]: SHA for url in URLS}
+        self.full_fetches = []
+        self.probes = 0
+
+    def model_info(self, repo_id, revision=None, expand=None, **kwargs):
+        if expand is not None:
+            self.probes += 1
+            return SimpleNamespace(sha=self.shas[repo_id])
+        self.full_fetches.append(repo_id)
+        return SimpleNamespace(sha=self.shas[repo_id], tags=['nlp'], card_data=None,
+                               last_modified='2025-01-01')
+
+
+@pytest.fixture
+def workdir():
+    with tempfile.TemporaryDirectory() as tmp:
+        url_path = os.path.join(tmp, 'urls.txt')
+        with open(url_path, 'w') as f:
+            f.write('\n'.join(URLS) + '\n')
+        yield url_path, os.path.join(tmp, 'scores.db')
+
+
+def _run(hub, url_path, store_path, **options):
+    with patch('run.HfApi', return_value=hub):
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with patch('sys.stderr', new=StringIO()) as fake_err:
+                assert run.process_url_file(url_path, incremental=store_path, **options) == 0
+    return [json.loads(line) for line in fake_out.getvalue().splitlines()], fake_err.getvalue()
+
+
+def test_unchanged_models_are_reused(workdir):
+    url_path, store_path = workdir
+    hub = FakeHub()
+    first, _ = _run(hub, url_path, store_path)
+    assert len(hub.full_fetches) == 4
+
+    hub.full_fetches.clear()
+    second, err = _run(hub, url_path, store_path)
+    assert hub.full_fetches == []
+    assert second == first
+    assert 'Incremental: 4 reused, 0 rescored' in err
+
+
+def test_changed_revision_is_rescored(workdir):
+    url_path, store_path = workdir
+    hub = FakeHub()
+    _run(hub, url_path, store_path)
+
+    hub.full_fetches.clear()
+    hub.shas['org/model-2'] = 'b' * 40
+    results, err = _run(hub, url_path, store_path)
+    assert hub.full_fetches == ['org/model-2']
+    assert [r['URL'] for r in results] == URLS
+    assert 'Incremental: 3 reused, 1 rescored' in err
+
+
+def test_metric_version_change_rescores_everything(workdir):
+    url_path, store_path = workdir
+    hub = FakeHub()
+    _run(hub, url_path, store_path)
+
+    hub.full_fetches.clear()
+    with patch('incremental.ScoreStore', lambda path: ScoreStore(path, metric_version=METRIC_VERSION + 1)):
+        _run(hub, url_path, store_path)
+    assert len(hub.full_fetches) == 4
+
+
+def test_unreachable_models_are_not_stored(workdir):
+    url_path, store_path = workdir
+    api = MagicMock()
+    api.model_info.side_effect = Exception("Repository not found")
+    _run(api, url_path, store_path)
+
+    store = ScoreStore(store_path)
+    assert len(store) == 0
+    store.close()
+
+
+def test_pinned_revision_needs_no_probe(workdir):
+    url_path, store_path = workdir
+    with open(url_path, 'w') as f:
+        f.write(f"https://huggingface.co/org/model-0/tree/{SHA}\n")
+    hub = FakeHub()
+    _run(hub, url_path, store_path)
+    hub.full_fetches.clear()
+    _run(hub, url_path, store_path)
+    assert hub.probes == 0 and hub.full_fetches == []
+    assert pinned_sha(SHA) == SHA and pinned_sha('main') is None and pinned_sha('v1.0') is None
+
+
+def test_store_round_trip_is_case_insensitive():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ScoreStore(os.path.join(tmp, 'scores.db'))
+        assert store.store('Org/Model', None, SHA, {'NetScore': 0.7})
+        assert not store.store('org/model', None, None, {'NetScore': 0.1})
+        assert store.lookup('org/model', 'main', SHA) == {'NetScore': 0.7}
+        assert store.lookup('org/model', None, 'c' * 40) is None
+        assert store.lookup('org/model', None, None) is None
+        store.close()
+
+
+def test_main_parses_incremental_option():
+    with patch('sys.argv', ['run.py', 'urls.txt', '--incremental', 'scores.db']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with patch('sys.exit'):
+                run.main()
+    mock_process.assert_called_once_with('urls.txt', incremental='scores.db')
@@ -0,0 +1,64 @@
+"""
+Tests for per-stage latency instrumentation
+"""
+import sys
+import os
+import random
+from unittest.mock import patch
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from instrumentation import LatencyHistogram, Instrumentation
+
+
+def test_histogram_percentiles_within_bucket_error():
+    """Percentiles from buckets stay within ~3% of the exact values"""
+    rng = random.Random(1)
+    values = sorted(int(rng.lognormvariate(15, 1)) for _ in range(20000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for pct in (50, 95, 99):
+        exact = values[int(len(values) * pct / 100) - 1]
+        assert abs(histogram.percentile(pct) - exact) / exact < 0.04
+    assert histogram.count == len(values)
+    assert histogram.max_ns == values[-1]
+
+
+def test_histogram_small_values_exact():
+    histogram = LatencyHistogram()
+    for value in (3, 3, 7, 40):
+        histogram.record(value)
+    assert histogram.percentile(50) == 3
+    assert histogram.percentile(100) == 40
+    assert LatencyHistogram().percentile(99) == 0
+
+
+def test_evaluate_urls_records_every_stage():
+    """Parse, fetch, score and per-metric stages get one sample per model"""
+    stats = Instrumentation()
+    urls = ["https://huggingface.co/org/a", "https://huggingface.co/org/b"]
+    with patch('run.HfApi', None):
+        run.evaluate_urls(urls, stats=stats)
+
+    summary = stats.summary()
+    for stage in ('parse', 'fetch', 'score', 'model', 'score:Correctness', 'score:License'):
+        assert summary[stage]['count'] == 2
+    assert summary['model']['p99_ms'] >= summary['score']['p50_ms']
+
+
+def test_stats_table_on_stderr_only():
+    """--stats prints the summary table to stderr and leaves stdout as NDJSON"""
+    fake_stdin = StringIO("https://huggingface.co/org/model\n")
+    with patch('sys.stdin', fake_stdin), patch('run.HfApi', None):
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with patch('sys.stderr', new=StringIO()) as fake_err:
+                assert run.process_url_file('-', stats=True) == 0
+
+    assert fake_out.getvalue().count('\n') == 1
+    assert fake_out.getvalue().startswith('{')
+    table = fake_err.getvalue()
+    assert 'p95 ms' in table
+    assert 'fetch' in table
@@ -0,0 +1,135 @@
+"""
+Tests for SPDX license normalization, compatibility and license scoring
+"""
+import sys
+import os
+import json
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from licenses import LicenseIndex, UNKNOWN_LICENSE, detect_license, license_report
+
+
+@pytest.fixture
+def index():
+    return LicenseIndex.build()
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('MIT', 'MIT'),
+    ('mit', 'MIT'),
+    ('Apache License, Version 2.0', 'Apache-2.0'),
+    ('apache2', 'Apache-2.0'),
+    ('GNU General Public License v3.0', 'GPL-3.0'),
+    ('gpl-3.0-or-later', 'GPL-3.0'),
+    ('LGPL-2.1-only', 'LGPL-2.1'),
+    ('BSD 3-Clause License', 'BSD-3-Clause'),
+    ('CC0 1.0', 'CC0-1.0'),
+    ('cc-by-nc-4.0', 'CC-BY-NC-4.0'),
+    ('llama3.1', 'Llama3.1'),
+    ('bigscience-bloom-rail-1.0', 'BigScience-BLOOM-RAIL-1.0'),
+    ('custom-license', UNKNOWN_LICENSE),
+    ('proprietary', UNKNOWN_LICENSE),
+])
+def test_resolve_aliases_and_case_variants(index, value, expected):
+    assert index.resolve(value) == expected
+
+
+def test_resolve_other_through_name_and_link(index):
+    assert index.resolve('other', license_name='apache-2.0') == 'Apache-2.0'
+    assert index.resolve('other', license_link='https://www.apache.org/licenses/LICENSE-2.0') == 'Apache-2.0'
+    assert index.resolve('other', license_link='LICENSE') == UNKNOWN_LICENSE
+    assert index.resolve(None) is None
+    assert index.resolve(['cc-by-nc-4.0', 'mit']) == 'MIT'  # Dual licensing: most open wins
+
+
+def test_compatibility_matrix(index):
+    assert index.compatible('MIT', 'LGPL-2.1')
+    assert index.compatible('LGPL-2.1', 'GPL-3.0')
+    assert not index.compatible('GPL-3.0', 'LGPL-2.1')
+    assert not index.compatible('Apache-2.0', 'GPL-2.0')
+    assert index.compatible('Apache-2.0', 'GPL-3.0')
+    assert not index.compatible('CC-BY-NC-4.0', 'MIT')
+    assert not index.compatible(UNKNOWN_LICENSE, UNKNOWN_LICENSE)
+    assert not index.compatible('Not-A-License', 'MIT')
+    for spdx_id in index.ids:
+        if spdx_id != UNKNOWN_LICENSE:
+            assert index.compatible(spdx_id, spdx_id)
+
+
+def test_index_is_cached_on_disk():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index.json')
+        built = LicenseIndex.load(path)
+        with open(path) as f:
+            cached = json.load(f)
+        assert cached['aliases'] == built.aliases
+
+        with patch.object(LicenseIndex, 'build', side_effect=AssertionError("rebuilt")):
+            loaded = LicenseIndex.load(path)
+        assert loaded.resolve('Apache 2.0') == 'Apache-2.0'
+
+        cached['fingerprint'] = 'stale'
+        with open(path, 'w') as f:
+            json.dump(cached, f)
+        with patch.object(LicenseIndex, 'build', wraps=LicenseIndex.build) as build:
+            LicenseIndex.load(path)
+        assert build.call_count == 1
+
+
+def test_detect_license_from_card_and_tags():
+    card = SimpleNamespace(license='other', license_name=None,
+                           license_link='https://ai.google.dev/gemma/terms')
+    assert detect_license(SimpleNamespace(card_data=card, tags=[])) == 'Gemma'
+    assert detect_license(SimpleNamespace(card_data=None, tags=['license:apache-2.0'])) == 'Apache-2.0'
+    assert detect_license(SimpleNamespace(card_data=None, tags=['text-generation'])) is None
+
+
+@pytest.mark.parametrize('card_license, expected', [
+    ('Apache License 2.0', 0.9),
+    ('cc-by-nc-sa-4.0', 0.6),
+    ('llama2', 0.6),
+])
+def test_evaluate_model_license_uses_index(card_license, expected):
+    model_data = SimpleNamespace(card_data=SimpleNamespace(license=card_license), tags=[])
+    api = MagicMock()
+    api.model_info.return_value = model_data
+    with patch('run.HfApi', return_value=api):
+        score, latency = run.evaluate_model_license({'full_name': 'org/model'})
+    assert score == expected
+    assert latency >= 0
+
+
+def test_license_report():
+    lines = license_report(['MIT', 'GPL-3.0', 'Example1'], 'lgpl-2.1')
+    assert 'compatible with LGPL-2.1' in lines[0]
+    assert 'INCOMPATIBLE with LGPL-2.1' in lines[1]
+    assert 'unrecognized' in lines[2]
+    # No project license configured, no verdict
+    assert not any('compatible' in line.lower() for line in license_report(['MIT', 'GPL-3.0']))
+    with pytest.raises(ValueError):
+        license_report(['MIT'], 'custom-license')
+
+
+def _licenses_menu_output(capsys):
+    import Admin
+    with patch('builtins.input', return_value='x'), patch('time.sleep'):
+        with patch('sqlite3.connect') as connect:
+            connect.return_value.cursor.return_value.fetchall.return_value = [('MIT',), ('agpl',)]
+            Admin.licenses_menu()
+    return capsys.readouterr().out
+
+
+def test_admin_licenses_menu_uses_report(capsys, monkeypatch):
+    monkeypatch.delenv('PROJECT_LICENSE', raising=False)
+    output = _licenses_menu_output(capsys)
+    assert 'MIT' in output and 'AGPL-3.0' in output
+    assert 'compatible' not in output.lower() and 'Set PROJECT_LICENSE' in output
+
+    monkeypatch.setenv('PROJECT_LICENSE', 'MIT')
+    assert 'INCOMPATIBLE with MIT' in _licenses_menu_output(capsys)
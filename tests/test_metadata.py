@@ -0,0 +1,85 @@
+"""
+Tests for the shared Hub metadata layer
+"""
+import sys
+import os
+from unittest.mock import patch, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from metadata import (
+    MetadataFetcher, STATUS_OK, STATUS_NO_HUB, STATUS_CLIENT_ERROR, STATUS_FETCH_ERROR
+)
+
+
+def _mock_api():
+    mock_api = MagicMock()
+    mock_model_data = MagicMock()
+    mock_model_data.tags = ['nlp']
+    mock_model_data.card_data = MagicMock()
+    mock_model_data.card_data.license = 'mit'
+    mock_model_data.last_modified = '2024-01-01'
+    mock_api.model_info.return_value = mock_model_data
+    return mock_api
+
+
+def test_fetcher_memoizes_per_repo():
+    """Each repo is fetched once no matter how often it is requested"""
+    mock_api = _mock_api()
+    fetcher = MetadataFetcher(lambda: mock_api)
+
+    first = fetcher.get('org/model')
+    second = fetcher.get('org/model')
+
+    assert first is second
+    assert first.status == STATUS_OK
+    assert mock_api.model_info.call_count == 1
+    assert fetcher.fetch_count == 1
+
+
+def test_fetcher_statuses():
+    """Missing hub, broken client and failed lookups are reported distinctly"""
+    assert MetadataFetcher(None).get('org/model').status == STATUS_NO_HUB
+
+    broken = MetadataFetcher(MagicMock(side_effect=Exception("no client")))
+    assert broken.get('org/model').status == STATUS_CLIENT_ERROR
+
+    mock_api = MagicMock()
+    mock_api.model_info.side_effect = Exception("404")
+    failed = MetadataFetcher(lambda: mock_api).get('org/model')
+    assert failed.status == STATUS_FETCH_ERROR
+    assert not failed.ok
+
+
+def test_evaluate_urls_fetches_once_per_model():
+    """All metrics of a model share one model_info round trip"""
+    urls = [
+        "https://huggingface.co/org/model-a",
+        "https://huggingface.co/org/model-b/tree/main",
+    ]
+    mock_api = _mock_api()
+
+    with patch('run.HfApi', return_value=mock_api) as mock_hf_api:
+        results = run.evaluate_urls(urls)
+
+    assert mock_hf_api.call_count == 1
+    assert mock_api.model_info.call_count == 2
+    for result in results:
+        assert isinstance(result['Fetch_Latency'], int)
+        assert result['Fetch_Latency'] >= 0
+        assert result['Correctness'] == 1.0
+        assert result['License'] == 0.9
+
+
+def test_evaluators_accept_prefetched_metadata():
+    """Evaluators score from supplied metadata without touching the Hub"""
+    metadata = MetadataFetcher(lambda: _mock_api()).get('org/model')
+
+    with patch('run.HfApi', side_effect=AssertionError("should not be called")):
+        correctness, _ = run.evaluate_model_correctness({'full_name': 'org/model'}, metadata)
+        maintainability, _ = run.evaluate_model_maintainability({'full_name': 'org/model'}, metadata)
+        license_score, _ = run.evaluate_model_license({'full_name': 'org/model'}, metadata)
+
+    assert correctness == 1.0
+    assert maintainability == 1.0
+    assert license_score == 0.9
@@ -0,0 +1,164 @@
+"""
+Tests for the metric registry, --metrics selection and --min-netscore early exit
+"""
+import sys
+import os
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from metrics import MetricRegistry
+from weights import DEFAULT_WEIGHTS
+
+GOOD = 'https://huggingface.co/org/good'   # Tags, card and an open license
+BARE = 'https://huggingface.co/org/bare'   # No tags or card
+
+
+class CountingHub:
+    """model_info stand-in that counts metadata fetches and safetensors header reads"""
+
+    def __init__(self):
+        self.fetches = []
+        self.fetch_options = []
+        self.header_reads = 0
+
+    def model_info(self, repo_id, **kwargs):
+        self.fetches.append(repo_id)
+        self.fetch_options.append(kwargs)
+        if repo_id == 'org/good':
+            return SimpleNamespace(sha='a' * 40, tags=['nlp'], last_modified='2025-01-01',
+                                   card_data=SimpleNamespace(license='apache-2.0'),
+                                   siblings=[SimpleNamespace(rfilename='model.safetensors', size=10)])
+        return SimpleNamespace(sha='b' * 40, tags=[], card_data=None, last_modified='2025-01-01')
+
+    def parse_safetensors_file_metadata(self, **kwargs):
+        self.header_reads += 1
+        return SimpleNamespace(parameter_count={'F32': 2})
+
+
+def _evaluate(urls, **options):
+    hub = CountingHub()
+    results = run.evaluate_urls(urls, api_factory=lambda: hub, **options)
+    return results, hub
+
+
+def test_registry_declares_cost_dependencies_and_weights():
+    assert run.METRICS.names() == ['Correctness', 'Fairness', 'Maintainability', 'License', 'Size']
+    plan = run.METRICS.plan()
+    # Size is opt-in: unweighted, it runs only when named
+    assert plan.names == ['Correctness', 'Fairness', 'Maintainability', 'License']
+    assert plan.weights == DEFAULT_WEIGHTS
+    assert plan.complete
+    # Metrics needing no Hub data run first, the extra header reads of Size last
+    plan = run.METRICS.plan(run.METRICS.names())
+    assert plan.order[0].name == 'Fairness' and plan.order[-1].name == 'Size'
+    assert not plan.complete
+
+
+def test_weighted_opt_in_metric_runs_by_default():
+    registry = MetricRegistry()
+    registry.register('Cheap', None, cost=1, weight=1.0)
+    registry.register('Unweighted', None, cost=5, opt_in=True)
+    registry.register('Weighted', None, cost=5, weight=0.5, opt_in=True)
+    assert registry.plan().names == ['Cheap', 'Weighted']
+    assert registry.plan('cheap,weighted').complete
+
+
+def test_subset_plan_rescales_weights():
+    plan = run.METRICS.plan('correctness, License')
+    assert plan.names == ['Correctness', 'License']
+    assert plan.weights == pytest.approx({'Correctness': 0.8, 'License': 0.2})
+    assert not plan.complete
+    # Leaving out an unweighted metric keeps the default weights exactly
+    assert run.METRICS.plan(['Correctness', 'Fairness', 'Maintainability', 'License']).weights == DEFAULT_WEIGHTS
+    with pytest.raises(ValueError):
+        run.METRICS.plan('Correctness,Speed')
+
+
+def test_default_plan_matches_full_evaluation():
+    [result], hub = _evaluate([GOOD])
+    assert [key for key in result if not key.endswith('_Latency')] == \
+        ['URL', 'Correctness', 'Fairness', 'Maintainability', 'License', 'NetScore']
+    assert result['NetScore'] == run.calculate_net_score(result)
+    assert hub.fetches == ['org/good']
+    # Without Size there is no per-file metadata and no header read
+    assert hub.fetch_options == [{}] and hub.header_reads == 0
+
+
+def test_metrics_without_hub_data_skip_the_fetch():
+    [result], hub = _evaluate([GOOD], metrics=['Fairness'])
+    assert hub.fetches == []
+    assert result['Fairness'] == 0.6 and result['NetScore'] == 0.6
+    assert result['Fetch_Latency'] == 0
+    assert 'Correctness' not in result and 'Size' not in result
+
+
+def test_metrics_fetch_only_the_data_they_need():
+    [result], hub = _evaluate([GOOD], metrics=['License'])
+    assert hub.fetches == ['org/good'] and hub.header_reads == 0
+    assert hub.fetch_options == [{}]  # No per-file metadata without Size
+    assert result['License'] == 0.9
+    [result], hub = _evaluate([GOOD], metrics=['Size'])
+    assert hub.header_reads == 1 and result['NetScore'] is None
+    assert hub.fetch_options == [{'files_metadata': True}]
+
+
+def test_min_netscore_stops_before_fetching_when_bar_is_out_of_reach():
+    # Fairness alone caps the best possible NetScore at 0.9
+    results, hub = _evaluate([GOOD, BARE], min_netscore=0.95)
+    assert results == [] and hub.fetches == []
+
+
+def test_min_netscore_keeps_passing_models_and_stops_the_rest_early():
+    plan = run.METRICS.plan(run.METRICS.names(), min_netscore=0.8)
+    hub = CountingHub()
+    results = list(run.iter_evaluations([GOOD, BARE], api_factory=lambda: hub, plan=plan))
+    assert [r['URL'] for r in results] == [GOOD]
+    assert results[0]['NetScore'] >= 0.8 and 'Skipped' not in results[0]
+    assert plan.stats == {'kept': 1, 'dropped': 1, 'stopped_early': 1}
+    # The bare model was dropped after Maintainability, before License and Size
+    assert hub.header_reads == 1
+
+
+def test_skipped_metrics_are_reported_as_partial():
+    plan = run.METRICS.plan(run.METRICS.names(), min_netscore=0.8)
+    hub = CountingHub()
+    fetcher = run.MetadataFetcher(lambda: hub)
+    result = run.evaluate_model(BARE, fetcher, plan=plan)
+    assert result['Skipped'] == ['License', 'Size']
+    assert result['License'] is None and result['NetScore'] < 0.8
+    assert run.is_partial(result)
+
+
+def test_cli_options(tmp_path):
+    with patch('sys.argv', ['run', 'urls.txt', '--metrics', 'license,correctness', '--min-netscore', '0.7']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with pytest.raises(SystemExit):
+                run.main()
+    mock_process.assert_called_once_with('urls.txt', metrics=['Correctness', 'License'], min_netscore=0.7)
+
+    for bad in (['--metrics', 'Speed'], ['--min-netscore', '2']):
+        with patch('sys.argv', ['run', 'urls.txt'] + bad):
+            with patch('sys.stderr', new=StringIO()):
+                with pytest.raises(SystemExit) as exc:
+                    run.main()
+        assert exc.value.code == 1
+
+    url_path = tmp_path / 'urls.txt'
+    url_path.write_text(GOOD + '\n' + BARE + '\n')
+    hub = CountingHub()
+    with patch('run.HfApi', return_value=hub):
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with patch('sys.stderr', new=StringIO()) as fake_err:
+                assert run.process_url_file(str(url_path), min_netscore=0.8) == 0
+                assert run.process_url_file(str(url_path), metrics=['Fairness'],
+                                            incremental=str(tmp_path / 'store.db')) == 1
+                assert run.process_url_file(str(url_path), metrics=['Size'],
+                                            results_db=str(tmp_path / 'results.db')) == 1
+    assert [json.loads(line)['URL'] for line in fake_out.getvalue().splitlines()] == [GOOD]
+    assert 'NetScore >= 0.8: 1 models kept, 1 dropped (1 stopped early)' in fake_err.getvalue()
@@ -0,0 +1,98 @@
+"""
+Tests for slim ModelRecord metadata and its binary cache form
+"""
+import sys
+import os
+import sqlite3
+import pickle
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from hub_cache import MetadataCache
+from hub_replay import model_info_from_dict
+from licenses import detect_license
+from metadata import MetadataFetcher, ModelMetadata, STATUS_OK
+from model_record import ModelRecord, RECORD_FORMAT
+from size_metric import measure_size
+
+# Responses are rebuilt as real ModelInfo objects
+pytest.importorskip('huggingface_hub')
+
+RESPONSE = {
+    'id': 'org/model', 'sha': 'c' * 40, 'last_modified': '2024-05-01T10:00:00.000Z',
+    'tags': ['nlp', 'license:mit'], 'downloads': 10, 'config': {'model_type': 'llama'},
+    'card_data': {'license': 'other', 'license_name': 'gemma', 'language': ['en']},
+    'siblings': [{'rfilename': 'config.json', 'size': 700, 'blobId': 'b' * 40},
+                 {'rfilename': 'model.safetensors', 'blobId': 'd' * 40,
+                  'lfs': {'size': 2 ** 30, 'sha256': 'f' * 64, 'pointerSize': 135}}],
+    'safetensors': {'parameters': {'BF16': 2 ** 29}, 'total': 2 ** 29},
+}
+
+
+@pytest.fixture
+def info():
+    return model_info_from_dict(RESPONSE)
+
+
+def test_record_keeps_what_the_metrics_read(info):
+    record = ModelRecord.from_model_info(info)
+    assert not hasattr(record, '__dict__') and not hasattr(record, 'downloads')
+    assert record.sha == info.sha and record.last_modified == info.last_modified
+    assert record.tags == ('nlp', 'license:mit')
+    # LFS sizes are resolved once; blob ids and hashes are dropped
+    assert [tuple(f) for f in record.siblings] == [('config.json', 700), ('model.safetensors', 2 ** 30)]
+    assert detect_license(record) == detect_license(info)
+    assert measure_size(None, 'org/model', None, record) == measure_size(None, 'org/model', None, info)
+
+
+def test_every_metric_scores_a_record_like_the_full_response(info):
+    model = run.extract_model_info('https://huggingface.co/org/model')
+    for name in run.METRICS.names():
+        spec = run.METRICS[name]
+        fetcher = MetadataFetcher(lambda: SimpleNamespace(model_info=lambda *a, **k: info))
+        full = ModelMetadata('org/model', STATUS_OK, data=info)
+        slim = fetcher.get('org/model')
+        assert isinstance(slim.data, ModelRecord)
+        assert spec.evaluate(model, full, fetcher)[0] == spec.evaluate(model, slim, fetcher)[0]
+
+
+def test_missing_fields_stay_missing():
+    record = ModelRecord.from_model_info(SimpleNamespace(sha='a' * 40, tags=[]))
+    assert not hasattr(record, 'last_modified') and not hasattr(record, 'card_data')
+    assert ModelRecord.from_bytes(record.to_bytes()) == record
+
+
+def test_binary_form_round_trips_and_is_smaller_than_a_pickle(info):
+    record = ModelRecord.from_model_info(info)
+    payload = record.to_bytes()
+    assert payload.startswith(RECORD_FORMAT)
+    restored = ModelRecord.from_bytes(payload)
+    assert restored == record and restored.last_modified == info.last_modified
+    assert restored.safetensors.parameters == {'BF16': 2 ** 29}
+    assert len(payload) < len(pickle.dumps(info)) / 2
+    with pytest.raises(ValueError):
+        ModelRecord.from_bytes(b'junk')
+    with pytest.raises(ValueError):
+        ModelRecord.from_model_info(MagicMock()).to_bytes()
+
+
+def test_cache_stores_records_and_reads_old_pickles(info):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'hub_cache.db')
+        cache = MetadataCache(path)
+        assert cache.store('org/model', None, ModelRecord.from_model_info(info))
+        assert cache.lookup('org/model').data == ModelRecord.from_model_info(info)
+        # Entries written before records existed still load, and are slimmed on use
+        assert cache.store('org/old', None, info)
+        api = MagicMock()
+        metadata = MetadataFetcher(lambda: api, cache=cache).get('org/old')
+        assert isinstance(metadata.data, ModelRecord) and api.model_info.call_count == 0
+        cache.close()
+        payloads = [row[0][:len(RECORD_FORMAT)] for row in
+                    sqlite3.connect(path).execute("SELECT payload FROM model_metadata ORDER BY repo_id")]
+    assert payloads[0] == RECORD_FORMAT and payloads[1] != RECORD_FORMAT
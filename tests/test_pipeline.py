@@ -0,0 +1,238 @@
+"""
+Tests for the streaming URL-file pipeline
+"""
+import sys
+import os
+import io
+import bz2
+import gzip
+import lzma
+import json
+import itertools
+import threading
+import time
+from unittest.mock import patch, MagicMock
+from io import StringIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from pipeline import (iter_url_lines, bounded_map, open_output, NDJSONWriter, TemplateEncoder,
+                      json_line_encoder)
+from metadata import MetadataFetcher
+
+
+def test_iter_url_lines_reads_stdin():
+    """'-' streams URLs from standard input, skipping blank lines"""
+    fake_stdin = StringIO("https://huggingface.co/a/b\n\n  https://github.com/c/d  \n")
+    with patch('sys.stdin', fake_stdin):
+        assert list(iter_url_lines('-')) == [
+            "https://huggingface.co/a/b", "https://github.com/c/d"
+        ]
+
+
+URL_TEXT = "https://huggingface.co/org/a\n\nhttps://github.com/c/d\n"
+
+
+def test_compressed_url_files_are_detected_by_content(tmp_path):
+    """gzip, xz and bz2 files are decompressed whatever they are called"""
+    for module in (gzip, lzma, bz2):
+        path = tmp_path / f"urls-{module.__name__}.txt"
+        path.write_bytes(module.compress(URL_TEXT.encode('ascii')))
+        assert list(iter_url_lines(str(path))) == ["https://huggingface.co/org/a", "https://github.com/c/d"]
+
+
+def test_compressed_stdin_is_decompressed():
+    fake_stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(gzip.compress(URL_TEXT.encode('ascii')))))
+    with patch('sys.stdin', fake_stdin):
+        assert list(iter_url_lines('-')) == ["https://huggingface.co/org/a", "https://github.com/c/d"]
+    assert not fake_stdin.closed
+    plain_stdin = io.TextIOWrapper(io.BufferedReader(io.BytesIO(URL_TEXT.encode('ascii'))))
+    with patch('sys.stdin', plain_stdin):
+        assert len(list(iter_url_lines('-'))) == 2
+
+
+def test_open_output_compresses_by_suffix(tmp_path):
+    for suffix, module in (('.gz', gzip), ('.xz', lzma), ('.bz2', bz2), ('', None)):
+        path = str(tmp_path / f"results.ndjson{suffix}")
+        with open_output(path) as out:
+            out.write(URL_TEXT)
+        with open(path, 'rb') as f:
+            data = f.read()
+        assert (module.decompress(data) if module else data) == URL_TEXT.encode('ascii')
+
+
+def test_process_url_file_reads_and_writes_compressed_streams(tmp_path):
+    url_path = tmp_path / 'urls.txt.xz'
+    url_path.write_bytes(lzma.compress(b"https://huggingface.co/org/a\nhttps://huggingface.co/org/b\n"))
+    output = tmp_path / 'results.ndjson.gz'
+    with patch('run.HfApi', None):
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            assert run.process_url_file(str(url_path), output=str(output)) == 0
+    assert fake_out.getvalue() == ''
+    with gzip.open(output, 'rt') as f:
+        assert [json.loads(line)['URL'] for line in f] == ["https://huggingface.co/org/a",
+                                                          "https://huggingface.co/org/b"]
+
+    # Compressed results feed rescoring directly
+    rescored = tmp_path / 'rescored.ndjson.bz2'
+    with patch('sys.stderr', new=StringIO()):
+        assert run.rescore_stored(str(output), output=str(rescored)) == 0
+    with bz2.open(rescored, 'rt') as f:
+        assert len(f.readlines()) == 2
+
+    with patch('sys.argv', ['run', 'urls.txt', '--output', 'out.ndjson.gz']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            try:
+                run.main()
+            except SystemExit:
+                pass
+    mock_process.assert_called_once_with('urls.txt', output='out.ndjson.gz')
+
+
+def test_bounded_map_is_lazy_on_endless_input():
+    """Only a bounded window of an endless input is ever pulled"""
+    pulled = []
+
+    def endless():
+        for i in itertools.count():
+            pulled.append(i)
+            yield i
+
+    results = bounded_map(lambda x: x * 2, endless(), workers=2, max_pending=4)
+    assert list(itertools.islice(results, 3)) == [0, 2, 4]
+    results.close()
+    assert len(pulled) <= 3 + 4 + 1
+
+
+def test_bounded_map_limits_in_flight_work():
+    """No more than max_pending items are submitted at once"""
+    lock = threading.Lock()
+    state = {'active': 0, 'peak': 0}
+
+    def work(x):
+        with lock:
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+        time.sleep(0.01)
+        with lock:
+            state['active'] -= 1
+        return x
+
+    assert list(bounded_map(work, range(40), workers=8, max_pending=3)) == list(range(40))
+    assert state['peak'] <= 3
+
+
+def test_first_result_written_before_input_ends():
+    """The first NDJSON line is flushed before the URL source is exhausted"""
+    seen_output_before_end = []
+    out = StringIO()
+
+    def urls():
+        yield "https://huggingface.co/org/first"
+        yield "https://huggingface.co/org/second"
+        seen_output_before_end.append(out.getvalue())
+
+    writer = NDJSONWriter(out)
+    with patch('run.HfApi', None):
+        for result in run.iter_evaluations(urls()):
+            writer.write(result)
+
+    assert '"https://huggingface.co/org/first"' in seen_output_before_end[0]
+    assert writer.count == 2
+
+
+def test_template_encoder_matches_json_dumps():
+    """Template lines are byte-identical to json.dumps, whatever the values"""
+    encoder = TemplateEncoder(max_schemas=2)
+    rows = [
+        {'URL': 'https://huggingface.co/a/b', 'Size': 0.1 + 0.2, 'Size_Latency': 3, 'NetScore': None},
+        {'URL': 'https://huggingface.co/"q"/\u00e9%s', 'Size': 1e-07, 'Size_Latency': 10 ** 20,
+         'NetScore': True},
+        {'URL': 'u', 'Timed_Out': ['Size'], 'NetScore': float('nan')},
+        {'100%': {'nested': [1, 2.5]}},
+        {},
+    ]
+    for row in rows:
+        assert encoder.encode(row) == json.dumps(row)
+
+
+def test_fast_encoder_round_trips():
+    """Whichever encoder is available, lines parse back to the same result"""
+    row = {'URL': 'https://huggingface.co/a/b', 'Size': 0.75, 'Timed_Out': ['License'], 'NetScore': None}
+    assert json.loads(json_line_encoder()(row)) == row
+    with patch('pipeline._orjson', None):
+        assert json_line_encoder()(row) == json.dumps(row)
+
+
+def test_buffered_writer_writes_in_chunks():
+    """Lines are held until buffer_size characters are pending, then written together"""
+    out = MagicMock()
+    writer = NDJSONWriter(out, streaming=False, buffer_size=100, max_delay=60, encoder=json.dumps)
+    for n in range(10):
+        writer.write({'URL': f"https://huggingface.co/org/model-{n}"})
+    assert out.write.call_count == 3  # 46-character lines: every third one passes 100
+    writer.flush()
+    written = ''.join(call.args[0] for call in out.write.call_args_list)
+    assert [json.loads(line)['URL'][-1] for line in written.splitlines()] == list('0123456789')
+    assert writer.count == 10
+
+
+def test_buffered_writer_flushes_lines_that_waited_too_long():
+    """A line goes out after max_delay even if no further result arrives to trigger a write"""
+    out = StringIO()
+    writer = NDJSONWriter(out, streaming=False, max_delay=0.05)
+    writer.write({'n': 1})
+    writer.write({'n': 2})
+    assert out.getvalue() == ''
+    deadline = time.monotonic() + 2.0
+    while out.getvalue().count('\n') < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert out.getvalue().count('\n') == 2
+    writer.write({'n': 3})
+    writer.flush()
+    assert out.getvalue().count('\n') == 3
+
+
+def test_process_url_file_buffers_unless_line_buffered():
+    """Piped output is written in chunks; --line-buffered flushes every line"""
+    fake_stdin = StringIO("https://huggingface.co/org/a\nhttps://huggingface.co/org/b\n")
+    for line_buffered, writes in ((None, 1), (True, 2)):
+        fake_stdin.seek(0)
+        with patch('sys.stdin', fake_stdin), patch('run.HfApi', None):
+            with patch('sys.stdout', new=StringIO()) as fake_out:
+                with patch.object(fake_out, 'write', wraps=fake_out.write) as write:
+                    assert run.process_url_file('-', line_buffered=line_buffered) == 0
+        assert len(fake_out.getvalue().splitlines()) == 2
+        assert write.call_count == writes
+
+    with patch('sys.argv', ['run', 'urls.txt', '--line-buffered']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            try:
+                run.main()
+            except SystemExit:
+                pass
+    mock_process.assert_called_once_with('urls.txt', line_buffered=True)
+
+
+def test_process_url_file_from_stdin():
+    """./run - scores URLs piped on standard input"""
+    fake_stdin = StringIO("https://huggingface.co/org/model\nhttps://huggingface.co/datasets/x/y\n")
+    with patch('sys.stdin', fake_stdin):
+        with patch('run.HfApi', None):
+            with patch('sys.stdout', new=StringIO()) as fake_out:
+                assert run.process_url_file('-') == 0
+    lines = fake_out.getvalue().strip().split('\n')
+    assert len(lines) == 1
+    assert json.loads(lines[0])['URL'] == "https://huggingface.co/org/model"
+
+
+def test_fetcher_memo_is_bounded():
+    """The per-run memo keeps only the most recently used repos"""
+    api = MagicMock()
+    fetcher = MetadataFetcher(lambda: api, memo_size=2)
+    for repo in ['org/a', 'org/b', 'org/c', 'org/a']:
+        fetcher.get(repo)
+    assert api.model_info.call_count == 4
+    fetcher.get('org/a')
+    fetcher.get('org/c')
+    assert api.model_info.call_count == 4
@@ -0,0 +1,126 @@
+"""
+Tests for weight profiles and vectorized NetScore recomputation
+"""
+import sys
+import os
+import json
+import random
+import tempfile
+from unittest.mock import patch
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from rescore import MetricMatrix, rescore_results, write_rescored
+from results_db import ResultsDB
+from weights import DEFAULT_WEIGHTS, load_profiles, get_profile
+
+METRICS = list(DEFAULT_WEIGHTS)
+
+
+def _results(count, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        row = {'URL': f"https://huggingface.co/org/m{i}"}
+        row.update({metric: round(rng.random(), 2) for metric in METRICS})
+        row['NetScore'] = 0.0
+        rows.append(row)
+    return rows
+
+
+def test_matrix_matches_calculate_net_score():
+    rows = _results(500)
+    net_scores = MetricMatrix.from_results(rows, METRICS).net_scores(DEFAULT_WEIGHTS)
+    assert net_scores.shape == (500,)
+    for row, net_score in zip(rows, net_scores.tolist()):
+        assert net_score == pytest.approx(run.calculate_net_score(row), abs=1e-3 + 1e-9)
+
+
+def test_rescore_streams_in_chunks():
+    weights = {'License': 1.0}
+    rows = _results(10)
+    rescored = list(rescore_results(iter(rows), weights, chunk_size=3))
+    assert [r['NetScore'] for r in rescored] == [r['License'] for r in rows]
+    assert [r['URL'] for r in rescored] == [f"https://huggingface.co/org/m{i}" for i in range(10)]
+
+
+def test_missing_metric_is_reported():
+    with pytest.raises(ValueError, match='Size'):
+        list(rescore_results(_results(2), {'Size': 1.0}))
+
+
+def test_profiles_load_from_config():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'profiles.json')
+        with open(path, 'w') as f:
+            json.dump({'license-only': {'License': 1}}, f)
+        profiles = load_profiles(path)
+        assert profiles['default'] == DEFAULT_WEIGHTS
+        assert get_profile('license-only', path) == {'License': 1.0}
+        with pytest.raises(ValueError, match='unknown weight profile'):
+            get_profile('missing', path)
+
+        with open(path, 'w') as f:
+            json.dump({'bad': {'License': -1}}, f)
+        with pytest.raises(ValueError):
+            load_profiles(path)
+
+
+def test_bundled_profiles_are_valid():
+    profiles = load_profiles()
+    assert profiles['default'] == DEFAULT_WEIGHTS
+    for weights in profiles.values():
+        assert set(weights) == set(METRICS)
+
+
+def test_rescore_reads_results_db_and_ndjson():
+    rows = _results(20)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'results.db')
+        db = ResultsDB(db_path, batch_size=7)
+        for row in rows:
+            db.add(dict(row))
+        db.close()
+
+        ndjson_path = os.path.join(tmp, 'results.ndjson')
+        with open(ndjson_path, 'w') as f:
+            f.write('\n'.join(json.dumps(row) for row in rows) + '\n')
+
+        outputs = []
+        for path in (db_path, ndjson_path):
+            out = StringIO()
+            assert write_rescored(path, {'Correctness': 1.0}, out, chunk_size=6) == 20
+            outputs.append([json.loads(line) for line in out.getvalue().splitlines()])
+    assert outputs[0] == outputs[1]
+    assert [r['NetScore'] for r in outputs[0]] == [r['Correctness'] for r in rows]
+
+
+def test_rescore_command():
+    rows = _results(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'results.ndjson')
+        with open(path, 'w') as f:
+            f.write('\n'.join(json.dumps(row) for row in rows) + '\n')
+        with patch('sys.argv', ['run.py', 'rescore', path, '--profile', 'compliance']):
+            with patch('sys.stdout', new=StringIO()) as fake_out:
+                with patch('sys.stderr', new=StringIO()) as fake_err:
+                    with pytest.raises(SystemExit) as excinfo:
+                        run.main()
+    assert excinfo.value.code == 0
+    compliance = get_profile('compliance')
+    rescored = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+    assert [r['NetScore'] for r in rescored] == pytest.approx(
+        [run.calculate_net_score(row, compliance) for row in rows], abs=1e-3 + 1e-9)
+    assert "Rescored 5 results with profile 'compliance'" in fake_err.getvalue()
+
+
+def test_rescore_command_rejects_unknown_profile():
+    with patch('sys.argv', ['run.py', 'rescore', 'results.ndjson', '--profile', 'nope']):
+        with patch('sys.stderr', new=StringIO()) as fake_err:
+            with pytest.raises(SystemExit) as excinfo:
+                run.main()
+    assert excinfo.value.code == 1
+    assert 'unknown weight profile' in fake_err.getvalue()
@@ -0,0 +1,124 @@
+"""
+Tests for the SQLite results sink and its query API
+"""
+import sys
+import os
+import json
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from results_db import ResultsDB
+
+
+def _result(url, net_score, license_score=0.5):
+    return {'URL': url, 'Fetch_Latency': 3, 'Correctness': 0.8, 'Correctness_Latency': 1,
+            'Fairness': 0.6, 'Fairness_Latency': 0, 'Maintainability': 0.5,
+            'Maintainability_Latency': 0, 'License': license_score, 'License_Latency': 0,
+            'NetScore': net_score}
+
+
+@pytest.fixture
+def db():
+    with tempfile.TemporaryDirectory() as tmp:
+        results = ResultsDB(os.path.join(tmp, 'results.db'), batch_size=4)
+        yield results
+        results.close()
+
+
+def test_rows_are_written_in_batches(db):
+    for i in range(6):
+        db.add(_result(f"https://huggingface.co/org/m{i}", i / 10))
+    assert db.written == 4  # One full batch; the rest waits for flush()
+    assert len(db) == 6
+    assert db.written == 6
+
+
+def test_top_history_and_threshold_queries(db):
+    db.add(_result("https://huggingface.co/org/a", 0.4, license_score=0.9), scored_at=1.0)
+    db.add(_result("https://huggingface.co/org/b", 0.9, license_score=0.3), scored_at=2.0)
+    db.add(_result("https://huggingface.co/Org/A/tree/v2", 0.7, license_score=0.6), scored_at=3.0)
+
+    assert [r['NetScore'] for r in db.top(2)] == [0.9, 0.7]
+
+    history = db.history('ORG/A')
+    assert [r['URL'] for r in history] == ["https://huggingface.co/org/a",
+                                           "https://huggingface.co/Org/A/tree/v2"]
+    assert [r['revision'] for r in history] == ['main', 'v2']
+    assert history[0]['scored_at'] == 1.0
+
+    assert [r['License'] for r in db.above('License', 0.6)] == [0.9, 0.6]
+    assert [r['NetScore'] for r in db.above('NetScore', 0.5, limit=1)] == [0.9]
+
+
+def test_queries_use_indexes(db):
+    plans = {
+        'top': db.explain("SELECT result FROM results ORDER BY net_score DESC LIMIT 5"),
+        'history': db.explain("SELECT result FROM results WHERE repo_id = ? ORDER BY scored_at",
+                              ('org/a',)),
+        'above': db.explain("SELECT r.result FROM metric_scores m JOIN results r ON r.id = m.result_id "
+                            "WHERE m.metric = ? AND m.score >= ? ORDER BY m.score DESC",
+                            ('License', 0.5)),
+    }
+    for name, plan in plans.items():
+        # Every table access goes through an index, never a plain full-table scan
+        assert plan and all('INDEX' in step or 'PRIMARY KEY' in step for step in plan), (name, plan)
+
+
+def test_process_url_file_writes_results_db():
+    with tempfile.TemporaryDirectory() as tmp:
+        url_path = os.path.join(tmp, 'urls.txt')
+        db_path = os.path.join(tmp, 'results.db')
+        with open(url_path, 'w') as f:
+            f.write("https://huggingface.co/org/a\nhttps://github.com/x/y\nhttps://huggingface.co/org/b\n")
+        with patch('run.HfApi', None):
+            with patch('sys.stdout', new=StringIO()) as fake_out:
+                with patch('sys.stderr', new=StringIO()) as fake_err:
+                    assert run.process_url_file(url_path, results_db=db_path) == 0
+
+        printed = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+        assert 'Results DB: 2 rows written' in fake_err.getvalue()
+        results = ResultsDB(db_path)
+        stored = results.top(10)
+        results.close()
+    assert sorted(r['URL'] for r in stored) == sorted(r['URL'] for r in printed)
+
+
+def test_partial_results_are_not_written_to_results_db(tmp_path):
+    """A timed-out model's NetScore counts its missing metrics as 0, so the row is left out"""
+    url_path = tmp_path / 'urls.txt'
+    db_path = str(tmp_path / 'results.db')
+    url_path.write_text("https://huggingface.co/org/slow\nhttps://huggingface.co/org/fast\n")
+    release = threading.Event()
+
+    def model_info(repo_id, **kwargs):
+        if repo_id == 'org/slow':
+            release.wait(5)
+        return SimpleNamespace(sha='a' * 40, tags=['nlp'], card_data=None, last_modified='2025-01-01')
+
+    with patch('run.HfApi', return_value=SimpleNamespace(model_info=model_info)):
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with patch('sys.stderr', new=StringIO()) as fake_err:
+                assert run.process_url_file(str(url_path), results_db=db_path, model_deadline=0.2) == 0
+    release.set()
+
+    printed = [json.loads(line) for line in fake_out.getvalue().splitlines()]
+    assert [('Timed_Out' in r) for r in printed] == [True, False]
+    assert 'Results DB: 1 rows written' in fake_err.getvalue()
+    results = ResultsDB(db_path)
+    assert [r['URL'] for r in results.top(10)] == ['https://huggingface.co/org/fast']
+    results.close()
+
+
+def test_main_parses_results_db_option():
+    with patch('sys.argv', ['run.py', 'urls.txt', '--results-db', 'results.db']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with patch('sys.exit'):
+                run.main()
+    mock_process.assert_called_once_with('urls.txt', results_db='results.db')
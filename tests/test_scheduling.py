@@ -0,0 +1,141 @@
+"""
+Tests for longest-expected-first scheduling from latency history
+"""
+import sys
+import os
+import json
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from hub_cache import MetadataCache
+from results_db import ResultsDB, iter_stored_results
+from scheduling import LatencyHistory, DEFAULT_ESTIMATE_MS, longest_first, restore_order, result_latency
+
+URLS = [f"https://huggingface.co/org/model-{i}" for i in range(6)]
+
+
+class RecordingHub:
+    """model_info stand-in that records the order repos are fetched in"""
+
+    def __init__(self, hold_first=0):
+        self.order = []
+        self._lock = threading.Lock()
+        # The first hold_first calls wait for each other, so no worker runs ahead
+        self._barrier = threading.Barrier(hold_first) if hold_first else None
+
+    def model_info(self, repo_id, **kwargs):
+        with self._lock:
+            self.order.append(repo_id)
+            held = self._barrier is not None and len(self.order) <= self._barrier.parties
+        if held:
+            self._barrier.wait(timeout=5)
+        return SimpleNamespace(sha='a' * 40, tags=['nlp'], card_data=None, last_modified='2025-01-01')
+
+
+def test_result_latency_sums_numeric_latency_fields():
+    assert result_latency({'URL': 'u', 'Fetch_Latency': 40, 'Size_Latency': 10, 'License_Latency': None,
+                           'NetScore': 0.5, 'NetScore_Latency': 2}) == 52.0
+    assert result_latency({'URL': 'u', 'NetScore': 0.5}) is None
+
+
+def test_history_smooths_repeated_observations_and_canonicalizes_urls():
+    history = LatencyHistory()
+    history.observe('https://huggingface.co/Org/Model', 100)
+    history.observe('https://huggingface.co/org/model/tree/main', 300)
+    assert len(history) == 1
+    assert history.estimate('https://huggingface.co/org/model') == 200
+
+
+def test_new_models_fall_back_to_size_then_median():
+    assert LatencyHistory().estimate(URLS[0]) == DEFAULT_ESTIMATE_MS
+    sizes = {URLS[0]: 2 * 1024 ** 3, URLS[1]: 1024 ** 3, URLS[3]: 8 * 1024 ** 3}
+    history = LatencyHistory(size_of=sizes.get)
+    for url, latency in zip(URLS[:3], (200, 100, 900)):
+        history.observe(url, latency)
+    # 100 ms per GiB across the models with a known size
+    assert history.estimate(URLS[3]) == pytest.approx(800)
+    assert history.estimate(URLS[4]) == 200
+
+
+def test_size_estimates_look_up_mixed_case_repos_by_their_original_url(tmp_path):
+    cache = MetadataCache(str(tmp_path / 'cache.db'))
+    for repo_id, sha, size in (('Org/BigModel', 'b' * 40, 4 * 1024 ** 3),
+                               ('Org/NewModel', 'c' * 40, 1024 ** 3)):
+        cache.store(repo_id, None, SimpleNamespace(sha=sha, last_modified=None))
+        cache.store_size(repo_id, sha, size, size, {})
+    history = LatencyHistory(size_of=run._cached_size(cache))
+    history.observe('https://huggingface.co/Org/BigModel', 800)
+    history.observe('https://huggingface.co/org/small', 100)
+    # 200 ms per GiB from Org/BigModel, not the median of the latencies
+    assert history.estimate('https://huggingface.co/Org/NewModel') == pytest.approx(200)
+    cache.close()
+
+
+def test_longest_first_reorders_within_the_window():
+    estimates = {'a': 1, 'b': 5, 'c': 3, 'd': 9, 'e': 3}
+    assert list(longest_first('abcde', estimates.get, window=10)) == \
+        [(3, 'd'), (1, 'b'), (2, 'c'), (4, 'e'), (0, 'a')]
+    # A window of two only ever compares neighbours
+    assert [item for _, item in longest_first('abcde', estimates.get, window=2)] == list('bcdea')
+
+
+def test_restore_order_resequences_by_index():
+    assert list(restore_order([(2, 'c'), (0, 'a'), (3, None), (1, 'b')])) == ['a', 'b', 'c', None]
+
+
+def test_iter_evaluations_submits_longest_first_and_keeps_input_order():
+    history = LatencyHistory()
+    for i, url in enumerate(URLS):
+        history.observe(url, 100 * i)
+    hub = RecordingHub(hold_first=2)
+    results = list(run.iter_evaluations(URLS, workers=2, api_factory=lambda: hub, history=history))
+    assert [result['URL'] for result in results] == URLS
+    # Two workers start on the two slowest models
+    assert set(hub.order[:2]) == {'org/model-5', 'org/model-4'}
+
+
+def test_schedule_history_from_results_db_and_size_cache(tmp_path):
+    db_path = str(tmp_path / 'results.db')
+    db = ResultsDB(db_path)
+    db.add({'URL': URLS[0], 'NetScore': 0.5, 'Fetch_Latency': 300, 'Size': 0.1, 'Size_Latency': 20})
+    db.close()
+    history = LatencyHistory.from_results(iter_stored_results(db_path))
+    assert history.estimate(URLS[0]) == 320
+
+    cache = MetadataCache(str(tmp_path / 'cache.db'))
+    cache.store('org/model-1', None, SimpleNamespace(sha='b' * 40, last_modified=None))
+    cache.store_size('org/model-1', 'b' * 40, 4096, 2048, {})
+    assert run._cached_size(cache)(URLS[1]) == 2048
+    assert run._cached_size(cache)(URLS[2]) is None
+    cache.close()
+
+
+def test_schedule_history_option(tmp_path):
+    history_path = tmp_path / 'previous.ndjson'
+    history_path.write_text(''.join(json.dumps({'URL': url, 'NetScore': 0.5, 'Fetch_Latency': 10 * i}) + '\n'
+                                    for i, url in enumerate(URLS)))
+    url_path = tmp_path / 'urls.txt'
+    url_path.write_text('\n'.join(URLS) + '\n')
+    hub = RecordingHub()
+    with patch('run.HfApi', return_value=hub):
+        with patch('sys.stdout', new=StringIO()) as fake_out:
+            with patch('sys.stderr', new=StringIO()) as fake_err:
+                assert run.process_url_file(str(url_path), workers=2,
+                                            schedule_history=str(history_path)) == 0
+                assert run.process_url_file(str(url_path),
+                                            schedule_history=str(tmp_path / 'missing.ndjson')) == 1
+    assert [json.loads(line)['URL'] for line in fake_out.getvalue().splitlines()] == URLS
+    assert 'Scheduling: longest expected first, 6 models with latency history' in fake_err.getvalue()
+    assert 'latency history not found' in fake_err.getvalue()
+
+    with patch('sys.argv', ['run', 'urls.txt', '--schedule-history', 'previous.ndjson']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with pytest.raises(SystemExit):
+                run.main()
+    mock_process.assert_called_once_with('urls.txt', schedule_history='previous.ndjson')
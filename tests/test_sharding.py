@@ -0,0 +1,140 @@
+"""
+Tests for sharded scoring and shard output merging
+"""
+import sys
+import os
+import gzip
+import json
+import lzma
+import subprocess
+import tempfile
+from unittest.mock import patch
+from io import StringIO
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from sharding import parse_shard, shard_of, merge_outputs
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+URLS = [f"https://huggingface.co/org/model-{i}" for i in range(12)] + [
+    "https://huggingface.co/datasets/org/data",
+    "https://huggingface.co/ORG/Model-3/tree/main",
+]
+
+
+@pytest.fixture
+def url_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'urls.txt')
+        with open(path, 'w') as f:
+            f.write('\n'.join(URLS) + '\n')
+        yield path
+
+
+def _run(url_path, **options):
+    with patch('sys.stdout', new=StringIO()) as fake_out:
+        assert run.process_url_file(url_path, **options) == 0
+    return fake_out.getvalue()
+
+
+def test_parse_shard():
+    assert parse_shard('0/4') == (0, 4)
+    assert parse_shard('3/4') == (3, 4)
+    for bad in ('4/4', '-1/4', '1', 'a/b', '0/0'):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_shard_of_is_stable_across_processes():
+    """The partition does not depend on per-process hash randomization"""
+    url = "https://huggingface.co/google/gemma-3-270m"
+    code = f"from sharding import shard_of; print(shard_of({url!r}, 97))"
+    other = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR,
+                           capture_output=True, text=True, env=dict(os.environ, PYTHONHASHSEED='123'))
+    assert int(other.stdout) == shard_of(url, 97)
+    assert shard_of("https://www.huggingface.co/Google/Gemma-3-270m/tree/main", 97) == shard_of(url, 97)
+
+
+def test_shards_partition_the_models(url_file):
+    """Every model URL is scored by exactly one shard"""
+    with patch('run.HfApi', None):
+        seen = []
+        for index in range(3):
+            output = _run(url_file, shard=(index, 3))
+            seen += [json.loads(line)['URL'] for line in output.splitlines()]
+    models = [url for url in URLS if run.categorize_url(url) == 'model']
+    assert sorted(seen) == sorted(models)
+
+
+def test_merge_restores_input_order(url_file):
+    """Shard outputs merge back into the original order, skipping failed models"""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        with patch('run.HfApi', None):
+            for index in range(3):
+                path = os.path.join(tmp, f'shard{index}.ndjson')
+                with open(path, 'w') as f:
+                    for line in _run(url_file, shard=(index, 3)).splitlines():
+                        if '"https://huggingface.co/org/model-5"' not in line:
+                            f.write(line + '\n')
+                paths.append(path)
+
+        out = StringIO()
+        written = merge_outputs(iter(URLS), paths, out, run._is_model_url)
+
+    merged = [json.loads(line)['URL'] for line in out.getvalue().splitlines()]
+    expected = [url for url in URLS if run._is_model_url(url) and not url.endswith('model-5')]
+    assert merged == expected
+    assert written == len(expected)
+
+
+def test_merge_command(url_file):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'shard0.ndjson')
+        with patch('run.HfApi', None):
+            with open(path, 'w') as f:
+                f.write(_run(url_file, shard=(0, 1)))
+        with patch('sys.argv', ['run.py', 'merge', url_file, path]):
+            with patch('sys.stdout', new=StringIO()) as fake_out:
+                with pytest.raises(SystemExit) as excinfo:
+                    run.main()
+    assert excinfo.value.code == 0
+    assert len(fake_out.getvalue().splitlines()) == 13
+
+
+def test_process_launcher_matches_single_process(url_file):
+    """--processes N gives the same lines, in the same order, as one process"""
+    with patch('run.HfApi', None):
+        single = _run(url_file)
+        sharded = _run(url_file, processes=3)
+
+    strip = lambda text: [{k: v for k, v in json.loads(line).items() if not k.endswith('Latency')}
+                          for line in text.splitlines()]
+    assert strip(sharded) == strip(single)
+
+
+def test_compressed_shard_outputs_and_merged_output(url_file):
+    """Shard outputs may be compressed, and --processes honours --output"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'shard0.ndjson.gz')
+        output = os.path.join(tmp, 'merged.ndjson.xz')
+        with patch('run.HfApi', None):
+            with gzip.open(path, 'wt') as f:
+                f.write(_run(url_file, shard=(0, 1)))
+            assert _run(url_file, processes=2, output=output) == ''
+        out = StringIO()
+        assert merge_outputs(iter(URLS), [path], out, run._is_model_url) == 13
+        with lzma.open(output, 'rt') as f:
+            assert [json.loads(line)['URL'] for line in f] == \
+                [json.loads(line)['URL'] for line in out.getvalue().splitlines()]
+
+
+def test_main_parses_shard_option():
+    with patch('sys.argv', ['run.py', 'urls.txt', '--shard', '2/8']):
+        with patch('run.process_url_file', return_value=0) as mock_process:
+            with patch('sys.exit'):
+                run.main()
+    mock_process.assert_called_once_with('urls.txt', shard=(2, 8))
@@ -0,0 +1,118 @@
+"""
+Tests for coalescing concurrent Hub lookups of the same repo
+"""
+import sys
+import os
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from singleflight import SingleFlight
+from metadata import MetadataFetcher
+
+CALLERS = 16
+
+
+class GatedHub:
+    """model_info stand-in that blocks until every caller has asked"""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+        self._lock = threading.Lock()
+
+    def model_info(self, repo_id, **kwargs):
+        with self._lock:
+            self.calls.append((repo_id, kwargs.get('expand')))
+        self.gate.wait(5)
+        return SimpleNamespace(sha='a' * 40, tags=[], card_data=None, last_modified=None)
+
+
+def _concurrently(func, callers=CALLERS, release=None):
+    """Run func from many threads at once; returns their results"""
+    results = [None] * callers
+    started = threading.Barrier(callers + 1)
+
+    def worker(index):
+        started.wait()
+        results[index] = func()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(callers)]
+    for t in threads:
+        t.start()
+    started.wait()
+    if release is not None:
+        release()
+    for t in threads:
+        t.join(5)
+    return results
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    gate = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        gate.wait(5)
+        return 'value'
+
+    def release():
+        # Let every caller reach the flight before the owner finishes
+        while flight.shared < CALLERS - 1:
+            threading.Event().wait(0.001)
+        gate.set()
+
+    assert _concurrently(lambda: flight.do('key', slow), release=release) == ['value'] * CALLERS
+    assert len(calls) == 1
+    assert flight.calls == 1 and flight.shared == CALLERS - 1
+
+
+def test_errors_reach_every_waiter_and_are_not_kept():
+    flight = SingleFlight()
+    with pytest.raises(ValueError):
+        flight.do('key', lambda: int('x'))
+    # A finished call is forgotten; the next caller runs again
+    assert flight.do('key', lambda: 42) == 42
+    assert flight.calls == 2
+
+
+def test_concurrent_fetches_of_one_repo_make_one_request():
+    hub = GatedHub()
+    fetcher = MetadataFetcher(lambda: hub)
+
+    def release():
+        while fetcher._flights.shared < CALLERS - 1:
+            threading.Event().wait(0.001)
+        hub.gate.set()
+
+    results = _concurrently(lambda: fetcher.get('org/model'), release=release)
+    assert all(r is results[0] and r.ok for r in results)
+    assert hub.calls == [('org/model', None)]
+    assert fetcher.fetch_count == 1
+
+
+def test_concurrent_sha_probes_make_one_request():
+    hub = GatedHub()
+    fetcher = MetadataFetcher(lambda: hub)
+
+    def release():
+        while fetcher._flights.shared < CALLERS - 1:
+            threading.Event().wait(0.001)
+        hub.gate.set()
+
+    assert _concurrently(lambda: fetcher.current_sha('org/model'), release=release) == ['a' * 40] * CALLERS
+    assert hub.calls == [('org/model', ['sha'])]
+
+
+def test_different_repos_are_not_coalesced():
+    hub = GatedHub()
+    hub.gate.set()
+    fetcher = MetadataFetcher(lambda: hub)
+    fetcher.get('org/a')
+    fetcher.get('org/b')
+    fetcher.get('org/a', 'v1')
+    assert len(hub.calls) == 3
@@ -0,0 +1,118 @@
+"""
+Tests for the size metric (file metadata and safetensors headers, no downloads)
+"""
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import run
+from hub_cache import MetadataCache
+from metadata import MetadataFetcher
+from size_metric import GIB, ModelSize, measure_size, size_score
+
+SHA = 'c' * 40
+
+
+def _file(name, size):
+    return SimpleNamespace(rfilename=name, size=size, lfs=None)
+
+
+class FakeHub:
+    """model_info with sibling sizes; safetensors headers served per file"""
+
+    def __init__(self, siblings, safetensors=None, headers=None):
+        self.siblings = siblings
+        self.safetensors = safetensors
+        self.headers = headers or {}
+        self.model_info_calls = []
+        self.header_reads = []
+
+    def model_info(self, repo_id, revision=None, expand=None, **kwargs):
+        self.model_info_calls.append(kwargs)
+        return SimpleNamespace(sha=SHA, siblings=self.siblings, safetensors=self.safetensors,
+                               tags=[], card_data=None)
+
+    def parse_safetensors_file_metadata(self, repo_id, filename, revision=None):
+        self.header_reads.append(filename)
+        return SimpleNamespace(parameter_count=self.headers[filename])
+
+
+def test_size_score_by_deployment_target():
+    assert size_score(100 * 1024 ** 2) == 1.0
+    assert size_score(3 * GIB) == 0.75       # Too big only for the Raspberry Pi
+    assert size_score(200 * GIB) == 0.0
+    assert size_score(None) == 0.5
+    assert size_score(1 * GIB) > size_score(2 * GIB) > size_score(6 * GIB)
+
+
+def test_measure_prefers_safetensors_and_hub_summary():
+    siblings = [_file('config.json', 700), _file('model.safetensors', 1000),
+                _file('pytorch_model.bin', 1200)]
+    data = SimpleNamespace(siblings=siblings,
+                           safetensors=SimpleNamespace(parameters={'BF16': 500}, total=500))
+    hub = FakeHub(siblings)
+    size = measure_size(hub, 'org/model', None, data)
+    assert size == ModelSize(2900, 1000, {'BF16': 500})
+    assert size.parameter_count == 500
+    assert hub.header_reads == []
+
+
+def test_measure_reads_safetensors_headers_when_summary_missing():
+    siblings = [_file('model-00001-of-00002.safetensors', None),
+                _file('model-00002-of-00002.safetensors', None)]
+    hub = FakeHub(siblings, headers={
+        'model-00001-of-00002.safetensors': {'F16': 300, 'F32': 10},
+        'model-00002-of-00002.safetensors': {'F16': 200},
+    })
+    size = measure_size(hub, 'org/model', 'v1', SimpleNamespace(siblings=siblings, safetensors=None))
+    assert size.parameters == {'F16': 500, 'F32': 10}
+    assert size.weight_bytes is None
+    assert size.estimated_bytes == 500 * 2 + 10 * 4
+    assert len(hub.header_reads) == 2
+
+
+def test_unreadable_headers_leave_size_unknown():
+    siblings = [_file('model.safetensors', None)]
+    hub = FakeHub(siblings)  # No header for the file: the read raises KeyError
+    size = measure_size(hub, 'org/model', None, SimpleNamespace(siblings=siblings))
+    assert size.parameters == {} and size.estimated_bytes is None
+
+
+def test_size_is_cached_per_commit():
+    siblings = [_file('model.safetensors', None)]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = MetadataCache(os.path.join(tmp, 'cache.db'))
+        hub = FakeHub(siblings, headers={'model.safetensors': {'F32': 1000}})
+        for _ in range(2):  # Two runs sharing the on-disk cache
+            fetcher = MetadataFetcher(lambda: hub, cache=cache)
+            score, _ = run.evaluate_model_size({'full_name': 'org/model'}, fetcher=fetcher)
+            assert score == 1.0
+        cache.close()
+    assert hub.header_reads == ['model.safetensors']
+    assert len(hub.model_info_calls) == 1
+    assert hub.model_info_calls[0] == {'files_metadata': True}
+
+
+def test_no_hub_fallback():
+    with patch('run.HfApi', None):
+        score, latency = run.evaluate_model_size({'full_name': 'org/model'})
+    assert score == 0.5 and latency >= 0
+
+
+def test_fetch_error_fallback():
+    hub = FakeHub([])
+    hub.model_info = lambda *args, **kwargs: (_ for _ in ()).throw(Exception("404"))
+    score, _ = run.evaluate_model_size({'full_name': 'org/model'}, fetcher=MetadataFetcher(lambda: hub))
+    assert score == 0.3
+
+
+def test_results_include_size_when_asked():
+    hub = FakeHub([_file('model.safetensors', 30 * GIB)])
+    with patch('run.HfApi', return_value=hub):
+        assert 'Size' not in run.evaluate_urls(["https://huggingface.co/org/model"])[0]
+        results = run.evaluate_urls(["https://huggingface.co/org/model"], metrics=['Size'])
+    assert results[0]['Size'] == size_score(30 * GIB)
+    assert isinstance(results[0]['Size_Latency'], int)
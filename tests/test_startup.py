@@ -0,0 +1,67 @@
+"""
+Startup budget for the ./run CLI
+Non-scoring commands must not pay for huggingface_hub, requests or torch
+"""
+import sys
+import os
+import re
+import subprocess
+import time
+
+PROJECT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+
+HEAVY_MODULES = ('huggingface_hub', 'requests', 'urllib3', 'torch', 'numpy')
+IMPORT_BUDGET_US = 100000   # Cumulative -X importtime cost of `import run`
+STARTUP_BUDGET_S = 0.1      # Wall time to first output, beyond a bare interpreter
+
+
+def _import_times():
+    """Cumulative import time (us) of every module loaded by `import run`"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import run'],
+                          cwd=SRC_DIR, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    times = {}
+    for line in proc.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)', line)
+        if match:
+            times[match.group(3)] = int(match.group(1))
+    return times
+
+
+def _best_wall_time(cmd, runs=5):
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_import_skips_heavy_packages():
+    """`import run` loads none of the heavy scoring dependencies"""
+    loaded = _import_times()
+    heavy = [name for name in loaded if name.split('.')[0] in HEAVY_MODULES]
+    assert heavy == []
+
+
+def test_import_time_budget():
+    """`import run` stays within the measured -X importtime budget"""
+    assert _import_times()['run'] < IMPORT_BUDGET_US
+
+
+def test_cli_startup_budget():
+    """./run prints its first output within budget of a bare interpreter start"""
+    bare = _best_wall_time([sys.executable, '-c', 'pass'])
+    usage = _best_wall_time([sys.executable, os.path.join('src', 'run.py')])
+    assert usage - bare < STARTUP_BUDGET_S
+
+
+def test_hub_loaded_on_first_use():
+    """run.HfApi is still available, imported the first time it is needed"""
+    code = ("import sys, run; assert 'huggingface_hub' not in sys.modules; "
+            "api = run.HfApi; print(api is None or 'huggingface_hub' in sys.modules)")
+    proc = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR,
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == 'True'